@@ -0,0 +1,21 @@
+"""
+Context processors do projeto
+"""
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from produtos.cache import versao_catalogo
+
+
+def fragmentos(request):
+    """
+    {{ FRAGMENTOS_SEGUNDOS }} e {{ versao_navegacao }} para os {% cache %}
+    dos menus dos painéis (ver app/fragmentos.py). A versão da navegação
+    muda a cada deploy (FRAGMENTOS_VERSAO) e a cada alteração do catálogo;
+    é preguiçosa: só consulta o cache se o template usar.
+    """
+    return {
+        'FRAGMENTOS_SEGUNDOS': settings.FRAGMENTOS_SEGUNDOS,
+        'versao_navegacao': SimpleLazyObject(lambda: f'{settings.FRAGMENTOS_VERSAO}.{versao_catalogo()}'),
+    }
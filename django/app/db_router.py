@@ -0,0 +1,106 @@
+"""
+Roteamento de leituras para a réplica do PostgreSQL
+
+Só usa a réplica (DATABASES['replica'], ver settings) quem pede
+explicitamente: views só de leitura marcadas com ReplicaMixin ou
+@usar_replica (listagens, relatórios). Todo o resto lê e escreve no
+primário. Views que gravam dados no cache com versão (dashboards com
+{% cache %}, ver app/fragmentos.py) ficam no primário: a versão muda no
+commit do primário e uma leitura atrasada da réplica ficaria no cache
+com a versão nova. Mesmo nas views marcadas a leitura volta para o primário:
+
+- dentro de transaction.atomic() (a transação está no primário)
+- depois de qualquer escrita na mesma requisição (lê o que acabou de gravar)
+- por DATABASE_REPLICA_FIXAR_SEGUNDOS depois de um POST/PUT/PATCH/DELETE
+  do mesmo navegador (cookie gravado pelo ReplicaMiddleware), para o
+  usuário não ver dados antigos por causa do atraso da réplica
+"""
+
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA = 'replica'
+
+_ler_da_replica = contextvars.ContextVar('app_ler_da_replica', default=False)
+
+
+def replica_configurada():
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def ler_da_replica(ativo=True):
+    """Leituras do bloco vão para a réplica (se configurada)"""
+    token = _ler_da_replica.set(ativo and replica_configurada())
+    try:
+        yield
+    finally:
+        _ler_da_replica.reset(token)
+
+
+def _pode_usar_replica(request):
+    return not getattr(request, 'fixar_primario', False)
+
+
+def _iterar_na_replica(conteudo):
+    """Itera um StreamingHttpResponse com as leituras na réplica, sem vazar o contexto"""
+    contexto = contextvars.copy_context()
+    contexto.run(_ler_da_replica.set, replica_configurada())
+    iterador = iter(conteudo)
+    while True:
+        try:
+            yield contexto.run(next, iterador)
+        except StopIteration:
+            return
+
+
+def _executar_na_replica(request, executar):
+    with ler_da_replica(_pode_usar_replica(request)):
+        response = executar()
+        # TemplateResponse é renderizado depois da view; renderiza aqui para
+        # as queries preguiçosas do template também irem para a réplica
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+    if getattr(response, 'streaming', False) and _pode_usar_replica(request):
+        response.streaming_content = _iterar_na_replica(response.streaming_content)
+    return response
+
+
+def usar_replica(view):
+    """Decorator para function-based views só de leitura"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return _executar_na_replica(request, lambda: view(request, *args, **kwargs))
+    return wrapper
+
+
+class ReplicaMixin:
+    """Mixin para class-based views só de leitura"""
+
+    def dispatch(self, request, *args, **kwargs):
+        return _executar_na_replica(request, lambda: super(ReplicaMixin, self).dispatch(request, *args, **kwargs))
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS: leituras marcadas na réplica, todo o resto no primário"""
+
+    def db_for_read(self, model, **hints):
+        if _ler_da_replica.get() and not connections['default'].in_atomic_block:
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        # leitura depois de escrita na mesma requisição vai para o primário
+        _ler_da_replica.set(False)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # réplica e primário têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
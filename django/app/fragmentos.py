@@ -0,0 +1,85 @@
+"""
+Cache de fragmentos de template ({% cache %}) dos painéis
+
+Os menus dos painéis e os blocos pesados dos dashboards ficam no cache
+com uma chave que inclui a versão dos dados que mostram. Cada domínio
+(usuarios, pets, consultas) tem uma versão no cache, incrementada por
+invalidar() no save()/delete() dos models e nas transições de status de
+consulta (que usam .update()); o catálogo de produtos usa a versão de
+produtos/cache.py. Os fragmentos antigos deixam de ser usados sem apagar
+chave por chave.
+
+FRAGMENTOS_SEGUNDOS limita quanto tempo um fragmento pode ficar
+desatualizado por alterações que não passam por esses hooks (ex: baixa
+de estoque no checkout).
+
+Nos dashboards as estatísticas vão para o contexto com adiado(): a query
+só roda se o template precisar, ou seja, quando o fragmento não está no
+cache. Fragmentos com dados do banco são preenchidos lendo do primário
+(sem ReplicaMixin), senão dados anteriores a um commit, lidos da réplica
+atrasada, ficariam no cache sob a versão nova.
+"""
+
+from functools import cache as memorizar
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _chave(dominio):
+    return f'fragmentos:{dominio}:versao'
+
+
+def versao(*dominios):
+    """Versão combinada dos domínios para a chave do {% cache %}, ex: '3.1.7'"""
+    chaves = [_chave(dominio) for dominio in dominios]
+    versoes = cache.get_many(chaves)
+    for chave in chaves:
+        if chave not in versoes:
+            cache.add(chave, 1, timeout=None)
+            versoes[chave] = cache.get(chave, 1)
+    return '.'.join(str(versoes[chave]) for chave in chaves)
+
+
+def invalidar(*dominios):
+    for dominio in dominios:
+        try:
+            cache.incr(_chave(dominio))
+        except ValueError:
+            # chave ainda não existe (ou expirou do cache)
+            cache.add(_chave(dominio), 2, timeout=None)
+
+
+def invalidar_ao_confirmar(*dominios):
+    """invalidar() depois do commit da transação atual (na hora, fora de transação)"""
+    transaction.on_commit(lambda: invalidar(*dominios))
+
+
+def adiado(funcao):
+    """
+    Valor de contexto calculado só quando o template o usa, uma única vez
+    por requisição (o template chama o callable). Ex:
+    context['total_pets'] = adiado(Animal.ativos.count)
+    """
+    return memorizar(funcao)
+
+
+class InvalidaFragmentos:
+    """
+    Mixin de model: save() e delete() invalidam os domínios de
+    dominios_fragmentos. Saves só de campos em campos_sem_fragmentos
+    (ex: last_login a cada login) não invalidam.
+    """
+    dominios_fragmentos = ()
+    campos_sem_fragmentos = frozenset()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or not set(update_fields) <= self.campos_sem_fragmentos:
+            invalidar_ao_confirmar(*self.dominios_fragmentos)
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        invalidar_ao_confirmar(*self.dominios_fragmentos)
+        return resultado
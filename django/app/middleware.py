@@ -3,9 +3,15 @@ Middleware customizado para melhorar a experiência com CSRF
 Especialmente após login em ambientes como Codespaces
 """
 
+import re
+import time
+
+from django.conf import settings
 from django.middleware.csrf import get_token
 from django.utils.deprecation import MiddlewareMixin
 
+from . import rastreamento
+
 
 class CSRFRefreshMiddleware(MiddlewareMixin):
     """
@@ -21,3 +27,55 @@ class CSRFRefreshMiddleware(MiddlewareMixin):
         # Força a geração do token CSRF para todas as requisições
         get_token(request)
         return None
+
+
+class ReplicaMiddleware:
+    """
+    Fixa as leituras no banco primário por alguns segundos depois de uma
+    escrita (POST/PUT/PATCH/DELETE), via cookie, para que a réplica
+    atrasada não esconda do usuário o que ele acabou de gravar
+    (ver app/db_router.py)
+    """
+    COOKIE = 'fixar_primario'
+    METODOS_ESCRITA = {'POST', 'PUT', 'PATCH', 'DELETE'}
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        request.fixar_primario = (
+            self.COOKIE in request.COOKIES or request.method in self.METODOS_ESCRITA
+        )
+        response = self.get_response(request)
+        if request.method in self.METODOS_ESCRITA:
+            response.set_cookie(
+                self.COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_FIXAR_SEGUNDOS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class RastreamentoMiddleware:
+    """
+    Mede cada requisição (tempo total, SQL, templates, tamanho da resposta)
+    e alimenta os histogramas por nome de URL (ver app/rastreamento.py).
+    Deve ser o primeiro middleware para incluir o custo dos demais.
+    """
+    ID_VALIDO = re.compile(r'^[\w.-]{1,64}$')
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if not settings.RASTREAMENTO_ATIVO:
+            return self.get_response(request)
+        # reaproveita o id do proxy/load balancer, se vier um id válido
+        rastro_id = request.headers.get('X-Request-ID', '')
+        inicio = time.perf_counter()
+        with rastreamento.rastrear(rastro_id if self.ID_VALIDO.match(rastro_id) else None) as rastro:
+            request.rastro = rastro
+            response = self.get_response(request)
+        rastreamento.registrar_requisicao(request, response, rastro, time.perf_counter() - inicio)
+        response['X-Request-ID'] = rastro.id
+        return response
@@ -0,0 +1,265 @@
+"""
+Rastreamento de requisições e métricas no formato do Prometheus
+
+Cada requisição (RastreamentoMiddleware) abre um Rastro com id próprio
+(cabeçalho X-Request-ID) que acumula:
+- tempo e quantidade de queries SQL (execute_wrapper em todas as conexões)
+- tempo de renderização de templates (backend DjangoTemplatesRastreados)
+- spans: blocos instrumentados com span(), ex: chamadas ao Google
+
+Ao fim da requisição os valores entram nos histogramas por nome de URL
+(view_name) e uma linha JSON é registrada no logger app.rastreamento
+(WARNING para requisições acima de RASTREAMENTO_REQUISICAO_LENTA_MS).
+Queries acima de RASTREAMENTO_QUERY_LENTA_MS também são registradas.
+
+Os histogramas ficam na memória do processo e são expostos em /metricas/
+(texto do Prometheus). Com vários processos (gunicorn -w N) cada um tem
+os seus: configure o Prometheus para coletar de cada processo.
+
+Instrumentando um bloco:
+
+    with span('google.token', url=token_url):
+        response = requests.post(...)
+"""
+
+import bisect
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_QUERIES = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+BUCKETS_BYTES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histograma:
+    """Histograma cumulativo do Prometheus, com rótulos, seguro entre threads"""
+
+    def __init__(self, nome, ajuda, rotulos, buckets):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def observar(self, valor, **rotulos):
+        chave = tuple(str(rotulos[rotulo]) for rotulo in self.rotulos)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._trava:
+            serie = self._series.get(chave)
+            if serie is None:
+                # [contagem por bucket (+Inf no fim), soma, total]
+                serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self):
+        with self._trava:
+            series = {chave: ([*contagens], soma, total) for chave, (contagens, soma, total) in self._series.items()}
+        linhas = [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} histogram']
+        for chave, (contagens, soma, total) in sorted(series.items()):
+            rotulos = [f'{rotulo}="{_escapar(valor)}"' for rotulo, valor in zip(self.rotulos, chave)]
+            acumulado = 0
+            for limite, quantidade in zip((*self.buckets, math.inf), contagens):
+                acumulado += quantidade
+                le = '+Inf' if limite == math.inf else f'{limite:g}'
+                rotulos_bucket = ','.join([*rotulos, f'le="{le}"'])
+                linhas.append(f'{self.nome}_bucket{{{rotulos_bucket}}} {acumulado}')
+            sufixo = f'{{{",".join(rotulos)}}}' if rotulos else ''
+            linhas.append(f'{self.nome}_sum{sufixo} {soma:.6f}')
+            linhas.append(f'{self.nome}_count{sufixo} {total}')
+        return linhas
+
+
+def _escapar(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUISICAO_DURACAO = Histograma(
+    'petshop_requisicao_duracao_segundos', 'Tempo total da requisição',
+    ('view', 'metodo', 'status'), BUCKETS_SEGUNDOS,
+)
+REQUISICAO_BANCO = Histograma(
+    'petshop_requisicao_banco_segundos', 'Tempo em queries SQL por requisição', ('view',), BUCKETS_SEGUNDOS,
+)
+REQUISICAO_QUERIES = Histograma(
+    'petshop_requisicao_queries', 'Queries SQL por requisição', ('view',), BUCKETS_QUERIES,
+)
+REQUISICAO_TEMPLATE = Histograma(
+    'petshop_requisicao_template_segundos', 'Tempo renderizando templates por requisição (inclui as queries feitas no template)',
+    ('view',), BUCKETS_SEGUNDOS,
+)
+RESPOSTA_BYTES = Histograma(
+    'petshop_resposta_bytes', 'Tamanho do corpo da resposta (respostas em streaming não entram)', ('view',), BUCKETS_BYTES,
+)
+SPAN_DURACAO = Histograma(
+    'petshop_span_duracao_segundos', 'Duração dos blocos instrumentados com span()', ('span', 'erro'), BUCKETS_SEGUNDOS,
+)
+
+HISTOGRAMAS = (REQUISICAO_DURACAO, REQUISICAO_BANCO, REQUISICAO_QUERIES, REQUISICAO_TEMPLATE, RESPOSTA_BYTES, SPAN_DURACAO)
+
+
+def exportar():
+    """Todas as métricas no formato texto do Prometheus"""
+    return '\n'.join(linha for histograma in HISTOGRAMAS for linha in histograma.exportar()) + '\n'
+
+
+# ====================================
+# Rastro da requisição
+# ====================================
+
+@dataclass
+class Rastro:
+    id: str
+    banco_segundos: float = 0.0
+    queries: int = 0
+    template_segundos: float = 0.0
+    spans: list = field(default_factory=list)
+
+
+_rastro_atual = ContextVar('app_rastro_atual', default=None)
+
+
+def rastro_atual():
+    return _rastro_atual.get()
+
+
+def _medir_query(execute, sql, params, many, context):
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duracao = time.perf_counter() - inicio
+        rastro = _rastro_atual.get()
+        if rastro is not None:
+            rastro.banco_segundos += duracao
+            rastro.queries += 1
+        if duracao * 1000 >= settings.RASTREAMENTO_QUERY_LENTA_MS:
+            logger.warning(json.dumps({
+                'evento': 'query_lenta',
+                'rastro': rastro.id if rastro else None,
+                'banco': context['connection'].alias,
+                'ms': round(duracao * 1000, 2),
+                'sql': sql[:2000],
+            }, ensure_ascii=False))
+
+
+@contextmanager
+def rastrear(rastro_id=None):
+    """Abre um Rastro e mede as queries de todas as conexões desta thread no bloco"""
+    rastro = Rastro(rastro_id or uuid.uuid4().hex)
+    token = _rastro_atual.set(rastro)
+    try:
+        with ExitStack() as pilha:
+            for alias in connections:
+                pilha.enter_context(connections[alias].execute_wrapper(_medir_query))
+            yield rastro
+    finally:
+        _rastro_atual.reset(token)
+
+
+@contextmanager
+def span(nome, **atributos):
+    """
+    Mede o bloco: entra no histograma petshop_span_duracao_segundos e na
+    lista de spans do rastro atual (com os atributos). Exceções propagam
+    normalmente e marcam o span com erro.
+    """
+    inicio = time.perf_counter()
+    erro = None
+    try:
+        yield atributos
+    except BaseException as e:
+        erro = type(e).__name__
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        SPAN_DURACAO.observar(duracao, span=nome, erro='true' if erro else 'false')
+        rastro = _rastro_atual.get()
+        if rastro is not None:
+            rastro.spans.append({'nome': nome, 'ms': round(duracao * 1000, 2), 'erro': erro, **atributos})
+
+
+def registrar_requisicao(request, response, rastro, duracao):
+    """Alimenta os histogramas com a requisição terminada e registra a linha de log"""
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else 'nao_resolvida'
+    status = response.status_code
+    tamanho = None if response.streaming else len(response.content)
+
+    REQUISICAO_DURACAO.observar(duracao, view=view, metodo=request.method, status=f'{status // 100}xx')
+    REQUISICAO_BANCO.observar(rastro.banco_segundos, view=view)
+    REQUISICAO_QUERIES.observar(rastro.queries, view=view)
+    REQUISICAO_TEMPLATE.observar(rastro.template_segundos, view=view)
+    if tamanho is not None:
+        RESPOSTA_BYTES.observar(tamanho, view=view)
+
+    lenta = duracao * 1000 >= settings.RASTREAMENTO_REQUISICAO_LENTA_MS
+    nivel = logging.WARNING if lenta else logging.INFO
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, json.dumps({
+            'evento': 'requisicao',
+            'rastro': rastro.id,
+            'view': view,
+            'metodo': request.method,
+            'caminho': request.path,
+            'status': status,
+            'ms': round(duracao * 1000, 2),
+            'banco_ms': round(rastro.banco_segundos * 1000, 2),
+            'queries': rastro.queries,
+            'template_ms': round(rastro.template_segundos * 1000, 2),
+            'bytes': tamanho,
+            'spans': rastro.spans,
+        }, ensure_ascii=False, default=str))
+
+
+# ====================================
+# Templates
+# ====================================
+
+class _TemplateRastreado:
+    """Template do backend com o tempo de render somado ao rastro atual"""
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, nome):
+        return getattr(self._template, nome)
+
+    def render(self, context=None, request=None):
+        rastro = _rastro_atual.get()
+        if rastro is None:
+            return self._template.render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            rastro.template_segundos += time.perf_counter() - inicio
+
+
+class DjangoTemplatesRastreados(DjangoTemplates):
+    """
+    Backend DjangoTemplates (TEMPLATES['BACKEND']) que mede o render dos
+    templates carregados pela view (render(), TemplateResponse,
+    render_to_string); {% include %}/{% extends %} entram no tempo do template pai
+    """
+
+    def from_string(self, template_code):
+        return _TemplateRastreado(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TemplateRastreado(super().get_template(template_name))
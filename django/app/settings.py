@@ -24,6 +24,57 @@ MEDIA_URL = '/media/'
 #pasta onde os arquivos de mídia serão salvos
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# variantes responsivas de Produto.imagem (ver produtos/imagens.py)
+PRODUTOS_IMAGEM_LARGURAS = (320, 640, 960)
+PRODUTOS_IMAGEM_WORKERS = int(os.getenv('PRODUTOS_IMAGEM_WORKERS', '2'))
+# tamanho máximo das imagens baixadas na importação (ver produtos/importacao.py)
+PRODUTOS_IMAGEM_MAXIMO_BYTES = int(os.getenv('PRODUTOS_IMAGEM_MAXIMO_BYTES', str(10 * 1024 * 1024)))
+
+# minutos que o estoque fica reservado para um pedido aguardando pagamento
+PEDIDO_RESERVA_MINUTOS = int(os.getenv('PEDIDO_RESERVA_MINUTOS', '30'))
+
+# agenda dos veterinários (ver consultas/horarios.py)
+# expediente usado para veterinários sem HorarioTrabalho cadastrado:
+# dia da semana (0 = segunda) -> lista de (início, fim)
+CONSULTAS_EXPEDIENTE_PADRAO = {
+    dia: [('08:00', '12:00'), ('13:00', '18:00')] for dia in range(5)
+}
+# granularidade dos horários oferecidos (minutos)
+CONSULTAS_PASSO_MINUTOS = 15
+# grava o HistoricoConsulta em uma thread separada (ver consultas/auditoria.py)
+CONSULTAS_AUDITORIA_ASSINCRONA = os.getenv('CONSULTAS_AUDITORIA_ASSINCRONA', 'False') == 'True'
+# meses de HistoricoConsulta mantidos na tabela principal (o resto vai para o arquivo)
+CONSULTAS_HISTORICO_MESES = int(os.getenv('CONSULTAS_HISTORICO_MESES', '12'))
+# threads que geram os documentos de receita (ver consultas/documentos.py)
+CONSULTAS_DOCUMENTOS_WORKERS = int(os.getenv('CONSULTAS_DOCUMENTOS_WORKERS', '2'))
+
+# fila de tarefas em segundo plano (ver tarefas/fila.py e o comando processar_tarefas)
+TAREFAS_BACKOFF_SEGUNDOS = int(os.getenv('TAREFAS_BACKOFF_SEGUNDOS', '30'))  # 1ª nova tentativa; dobra a cada falha
+TAREFAS_BACKOFF_MAXIMO_SEGUNDOS = int(os.getenv('TAREFAS_BACKOFF_MAXIMO_SEGUNDOS', '3600'))
+TAREFAS_TIMEOUT_SEGUNDOS = int(os.getenv('TAREFAS_TIMEOUT_SEGUNDOS', '900'))  # depois disso a tarefa volta para a fila
+TAREFAS_RETENCAO_DIAS = int(os.getenv('TAREFAS_RETENCAO_DIAS', '7'))  # tarefas concluídas mantidas
+
+# rastreamento e métricas (ver app/rastreamento.py; Prometheus em /metricas/)
+RASTREAMENTO_ATIVO = os.getenv('RASTREAMENTO_ATIVO', 'True') == 'True'
+RASTREAMENTO_QUERY_LENTA_MS = int(os.getenv('RASTREAMENTO_QUERY_LENTA_MS', '200'))  # queries acima disso são logadas
+RASTREAMENTO_REQUISICAO_LENTA_MS = int(os.getenv('RASTREAMENTO_REQUISICAO_LENTA_MS', '1000'))  # logadas como WARNING
+# além de superusuários, /metricas/ responde para estes IPs ou para o token (Authorization: Bearer)
+METRICAS_IPS = [ip.strip() for ip in os.getenv('METRICAS_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+METRICAS_TOKEN = os.getenv('METRICAS_TOKEN', '')
+
+# E-mail; em desenvolvimento as mensagens vão para o console
+EMAIL_BACKEND = os.getenv('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'PetShop <nao-responda@petshop.local>')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', str(BASE_DIR / 'emails'))  # backend filebased
+# lembretes de consulta (ver consultas/lembretes.py); ex: filebased localmente, smtp em produção
+CONSULTAS_LEMBRETES_EMAIL_BACKEND = os.getenv('CONSULTAS_LEMBRETES_EMAIL_BACKEND', EMAIL_BACKEND)
+CONSULTAS_LEMBRETES_ANTECEDENCIA_HORAS = int(os.getenv('CONSULTAS_LEMBRETES_ANTECEDENCIA_HORAS', '24'))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -74,6 +125,7 @@ INSTALLED_APPS = [
     "pets",
     "panel",
     "consultas",
+    "tarefas",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -120,13 +172,16 @@ if DEBUG:
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    "app.middleware.RastreamentoMiddleware",  # métricas e rastro da requisição (primeiro: mede todo o resto)
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "app.middleware.CSRFRefreshMiddleware",  # Middleware customizado para CSRF
+    "app.middleware.ReplicaMiddleware",  # leituras no primário logo após uma escrita
     "django.contrib.messages.middleware.MessageMiddleware",
+    "consultas.middleware.AuditoriaMiddleware",  # grava o HistoricoConsulta da requisição em lote
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
@@ -134,14 +189,24 @@ ROOT_URLCONF = "app.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates que mede o tempo de render (ver app/rastreamento.py)
+        "BACKEND": "app.rastreamento.DjangoTemplatesRastreados",
         "DIRS": [BASE_DIR / 'app' / 'templates'],  # Templates do app principal
-        "APP_DIRS": True,
         "OPTIONS": {
+            # templates compilados uma vez por processo (em DEBUG o autoreload
+            # limpa o cache quando um template muda)
+            "loaders": [
+                ("django.template.loaders.cached.Loader", [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ]),
+            ],
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "produtos.context_processors.resumo_carrinho",
+                "app.context_processors.fragmentos",
             ],
         },
     },
@@ -152,6 +217,8 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+DATABASE_POOL = os.getenv('DATABASE_POOL', 'False') == 'True'
+
 DATABASES = {
     "default": {
         'ENGINE': 'django.db.backends.postgresql',
@@ -160,9 +227,72 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('POSTGRES_HOST'),
         'PORT': os.getenv('POSTGRES_PORT'),
+        # conexões persistentes: cada thread/processo reaproveita a conexão por
+        # até DATABASE_CONN_MAX_AGE segundos em vez de abrir uma por requisição
+        # (0 = fecha ao fim de cada requisição)
+        'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', '60')),
+        # testa a conexão reaproveitada no início da requisição e reconecta se
+        # o PostgreSQL a derrubou (restart, failover, timeout de ociosidade)
+        'CONN_HEALTH_CHECKS': os.getenv('DATABASE_CONN_HEALTH_CHECKS', 'True') == 'True',
+        'OPTIONS': {},
+    }
+}
+
+# Pool de conexões do Django (DATABASE_POOL=True): as conexões ficam num pool
+# compartilhado pelas threads do processo e voltam para ele ao fim de cada
+# requisição. Precisa do psycopg 3 (pip install "psycopg[binary,pool]" no
+# lugar de psycopg2-binary) e é incompatível com conexões persistentes, por
+# isso CONN_MAX_AGE fica 0. Compare os modos com: python manage.py benchmark_conexoes
+if DATABASE_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DATABASE_POOL_MIN', '2')),
+        'max_size': int(os.getenv('DATABASE_POOL_MAX', '10')),
+        # segundos esperando uma conexão livre antes de dar erro
+        'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '10')),
+    }
+
+# Réplica de leitura opcional (ex: streaming replication do PostgreSQL).
+# Só views marcadas com ReplicaMixin/@usar_replica leem dela (ver app/db_router.py).
+# Para testar localmente, aponte POSTGRES_REPLICA_HOST/POSTGRES_REPLICA_DB para
+# um segundo banco (ou defina DATABASES['replica'] como SQLite em settings locais).
+if os.getenv('POSTGRES_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('POSTGRES_REPLICA_DB', DATABASES['default']['NAME']),
+        'USER': os.getenv('POSTGRES_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('POSTGRES_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('POSTGRES_REPLICA_HOST'),
+        'PORT': os.getenv('POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        # nos testes a réplica é o próprio banco de teste do primário
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['app.db_router.ReplicaRouter']
+# segundos em que o navegador lê só do primário depois de uma escrita
+DATABASE_REPLICA_FIXAR_SEGUNDOS = int(os.getenv('DATABASE_REPLICA_FIXAR_SEGUNDOS', '10'))
+
+
+# Cache
+# Em produção aponte para um backend compartilhado entre processos (ex: Redis/Memcached)
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        "LOCATION": os.getenv('DJANGO_CACHE_LOCATION', 'petshop'),
     }
 }
 
+# Cache de fragmentos dos painéis (menus e dashboards, ver app/fragmentos.py).
+# Em DEBUG fica desligado (0) para alterações nos templates aparecerem na hora.
+FRAGMENTOS_SEGUNDOS = int(os.getenv('FRAGMENTOS_SEGUNDOS', '0' if DEBUG else '300'))
+# mude a cada deploy (ex: hash do commit) para descartar menus de versões anteriores
+FRAGMENTOS_VERSAO = os.getenv('FRAGMENTOS_VERSAO', '1')
+
+# Visão geral dos pets no portal do cliente, por tutor (ver users/portal.py);
+# invalidada nas alterações de animais/consultas, este é só o limite
+PORTAL_SEGUNDOS = int(os.getenv('PORTAL_SEGUNDOS', '600'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -17,13 +17,15 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from users.views import home
+from users.views import home, portal_cliente
 from django.conf import settings
 from django.conf.urls.static import static
 from panel.views import DashboardFuncView
+from app.views import metricas
 
 urlpatterns = [
     path("", home, name="home"),
+    path("portal/", portal_cliente, name="portal_cliente"),
     path("admin/", admin.site.urls),
     path("users/", include("users.urls")),
     path("pets/", include("pets.urls")),
@@ -31,6 +33,7 @@ urlpatterns = [
     path("painel-funcionario/", DashboardFuncView.as_view(), name='painel_funcionario'),
     path("painel-veterinario/", include("consultas.urls")),
     path("produtos/", include("produtos.urls")),
+    path("metricas/", metricas, name='metricas'),  # Prometheus (interno)
 ]
  # servir arquivos de mídia em modo de desenvolvimento
 if settings.DEBUG:
@@ -0,0 +1,33 @@
+"""
+Views internas do projeto
+"""
+
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from . import rastreamento
+
+
+def _pode_ver_metricas(request):
+    if request.META.get('REMOTE_ADDR') in settings.METRICAS_IPS:
+        return True
+    if settings.METRICAS_TOKEN:
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if hmac.compare_digest(token.encode(), settings.METRICAS_TOKEN.encode()):
+            return True
+    return request.user.is_authenticated and request.user.is_superuser
+
+
+@require_GET
+def metricas(request):
+    """
+    Métricas no formato texto do Prometheus. Só para a rede interna
+    (METRICAS_IPS), para quem envia METRICAS_TOKEN como Bearer ou para
+    superusuários; os demais recebem 404.
+    """
+    if not _pode_ver_metricas(request):
+        raise Http404
+    return HttpResponse(rastreamento.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
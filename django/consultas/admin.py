@@ -1,3 +1,27 @@
+"""
+Configuração do Django Admin para o app de consultas
+"""
+
 from django.contrib import admin
+from .models import HorarioTrabalho, Medicamento, MedicamentoAlias
+
+
+@admin.register(HorarioTrabalho)
+class HorarioTrabalhoAdmin(admin.ModelAdmin):
+    list_display = ['veterinario', 'dia_semana', 'inicio', 'fim']
+    list_filter = ['dia_semana']
+    raw_id_fields = ['veterinario']
+
+
+class MedicamentoAliasInline(admin.TabularInline):
+    model = MedicamentoAlias
+    extra = 1
+
 
-# Register your models here.
+@admin.register(Medicamento)
+class MedicamentoAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'principio_ativo', 'ativo', 'criado_em']
+    list_filter = ['ativo']
+    search_fields = ['nome_normalizado', 'principio_ativo', 'aliases__nome_normalizado']
+    list_editable = ['ativo']
+    inlines = [MedicamentoAliasInline]
@@ -0,0 +1,196 @@
+"""
+Agenda dos veterinários em formato de API (JSON e iCalendar)
+
+- periodo(): consultas de um veterinário que ocupam parte de [inicio, fim)
+- alteracoes(): sincronização incremental por cursor sobre
+  (atualizado_em, id). O cliente guarda o cursor devolvido e, na próxima
+  chamada, recebe apenas as consultas criadas/alteradas depois dele
+  (inclusive canceladas, para que sejam removidas do lado do cliente).
+- ical(): feed text/calendar para assinatura em apps de calendário; a
+  view responde 304 quando nada mudou (ETag/Last-Modified).
+
+Toda alteração de Consulta precisa atualizar atualizado_em (save()
+faz isso via auto_now; em .update() o campo deve ser passado
+explicitamente), senão não aparece na sincronização.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.core import signing
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import Consulta
+
+# Máximo de consultas por resposta de sincronização
+LIMITE_ALTERACOES = 500
+
+_SALT_ICAL = 'consultas.agenda.ical'
+
+_CAMPOS = (
+    'id', 'data_hora', 'data_hora_fim', 'tipo', 'status', 'motivo', 'atualizado_em',
+    'animal_id', 'animal__nome',
+    'animal__proprietario__first_name', 'animal__proprietario__last_name',
+    'animal__proprietario__username',
+)
+
+
+def _valores(queryset):
+    return queryset.values(*_CAMPOS)
+
+
+def serializar(linha):
+    """Formato compacto de uma consulta (a partir de .values(*_CAMPOS))"""
+    tutor = ' '.join(
+        filter(None, [linha['animal__proprietario__first_name'], linha['animal__proprietario__last_name']])
+    )
+    return {
+        'id': linha['id'],
+        'inicio': timezone.localtime(linha['data_hora']).isoformat(),
+        'fim': timezone.localtime(linha['data_hora_fim']).isoformat() if linha['data_hora_fim'] else None,
+        'tipo': linha['tipo'],
+        'status': linha['status'],
+        'animal': {'id': linha['animal_id'], 'nome': linha['animal__nome']},
+        'tutor': tutor or linha['animal__proprietario__username'],
+        'motivo': linha['motivo'],
+    }
+
+
+def periodo(veterinario, inicio, fim):
+    """Consultas do veterinário que ocupam parte do período, por data_hora"""
+    return _valores(
+        Consulta.objects.filter(veterinario=veterinario, data_hora__lt=fim)
+        .filter(Q(data_hora_fim__gt=inicio) | Q(data_hora_fim__isnull=True, data_hora__gte=inicio))
+        .order_by('data_hora', 'id')
+    )
+
+
+# ====================================
+# Sincronização incremental
+# ====================================
+
+def codificar_cursor(atualizado_em, consulta_id):
+    return f'{atualizado_em.astimezone(dt_timezone.utc).isoformat()}_{consulta_id}'
+
+
+def decodificar_cursor(cursor):
+    """
+    Aceita o cursor devolvido pela API ("<iso>_<id>") ou apenas uma data
+    ISO (primeira sincronização a partir de um instante). Levanta ValueError.
+    """
+    instante, _, consulta_id = (cursor or '').rpartition('_')
+    if not instante:
+        instante, consulta_id = cursor, 0
+    valor = datetime.fromisoformat(instante.replace(' ', '+').replace('Z', '+00:00'))
+    if timezone.is_naive(valor):
+        valor = timezone.make_aware(valor)
+    return valor, int(consulta_id)
+
+
+def alteracoes(veterinario, cursor=None, limite=LIMITE_ALTERACOES):
+    """
+    Consultas alteradas depois do cursor, em ordem de (atualizado_em, id).
+    Retorna (lista serializada, próximo cursor, tem_mais).
+    """
+    consultas = Consulta.objects.filter(veterinario=veterinario)
+    if cursor:
+        atualizado_em, consulta_id = decodificar_cursor(cursor)
+        consultas = consultas.filter(
+            Q(atualizado_em__gt=atualizado_em) | Q(atualizado_em=atualizado_em, id__gt=consulta_id)
+        )
+
+    linhas = list(_valores(consultas.order_by('atualizado_em', 'id'))[:limite + 1])
+    tem_mais = len(linhas) > limite
+    linhas = linhas[:limite]
+
+    if linhas:
+        proximo = codificar_cursor(linhas[-1]['atualizado_em'], linhas[-1]['id'])
+    else:
+        proximo = cursor
+    return [serializar(linha) for linha in linhas], proximo, tem_mais
+
+
+def versao(veterinario):
+    """(última alteração, total) da agenda: base do ETag do feed iCal"""
+    resumo = Consulta.objects.filter(veterinario=veterinario).aggregate(
+        ultima=Max('atualizado_em'), total=Count('id')
+    )
+    return resumo['ultima'], resumo['total']
+
+
+# ====================================
+# iCalendar
+# ====================================
+
+def token_ical(veterinario):
+    """Token assinado usado na URL do feed (apps de calendário não fazem login)"""
+    return signing.dumps(veterinario.pk, salt=_SALT_ICAL, compress=True)
+
+
+def veterinario_do_token(token):
+    """Id do veterinário do token ou None se inválido"""
+    try:
+        return signing.loads(token, salt=_SALT_ICAL)
+    except signing.BadSignature:
+        return None
+
+
+def _texto_ical(valor):
+    return (
+        str(valor).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _data_ical(valor):
+    return valor.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _dobrar(linha):
+    """Quebra linhas maiores que 75 octetos (RFC 5545, 3.1)"""
+    dados = linha.encode('utf-8')
+    if len(dados) <= 75:
+        return linha + '\r\n'
+    partes, atual = [], ''
+    for caractere in linha:
+        limite = 75 if not partes else 74
+        if len((atual + caractere).encode('utf-8')) > limite:
+            partes.append(atual)
+            atual = ''
+        atual += caractere
+    partes.append(atual)
+    return '\r\n '.join(partes) + '\r\n'
+
+
+_STATUS_ICAL = {
+    'AGENDADA': 'TENTATIVE',
+    'CONFIRMADA': 'CONFIRMED',
+    'EM_ATENDIMENTO': 'CONFIRMED',
+    'REALIZADA': 'CONFIRMED',
+    'CANCELADA': 'CANCELLED',
+    'FALTOU': 'CANCELLED',
+}
+
+
+def ical(linhas, nome='Agenda'):
+    """Gerador das linhas do VCALENDAR (linhas de .values(*_CAMPOS))"""
+    tipos = dict(Consulta.TIPO_CHOICES)
+    yield 'BEGIN:VCALENDAR\r\n'
+    yield 'VERSION:2.0\r\n'
+    yield 'PRODID:-//PetShop//Agenda Veterinaria//PT\r\n'
+    yield 'CALSCALE:GREGORIAN\r\n'
+    yield _dobrar(f'X-WR-CALNAME:{_texto_ical(nome)}')
+    for linha in linhas:
+        consulta = serializar(linha)
+        fim = linha['data_hora_fim'] or linha['data_hora']
+        yield 'BEGIN:VEVENT\r\n'
+        yield f'UID:consulta-{linha["id"]}@petshop\r\n'
+        yield f'DTSTAMP:{_data_ical(linha["atualizado_em"])}\r\n'
+        yield f'LAST-MODIFIED:{_data_ical(linha["atualizado_em"])}\r\n'
+        yield f'DTSTART:{_data_ical(linha["data_hora"])}\r\n'
+        yield f'DTEND:{_data_ical(fim)}\r\n'
+        yield f'STATUS:{_STATUS_ICAL.get(linha["status"], "TENTATIVE")}\r\n'
+        yield _dobrar(f'SUMMARY:{_texto_ical(tipos.get(linha["tipo"], linha["tipo"]))} - {_texto_ical(consulta["animal"]["nome"])}')
+        yield _dobrar(f'DESCRIPTION:{_texto_ical("Tutor: " + consulta["tutor"] + chr(10) + linha["motivo"])}')
+        yield 'END:VEVENT\r\n'
+    yield 'END:VCALENDAR\r\n'
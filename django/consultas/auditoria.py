@@ -0,0 +1,271 @@
+"""
+Registro de auditoria das consultas (HistoricoConsulta) em lote
+
+Em vez de um HistoricoConsulta.objects.create() síncrono a cada ação,
+as views chamam as funções tipadas deste módulo (agendamento(),
+status_alterado(), receita_adicionada(), ...), que apenas montam um
+EventoAuditoria. O evento:
+
+1. só entra no buffer depois do commit da transação em que foi gerado
+   (transaction.on_commit): ações desfeitas por rollback não são auditadas
+2. fica no buffer da requisição atual (AuditoriaMiddleware / lote())
+3. no fim da requisição, todos os eventos são gravados com um único
+   bulk_create; com CONSULTAS_AUDITORIA_ASSINCRONA = True a gravação é
+   entregue a uma thread escritora e sai do caminho da resposta
+
+Fora de uma requisição (comandos, workers) sem lote() ativo o evento
+é gravado logo após o commit.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Consulta, HistoricoConsulta
+
+logger = logging.getLogger(__name__)
+
+_ACOES = dict(HistoricoConsulta.ACAO_CHOICES)
+
+_buffer: ContextVar[list | None] = ContextVar('consultas_auditoria_buffer', default=None)
+
+
+@dataclass(frozen=True)
+class EventoAuditoria:
+    consulta_id: int
+    acao: str
+    usuario_id: int
+    descricao: str
+    dados: dict[str, Any] = field(default_factory=dict)
+    criado_em: datetime = field(default_factory=timezone.now)
+
+    def __post_init__(self):
+        if self.acao not in _ACOES:
+            raise ValueError(f'Ação de histórico desconhecida: {self.acao!r}')
+
+    def para_modelo(self) -> HistoricoConsulta:
+        return HistoricoConsulta(
+            consulta_id=self.consulta_id,
+            acao=self.acao,
+            usuario_id=self.usuario_id,
+            descricao=self.descricao,
+            dados=self.dados,
+            criado_em=self.criado_em,
+        )
+
+
+def _id(objeto) -> int:
+    return getattr(objeto, 'pk', objeto)
+
+
+# ====================================
+# Buffer e gravação
+# ====================================
+
+def registrar(evento: EventoAuditoria) -> EventoAuditoria:
+    """Agenda o evento para depois do commit da transação atual"""
+    transaction.on_commit(partial(_enfileirar, evento))
+    return evento
+
+
+def _enfileirar(evento: EventoAuditoria):
+    buffer = _buffer.get()
+    if buffer is None:
+        gravar([evento])
+    else:
+        buffer.append(evento)
+
+
+@contextmanager
+def lote():
+    """Acumula os eventos do bloco e grava todos ao sair (um bulk_create)"""
+    token = _buffer.set([])
+    try:
+        yield
+    finally:
+        eventos = _buffer.get()
+        _buffer.reset(token)
+        if eventos:
+            gravar(eventos)
+
+
+def gravar(eventos: Iterable[EventoAuditoria]):
+    eventos = list(eventos)
+    if not eventos:
+        return
+    if getattr(settings, 'CONSULTAS_AUDITORIA_ASSINCRONA', False):
+        _escritor().put(eventos)
+    else:
+        _bulk_create(eventos)
+
+
+def _bulk_create(eventos):
+    try:
+        HistoricoConsulta.objects.bulk_create([evento.para_modelo() for evento in eventos])
+    except Exception:
+        logger.exception('Falha ao gravar %d eventos de auditoria: %r', len(eventos), eventos)
+
+
+class _Escritor:
+    """Thread única que grava os lotes recebidos pela fila"""
+
+    def __init__(self):
+        self.fila = queue.Queue()
+        self.thread = threading.Thread(target=self._executar, name='consultas-auditoria', daemon=True)
+        self.thread.start()
+        atexit.register(self.encerrar)
+
+    def put(self, eventos):
+        self.fila.put(eventos)
+
+    def _executar(self):
+        while True:
+            eventos = self.fila.get()
+            if eventos is None:
+                return
+            # junta o que mais estiver na fila em um único INSERT
+            while True:
+                try:
+                    proximos = self.fila.get_nowait()
+                except queue.Empty:
+                    break
+                if proximos is None:
+                    self.fila.put(None)
+                    break
+                eventos.extend(proximos)
+            try:
+                _bulk_create(eventos)
+            finally:
+                close_old_connections()
+
+    def encerrar(self, timeout=5):
+        """Grava o que ainda está na fila antes de o processo terminar"""
+        self.fila.put(None)
+        self.thread.join(timeout)
+
+
+_escritor_instancia = None
+_escritor_lock = threading.Lock()
+
+
+def _escritor():
+    global _escritor_instancia
+    with _escritor_lock:
+        if _escritor_instancia is None:
+            _escritor_instancia = _Escritor()
+    return _escritor_instancia
+
+
+# ====================================
+# API tipada
+# ====================================
+
+def agendamento(consulta: Consulta, usuario) -> EventoAuditoria:
+    data_hora = timezone.localtime(consulta.data_hora)
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao='AGENDAMENTO',
+        usuario_id=_id(usuario),
+        descricao=f'Consulta agendada para {data_hora:%d/%m/%Y às %H:%M}',
+        dados={'data_hora': data_hora.isoformat(), 'tipo': consulta.tipo},
+    ))
+
+
+def status_alterado(consulta: Consulta, usuario, status_anterior: str | None = None) -> EventoAuditoria:
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao='STATUS_ALTERADO',
+        usuario_id=_id(usuario),
+        descricao=f'Status alterado para: {consulta.get_status_display()}',
+        dados={'de': status_anterior, 'para': consulta.status},
+    ))
+
+
+def confirmacao(consulta: Consulta, usuario) -> EventoAuditoria:
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao='CONFIRMACAO',
+        usuario_id=_id(usuario),
+        descricao='Consulta confirmada',
+    ))
+
+
+def cancelamento(consulta: Consulta, usuario, motivo: str = 'pelo veterinário') -> EventoAuditoria:
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao='CANCELAMENTO',
+        usuario_id=_id(usuario),
+        descricao=f'Consulta cancelada {motivo}',
+        dados={'motivo': motivo},
+    ))
+
+
+def inicio_atendimento(consulta: Consulta, usuario) -> EventoAuditoria:
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao='INICIO_ATENDIMENTO',
+        usuario_id=_id(usuario),
+        descricao='Atendimento iniciado',
+    ))
+
+
+def prontuario_criado(consulta: Consulta, usuario) -> EventoAuditoria:
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao='PRONTUARIO_CRIADO',
+        usuario_id=_id(usuario),
+        descricao='Prontuário criado',
+    ))
+
+
+def prontuario_atualizado(consulta: Consulta, usuario, campos: Iterable[str] = ()) -> EventoAuditoria:
+    campos = sorted(campos)
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao='PRONTUARIO_ATUALIZADO',
+        usuario_id=_id(usuario),
+        descricao='Prontuário atualizado',
+        dados={'campos': campos} if campos else {},
+    ))
+
+
+def _evento_receita(acao, verbo, consulta, usuario, medicamento):
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao=acao,
+        usuario_id=_id(usuario),
+        descricao=f'Receita {verbo}: {medicamento}',
+        dados={'medicamento': medicamento},
+    ))
+
+
+def receita_adicionada(consulta: Consulta, usuario, medicamento: str) -> EventoAuditoria:
+    return _evento_receita('RECEITA_ADICIONADA', 'adicionada', consulta, usuario, medicamento)
+
+
+def receita_atualizada(consulta: Consulta, usuario, medicamento: str) -> EventoAuditoria:
+    return _evento_receita('RECEITA_ATUALIZADA', 'atualizada', consulta, usuario, medicamento)
+
+
+def receita_removida(consulta: Consulta, usuario, medicamento: str) -> EventoAuditoria:
+    return _evento_receita('RECEITA_REMOVIDA', 'removida', consulta, usuario, medicamento)
+
+
+def observacao(consulta: Consulta, usuario, texto: str) -> EventoAuditoria:
+    return registrar(EventoAuditoria(
+        consulta_id=_id(consulta),
+        acao='OBSERVACAO',
+        usuario_id=_id(usuario),
+        descricao=texto,
+    ))
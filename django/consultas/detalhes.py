@@ -0,0 +1,70 @@
+"""
+Carregamento da tela de detalhes de uma consulta em número fixo de queries
+
+1. Consulta + animal/tutor/raça/espécie + veterinário + criado_por +
+   prontuário (select_related, inclusive o one-to-one reverso)
+2. receitas do prontuário (Prefetch, só quando existe prontuário)
+3. histórico e 4. histórico arquivado (sempre consultado: o arquivamento
+   pode ter movido eventos de qualquer consulta; ver historico.py)
+
+Usado por ConsultaDetailView e ProntuarioDetailView.
+"""
+
+from dataclasses import dataclass, field
+
+from django.db.models import Prefetch
+
+from .historico import historico_da_consulta
+from .models import Consulta, Prontuario, Receita
+
+
+@dataclass
+class DetalheConsulta:
+    consulta: Consulta
+    prontuario: Prontuario | None
+    receitas: list[Receita] = field(default_factory=list)
+    historico: list = field(default_factory=list)
+
+    def contexto(self):
+        """Variáveis usadas pelo template consultas/consulta_detail.html"""
+        return {
+            'consulta': self.consulta,
+            'prontuario': self.prontuario,
+            'receitas': self.receitas,
+            'historico': self.historico,
+        }
+
+
+def consultas_para_detalhe():
+    """Queryset base com tudo o que a tela de detalhes precisa"""
+    return Consulta.objects.select_related(
+        'animal', 'animal__proprietario', 'animal__raca__tipo_animal', 'animal__tipo_animal',
+        'veterinario', 'criado_por', 'prontuario',
+    ).prefetch_related(
+        Prefetch('prontuario__receitas', queryset=Receita.objects.order_by('medicamento'))
+    )
+
+
+def montar_detalhe(consulta, historico=True):
+    """
+    Monta o DetalheConsulta de uma consulta vinda de consultas_para_detalhe()
+    (prontuário e receitas já estão em memória; nenhuma query extra aqui
+    além do histórico)
+    """
+    # com select_related, o one-to-one reverso inexistente fica em cache como None
+    prontuario = consulta.prontuario if consulta.tem_prontuario else None
+    return DetalheConsulta(
+        consulta=consulta,
+        prontuario=prontuario,
+        receitas=list(prontuario.receitas.all()) if prontuario else [],
+        historico=historico_da_consulta(consulta) if historico else [],
+    )
+
+
+def carregar_detalhe(queryset=None, **filtros):
+    """
+    Busca a consulta pelos filtros (ex: pk=..., veterinario=...) e monta o
+    DetalheConsulta. Levanta Consulta.DoesNotExist se não encontrar.
+    """
+    queryset = queryset if queryset is not None else consultas_para_detalhe()
+    return montar_detalhe(queryset.get(**filtros))
@@ -0,0 +1,123 @@
+"""
+Documento de receita (HTML para impressão) de um prontuário
+
+- o template é compilado uma vez por processo e reaproveitado
+- o HTML gerado fica em cache com a chave (prontuário, atualizado_em);
+  alterar o prontuário ou qualquer receita atualiza atualizado_em
+  (ver Receita.save/delete), então o cache nunca serve versão antiga
+- a geração roda em um pool de threads: solicitar() retorna na hora
+  com a "versão" do documento, que o cliente usa para consultar o
+  status até ficar pronto
+
+Estados: 'gerando' -> 'pronto' | 'erro'; 'desatualizado' quando a versão
+pedida não existe mais (o cliente deve chamar solicitar() de novo)
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .detalhes import consultas_para_detalhe, montar_detalhe
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = 'consultas/receita_documento.html'
+
+# Tempo do documento em cache (segundos); a chave já muda a cada alteração
+DOCUMENTO_TIMEOUT = 60 * 60 * 24 * 7
+STATUS_TIMEOUT = 60 * 10
+
+PRONTO = 'pronto'
+GERANDO = 'gerando'
+ERRO = 'erro'
+DESATUALIZADO = 'desatualizado'
+
+_template = None
+_executor = None
+
+
+def _get_template():
+    """Template compilado uma única vez por processo"""
+    global _template
+    if _template is None:
+        _template = get_template(TEMPLATE)
+    return _template
+
+
+def _get_executor():
+    """Cria o pool de workers sob demanda (um por processo)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'CONSULTAS_DOCUMENTOS_WORKERS', 2),
+            thread_name_prefix='consultas-documentos',
+        )
+    return _executor
+
+
+def versao(prontuario):
+    """Identificador da versão atual do documento (muda a cada alteração)"""
+    return f'{prontuario.atualizado_em.timestamp():.6f}'
+
+
+def _chave_documento(prontuario_id, versao):
+    return f'consultas:receita_doc:{prontuario_id}:{versao}'
+
+
+def _chave_status(prontuario_id, versao):
+    return f'consultas:receita_doc_status:{prontuario_id}:{versao}'
+
+
+def status(prontuario_id, versao):
+    if cache.get(_chave_documento(prontuario_id, versao)) is not None:
+        return PRONTO
+    return cache.get(_chave_status(prontuario_id, versao), DESATUALIZADO)
+
+
+def documento(prontuario_id, versao):
+    """HTML em cache ou None"""
+    return cache.get(_chave_documento(prontuario_id, versao))
+
+
+def renderizar(prontuario_id):
+    """Renderiza o documento da versão atual e guarda no cache. Retorna (versao, html)."""
+    consulta = consultas_para_detalhe().get(prontuario__pk=prontuario_id)
+    detalhe = montar_detalhe(consulta, historico=False)
+    html = _get_template().render({**detalhe.contexto(), 'emitido_em': timezone.now()})
+    versao_atual = versao(detalhe.prontuario)
+    cache.set(_chave_documento(prontuario_id, versao_atual), html, DOCUMENTO_TIMEOUT)
+    return versao_atual, html
+
+
+def _gerar(prontuario_id, versao_solicitada):
+    """Executado no worker"""
+    try:
+        versao_gerada, _ = renderizar(prontuario_id)
+        if versao_gerada != versao_solicitada:
+            # o prontuário mudou durante a geração; a versão pedida não existe mais
+            cache.set(_chave_status(prontuario_id, versao_solicitada), DESATUALIZADO, STATUS_TIMEOUT)
+    except Exception:
+        logger.exception('Erro ao gerar receita do prontuário %s', prontuario_id)
+        cache.set(_chave_status(prontuario_id, versao_solicitada), ERRO, STATUS_TIMEOUT)
+    finally:
+        # Threads do pool não passam pelo ciclo de requisição do Django
+        close_old_connections()
+
+
+def solicitar(prontuario):
+    """
+    Garante que o documento da versão atual está pronto ou sendo gerado.
+    Retorna (versao, status) sem esperar a renderização.
+    """
+    versao_atual = versao(prontuario)
+    if documento(prontuario.pk, versao_atual) is not None:
+        return versao_atual, PRONTO
+    # cache.add: só o primeiro pedido de cada versão agenda a geração
+    if cache.add(_chave_status(prontuario.pk, versao_atual), GERANDO, STATUS_TIMEOUT):
+        _get_executor().submit(_gerar, prontuario.pk, versao_atual)
+    return versao_atual, GERANDO
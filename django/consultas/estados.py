@@ -0,0 +1,179 @@
+"""
+Máquina de estados de Consulta.status
+
+Cada transição é um único UPDATE condicional (compare-and-swap):
+
+    UPDATE consulta SET status = <destino>, atualizado_em = now()
+     WHERE id = <id> AND status IN (<origens permitidas>)
+
+Se outra requisição mudou o status no meio do caminho, o UPDATE não
+encontra a linha e TransicaoInvalida é levantada; não existe janela
+entre ler e gravar o status. O evento de auditoria é registrado na
+mesma transação (só é gravado se o UPDATE for confirmado; ver auditoria.py).
+
+As transições permitidas ficam em Consulta.TRANSICOES (destino -> origens),
+usadas também por Consulta.pode_*() nos templates.
+
+Operações em lote (confirmar o dia seguinte, registrar faltas, cancelar
+o dia de um veterinário) usam transicionar_em_lote(): as linhas são
+travadas (SELECT ... FOR UPDATE), atualizadas com um único UPDATE e o
+histórico é gravado com um único bulk_create, a cada lote de ids. As
+operações pedidas pela equipe esperam as linhas travadas (ex: consulta
+em edição) para não deixar nenhuma de fora; só o comando periódico
+registrar_faltas pula as travadas (SKIP LOCKED), que ficam para a
+próxima execução.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from app.fragmentos import invalidar_ao_confirmar
+from users import portal
+
+from . import auditoria
+from .models import Consulta
+
+
+class TransicaoInvalida(Exception):
+    """O status atual da consulta não permite a transição"""
+
+    def __init__(self, consulta, destino):
+        self.consulta = consulta
+        self.destino = destino
+        super().__init__(
+            f'Consulta {consulta.pk} não pode passar de {consulta.status} para {destino}'
+        )
+
+
+def _registrar_evento(consulta, usuario, status_anterior, motivo=None):
+    if consulta.status == 'CONFIRMADA':
+        auditoria.confirmacao(consulta, usuario)
+    elif consulta.status == 'EM_ATENDIMENTO':
+        auditoria.inicio_atendimento(consulta, usuario)
+    elif consulta.status == 'CANCELADA':
+        auditoria.cancelamento(consulta, usuario, motivo or 'pelo veterinário')
+    else:
+        auditoria.status_alterado(consulta, usuario, status_anterior)
+
+
+def transicionar(consulta, destino, usuario, motivo=None):
+    """
+    Move a consulta para o status destino. Atualiza a instância em memória
+    (status e atualizado_em) e retorna a própria consulta.
+    Levanta TransicaoInvalida se o status no banco não permitir a transição.
+    """
+    origens = Consulta.TRANSICOES[destino]
+    status_anterior = consulta.status
+    agora = timezone.now()
+    with transaction.atomic():
+        alteradas = (
+            Consulta.objects.filter(pk=consulta.pk, status__in=origens)
+            .update(status=destino, atualizado_em=agora)
+        )
+        if not alteradas:
+            raise TransicaoInvalida(consulta, destino)
+        consulta.status = destino
+        consulta.atualizado_em = agora
+        _registrar_evento(consulta, usuario, status_anterior, motivo)
+        invalidar_ao_confirmar('consultas')
+        portal.invalidar_animais_ao_confirmar([consulta.animal_id])
+    return consulta
+
+
+def confirmar(consulta, usuario):
+    return transicionar(consulta, 'CONFIRMADA', usuario)
+
+
+def iniciar_atendimento(consulta, usuario):
+    return transicionar(consulta, 'EM_ATENDIMENTO', usuario)
+
+
+def finalizar(consulta, usuario):
+    return transicionar(consulta, 'REALIZADA', usuario)
+
+
+def cancelar(consulta, usuario, motivo='pelo veterinário'):
+    return transicionar(consulta, 'CANCELADA', usuario, motivo)
+
+
+def registrar_falta(consulta, usuario):
+    return transicionar(consulta, 'FALTOU', usuario)
+
+
+# ====================================
+# Operações em lote
+# ====================================
+
+def _dia(dia):
+    """[início, fim) do dia no fuso local"""
+    inicio = timezone.make_aware(datetime.combine(dia, time.min))
+    return inicio, timezone.make_aware(datetime.combine(dia + timedelta(days=1), time.min))
+
+
+def transicionar_em_lote(consultas, destino, usuario=None, motivo=None, lote=1000, pular_travadas=False):
+    """
+    Aplica a transição a todas as consultas do queryset cujo status permite.
+    Cada lote (por id) é uma transação: trava as linhas, um UPDATE, um
+    INSERT de histórico. Sem usuario, o histórico é atribuído ao veterinário
+    da consulta (processamento automático). Com pular_travadas, linhas
+    travadas por outra transação ficam de fora em vez de esperar.
+    Retorna a quantidade alterada.
+    """
+    origens = Consulta.TRANSICOES[destino]
+    total = 0
+    ultimo_id = 0
+    while True:
+        # lote() junta os eventos de auditoria do bloco em um único bulk_create
+        with auditoria.lote(), transaction.atomic():
+            linhas = list(
+                consultas.filter(status__in=origens, id__gt=ultimo_id)
+                .select_for_update(skip_locked=pular_travadas)
+                .order_by('id')
+                .values_list('id', 'status', 'veterinario_id')[:lote]
+            )
+            if not linhas:
+                return total
+            ultimo_id = linhas[-1][0]
+
+            agora = timezone.now()
+            total += Consulta.objects.filter(id__in=[linha[0] for linha in linhas]).update(
+                status=destino, atualizado_em=agora
+            )
+            for consulta_id, status_anterior, veterinario_id in linhas:
+                consulta = Consulta(pk=consulta_id, status=destino, atualizado_em=agora)
+                _registrar_evento(consulta, usuario or veterinario_id, status_anterior, motivo)
+            invalidar_ao_confirmar('consultas')
+            portal.invalidar_consultas_ao_confirmar([linha[0] for linha in linhas])
+        if len(linhas) < lote:
+            return total
+
+
+def confirmar_do_dia(dia=None, usuario=None, veterinario=None):
+    """Confirma as consultas agendadas do dia (padrão: amanhã)"""
+    dia = dia or timezone.localdate() + timedelta(days=1)
+    inicio, fim = _dia(dia)
+    consultas = Consulta.objects.filter(data_hora__gte=inicio, data_hora__lt=fim)
+    if veterinario is not None:
+        consultas = consultas.filter(veterinario=veterinario)
+    return transicionar_em_lote(consultas, 'CONFIRMADA', usuario)
+
+
+def registrar_faltas(tolerancia=timedelta(hours=1), usuario=None, veterinario=None, pular_travadas=False):
+    """
+    Marca como FALTOU as consultas agendadas/confirmadas que terminaram há
+    mais de `tolerancia` sem o atendimento ter sido iniciado
+    (pular_travadas: ver transicionar_em_lote)
+    """
+    consultas = Consulta.objects.filter(data_hora_fim__lt=timezone.now() - tolerancia)
+    if veterinario is not None:
+        consultas = consultas.filter(veterinario=veterinario)
+    return transicionar_em_lote(consultas, 'FALTOU', usuario, pular_travadas=pular_travadas)
+
+
+def cancelar_dia(veterinario, dia, usuario, motivo='pelo veterinário'):
+    """Cancela todas as consultas ainda não atendidas do veterinário no dia"""
+    inicio, fim = _dia(dia)
+    consultas = Consulta.objects.filter(veterinario=veterinario, data_hora__gte=inicio, data_hora__lt=fim)
+    return transicionar_em_lote(consultas, 'CANCELADA', usuario, motivo)
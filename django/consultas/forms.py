@@ -71,9 +71,7 @@ class ConsultaForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Filtra animais ativos
-        self.fields['animal'].queryset = Animal.objects.filter(
-            ativo=True
-        ).select_related('proprietario', 'raca', 'tipo_animal')
+        self.fields['animal'].queryset = Animal.ativos.select_related('proprietario', 'raca', 'tipo_animal')
     
     def clean_data_hora(self):
         """Valida a data/hora da consulta"""
@@ -113,15 +111,24 @@ class ConsultaForm(forms.ModelForm):
 
 class ConsultaUpdateForm(ConsultaForm):
     """
-    Formulário para atualizar consultas (inclui campo de status)
+    Formulário para atualizar consultas. O status não é gravado pelo
+    formulário: novo_status oferece só as transições permitidas a partir do
+    status atual, aplicadas pela view com estados.transicionar (UPDATE
+    condicional + histórico).
     """
     
-    status = forms.ChoiceField(
-        choices=Consulta.STATUS_CHOICES,
-        label='Status',
+    novo_status = forms.ChoiceField(
+        label='Alterar Status',
+        required=False,
         widget=forms.Select(attrs={'class': 'form-control'}),
     )
     
-    class Meta:
-        model = Consulta
-        fields = ['animal', 'data_hora', 'tipo', 'status', 'motivo', 'observacoes']
+    class Meta(ConsultaForm.Meta):
+        pass
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['novo_status'].choices = [('', f'Manter ({self.instance.get_status_display()})')] + [
+            (status, nome) for status, nome in Consulta.STATUS_CHOICES
+            if self.instance.pode_mudar_para(status)
+        ]
@@ -0,0 +1,64 @@
+"""
+Leitura e arquivamento do histórico das consultas
+
+HistoricoConsulta guarda apenas os últimos CONSULTAS_HISTORICO_MESES
+meses; o resto é movido em lotes para HistoricoConsultaArquivo pelo
+comando arquivar_historico. As duas tabelas têm índice em
+(consulta_id, criado_em DESC), então ler o histórico de uma consulta
+custa O(entradas da consulta), independente do tamanho das tabelas.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import HistoricoConsulta, HistoricoConsultaArquivo
+
+_CAMPOS = ('id', 'consulta_id', 'acao', 'descricao', 'usuario_id', 'dados', 'criado_em')
+
+
+def limite_arquivamento(meses=None, agora=None):
+    """Instante a partir do qual o histórico ainda fica na tabela principal"""
+    meses = meses if meses is not None else settings.CONSULTAS_HISTORICO_MESES
+    return (agora or timezone.now()) - timedelta(days=30 * meses)
+
+
+def historico_da_consulta(consulta):
+    """
+    Histórico completo da consulta, do mais recente para o mais antigo.
+    O arquivo é sempre consultado: arquivar_historico --meses pode usar um
+    limite diferente do das settings, e o índice (consulta_id, criado_em)
+    deixa a busca barata mesmo quando não há nada arquivado.
+    """
+    historico = list(consulta.historico.select_related('usuario').order_by('-criado_em'))
+    historico += list(consulta.historico_arquivado.select_related('usuario').order_by('-criado_em'))
+    return historico
+
+
+def arquivar(antes_de=None, lote=5000):
+    """
+    Move para o arquivo as entradas criadas antes de `antes_de`, uma
+    transação por lote (SKIP LOCKED permite rodar em paralelo).
+    Retorna o total movido.
+    """
+    antes_de = antes_de or limite_arquivamento()
+    total = 0
+    while True:
+        with transaction.atomic():
+            linhas = list(
+                HistoricoConsulta.objects.select_for_update(skip_locked=True)
+                .filter(criado_em__lt=antes_de)
+                .order_by('criado_em', 'id')
+                .values(*_CAMPOS)[:lote]
+            )
+            if linhas:
+                HistoricoConsultaArquivo.objects.bulk_create(
+                    [HistoricoConsultaArquivo(**linha) for linha in linhas],
+                    ignore_conflicts=True,
+                )
+                HistoricoConsulta.objects.filter(id__in=[linha['id'] for linha in linhas]).delete()
+        total += len(linhas)
+        if len(linhas) < lote:
+            return total
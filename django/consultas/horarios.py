@@ -0,0 +1,202 @@
+"""
+Motor de agenda dos veterinários
+
+- expediente: HorarioTrabalho por veterinário e dia da semana
+  (sem cadastro vale settings.CONSULTAS_EXPEDIENTE_PADRAO)
+- duração: Consulta.DURACAO_MINUTOS por tipo de atendimento
+- ocupação: consultas ativas (status fora de Consulta.STATUS_LIVRES)
+
+Os horários ocupados de toda a equipe na janela pesquisada são lidos em
+uma única query e guardados, por veterinário, como listas ordenadas de
+intervalos disjuntos. A busca do primeiro espaço livre a partir de um
+instante usa bisect sobre os términos (O(log n)) e percorre só os
+intervalos seguintes, então "próximo horário livre de qualquer
+veterinário" custa duas queries e alguns microssegundos por veterinário.
+
+A garantia contra sobreposição continua sendo do banco (exclusion
+constraint no PostgreSQL) e de Consulta.clean().
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from users.models import User
+from .models import Consulta, HorarioTrabalho
+
+
+def duracao(tipo):
+    return timedelta(minutes=Consulta.DURACAO_MINUTOS.get(tipo, 30))
+
+
+def _passo():
+    return timedelta(minutes=getattr(settings, 'CONSULTAS_PASSO_MINUTOS', 15))
+
+
+def _expediente_padrao():
+    padrao = getattr(settings, 'CONSULTAS_EXPEDIENTE_PADRAO', {})
+    return {
+        int(dia): [(time.fromisoformat(inicio), time.fromisoformat(fim)) for inicio, fim in faixas]
+        for dia, faixas in padrao.items()
+    }
+
+
+def _veterinarios(veterinarios=None):
+    """Veterinários ativos com o expediente pré-carregado (1 query + prefetch)"""
+    queryset = User.objects.filter(user_type=User.VETERINARIO, is_active=True)
+    if veterinarios is not None:
+        queryset = queryset.filter(pk__in=[getattr(v, 'pk', v) for v in veterinarios])
+    return list(
+        queryset.order_by('pk').prefetch_related(
+            Prefetch('horarios_trabalho', queryset=HorarioTrabalho.objects.order_by('dia_semana', 'inicio'))
+        )
+    )
+
+
+def expediente(veterinario):
+    """{dia_semana: [(inicio, fim), ...]} do veterinário"""
+    faixas = defaultdict(list)
+    for horario in veterinario.horarios_trabalho.all():
+        faixas[horario.dia_semana].append((horario.inicio, horario.fim))
+    return dict(faixas) if faixas else _expediente_padrao()
+
+
+class Ocupacao:
+    """
+    Intervalos ocupados de um veterinário, ordenados e fundidos.
+    Como são disjuntos, os términos também ficam ordenados e servem de
+    índice para o bisect.
+    """
+
+    def __init__(self, intervalos=()):
+        self.inicios = []
+        self.fins = []
+        for inicio, fim in sorted(intervalos):
+            if self.fins and inicio <= self.fins[-1]:
+                self.fins[-1] = max(self.fins[-1], fim)
+            else:
+                self.inicios.append(inicio)
+                self.fins.append(fim)
+
+    def primeiro_livre(self, a_partir_de, ate, duracao, alinhar):
+        """
+        Primeiro início >= a_partir_de (alinhado com alinhar()) em que cabe
+        `duracao` sem sobrepor nenhum intervalo e terminando até `ate`
+        """
+        candidato = alinhar(a_partir_de)
+        # primeiro intervalo que ainda não terminou em `candidato`
+        i = bisect_right(self.fins, candidato)
+        while candidato + duracao <= ate:
+            if i == len(self.inicios) or self.inicios[i] >= candidato + duracao:
+                return candidato
+            candidato = alinhar(max(candidato, self.fins[i]))
+            i += 1
+        return None
+
+
+def _ocupacoes(veterinario_ids, inicio, fim):
+    """{veterinario_id: Ocupacao} da janela [inicio, fim) em uma única query"""
+    intervalos = defaultdict(list)
+    consultas = (
+        Consulta.objects.filter(
+            veterinario_id__in=veterinario_ids,
+            data_hora__lt=fim,
+            data_hora_fim__gt=inicio,
+        )
+        .exclude(status__in=Consulta.STATUS_LIVRES)
+        .values_list('veterinario_id', 'data_hora', 'data_hora_fim')
+    )
+    for veterinario_id, data_hora, data_hora_fim in consultas:
+        intervalos[veterinario_id].append((data_hora, data_hora_fim))
+    return defaultdict(Ocupacao, {vid: Ocupacao(lista) for vid, lista in intervalos.items()})
+
+
+def _alinhador(dia):
+    """Arredonda um instante para cima na grade de CONSULTAS_PASSO_MINUTOS do dia"""
+    meia_noite = timezone.make_aware(datetime.combine(dia, time.min))
+    passo = _passo()
+
+    def alinhar(instante):
+        resto = (instante - meia_noite) % passo
+        return instante + (passo - resto) if resto else instante
+
+    return alinhar
+
+
+def _faixas_do_dia(faixas_por_dia, dia):
+    for inicio, fim in faixas_por_dia.get(dia.weekday(), []):
+        yield (
+            timezone.make_aware(datetime.combine(dia, inicio)),
+            timezone.make_aware(datetime.combine(dia, fim)),
+        )
+
+
+def horarios_livres(veterinario, dia, tipo='CONSULTA', a_partir_de=None):
+    """
+    Lista os inícios possíveis (datetimes aware) para um atendimento do
+    tipo informado no dia, respeitando expediente e consultas existentes
+    """
+    veterinarios = _veterinarios([veterinario])
+    if not veterinarios:
+        return []
+    veterinario = veterinarios[0]
+
+    a_partir_de = max(a_partir_de or timezone.now(), timezone.make_aware(datetime.combine(dia, time.min)))
+    faixas = list(_faixas_do_dia(expediente(veterinario), dia))
+    if not faixas:
+        return []
+
+    ocupacao = _ocupacoes([veterinario.pk], faixas[0][0], faixas[-1][1])[veterinario.pk]
+    alinhar = _alinhador(dia)
+    tamanho, passo = duracao(tipo), _passo()
+
+    livres = []
+    for inicio, fim in faixas:
+        candidato = max(inicio, a_partir_de)
+        while True:
+            candidato = ocupacao.primeiro_livre(candidato, fim, tamanho, alinhar)
+            if candidato is None:
+                break
+            livres.append(candidato)
+            candidato += passo
+    return livres
+
+
+def proximo_horario_livre(tipo='CONSULTA', a_partir_de=None, veterinarios=None, dias=14):
+    """
+    Primeiro horário livre de qualquer veterinário (ou dos informados)
+    nos próximos `dias`. Retorna (veterinario, inicio, fim) ou None.
+    Em caso de empate vence o veterinário de menor id.
+    """
+    agora = a_partir_de or timezone.now()
+    equipe = _veterinarios(veterinarios)
+    if not equipe:
+        return None
+
+    expedientes = {v.pk: expediente(v) for v in equipe}
+    primeiro_dia = timezone.localtime(agora).date()
+    janela_fim = timezone.make_aware(datetime.combine(primeiro_dia + timedelta(days=dias), time.min))
+    ocupacoes = _ocupacoes([v.pk for v in equipe], agora, janela_fim)
+    tamanho = duracao(tipo)
+
+    for deslocamento in range(dias):
+        dia = primeiro_dia + timedelta(days=deslocamento)
+        alinhar = _alinhador(dia)
+        melhor = None
+        for veterinario in equipe:
+            for inicio, fim in _faixas_do_dia(expedientes[veterinario.pk], dia):
+                if fim <= agora:
+                    continue
+                livre = ocupacoes[veterinario.pk].primeiro_livre(max(inicio, agora), fim, tamanho, alinhar)
+                if livre is not None:
+                    if melhor is None or livre < melhor[1]:
+                        melhor = (veterinario, livre)
+                    break
+        if melhor:
+            veterinario, inicio = melhor
+            return veterinario, inicio, inicio + tamanho
+    return None
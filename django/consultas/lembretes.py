@@ -0,0 +1,134 @@
+"""
+Lembretes de consulta: um e-mail por cliente com todas as suas consultas
+agendadas/confirmadas da janela (padrão: próximas 24h)
+
+1. varredura: percorre a janela pelo índice parcial consulta_lembrete_idx
+   (data_hora, id) em lotes (keyset), guardando só (consulta, tutor)
+2. os tutores são processados em grupos; para cada grupo, uma transação
+   curta trava as consultas (SKIP LOCKED: execuções simultâneas não
+   disputam as mesmas linhas) e marca lembrete_enviado_para = data_hora
+3. os e-mails são enviados fora da transação, por uma única conexão do
+   backend de e-mail configurado (console/arquivo localmente, SMTP em
+   produção); se o envio de um cliente falha, a marcação dele é desfeita
+   e a próxima execução tenta de novo
+
+Consultas já avisadas para o horário atual não entram na varredura, então
+rodar de novo não reenvia nada; remarcar a consulta gera um novo lembrete.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Consulta
+
+logger = logging.getLogger(__name__)
+
+STATUS_LEMBRETE = ('AGENDADA', 'CONFIRMADA')
+TEMPLATE = 'consultas/email/lembrete_consultas.txt'
+
+
+def pendentes(inicio, fim):
+    """Consultas da janela [inicio, fim) ainda sem lembrete para o horário atual"""
+    return (
+        Consulta.objects.filter(status__in=STATUS_LEMBRETE, data_hora__gte=inicio, data_hora__lt=fim)
+        .exclude(lembrete_enviado_para=F('data_hora'))
+    )
+
+
+def _consultas_por_tutor(inicio, fim, lote):
+    """{proprietario_id: [consulta_id, ...]}, lendo a janela em lotes por (data_hora, id)"""
+    grupos = defaultdict(list)
+    consultas = pendentes(inicio, fim).order_by('data_hora', 'id')
+    ultimo = None
+    while True:
+        pagina = consultas
+        if ultimo is not None:
+            data_hora, consulta_id = ultimo
+            pagina = pagina.filter(Q(data_hora__gt=data_hora) | Q(data_hora=data_hora, id__gt=consulta_id))
+        linhas = list(pagina.values_list('data_hora', 'id', 'animal__proprietario_id')[:lote])
+        for _, consulta_id, proprietario_id in linhas:
+            grupos[proprietario_id].append(consulta_id)
+        if len(linhas) < lote:
+            return grupos
+        ultimo = linhas[-1][:2]
+
+
+def _reservar(ids, inicio, fim):
+    """Trava e marca como avisadas as consultas (ainda pendentes) do grupo"""
+    with transaction.atomic():
+        consultas = list(
+            pendentes(inicio, fim).filter(id__in=ids)
+            .select_related('animal__proprietario', 'veterinario')
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('data_hora')
+        )
+        for consulta in consultas:
+            consulta.lembrete_enviado_para = consulta.data_hora
+        Consulta.objects.bulk_update(consultas, ['lembrete_enviado_para'])
+    return consultas
+
+
+def _desfazer(consultas):
+    Consulta.objects.filter(
+        id__in=[c.id for c in consultas], lembrete_enviado_para=F('data_hora')
+    ).update(lembrete_enviado_para=None)
+
+
+def mensagem(proprietario, consultas):
+    """E-mail de lembrete de um tutor (consultas em ordem de horário)"""
+    plural = len(consultas) > 1
+    primeira = timezone.localtime(consultas[0].data_hora)
+    return EmailMessage(
+        subject=(
+            f'Lembrete: {len(consultas)} consultas agendadas' if plural
+            else f'Lembrete: consulta de {consultas[0].animal.nome} em {primeira:%d/%m às %H:%M}'
+        ),
+        body=render_to_string(TEMPLATE, {'proprietario': proprietario, 'consultas': consultas}),
+        to=[proprietario.email],
+    )
+
+
+def enviar_lembretes(antecedencia=None, lote=5000, tutores_por_grupo=500, backend=None):
+    """
+    Envia os lembretes pendentes da janela [agora, agora + antecedencia).
+    Retorna {'clientes', 'consultas', 'sem_email', 'falhas'}.
+    """
+    antecedencia = antecedencia or timedelta(hours=settings.CONSULTAS_LEMBRETES_ANTECEDENCIA_HORAS)
+    inicio = timezone.now()
+    fim = inicio + antecedencia
+    resultado = {'clientes': 0, 'consultas': 0, 'sem_email': 0, 'falhas': 0}
+
+    grupos = _consultas_por_tutor(inicio, fim, lote)
+    tutores = sorted(grupos)
+    conexao = get_connection(backend or settings.CONSULTAS_LEMBRETES_EMAIL_BACKEND)
+
+    with conexao:
+        for i in range(0, len(tutores), tutores_por_grupo):
+            ids = [cid for tutor in tutores[i:i + tutores_por_grupo] for cid in grupos[tutor]]
+            por_tutor = defaultdict(list)
+            for consulta in _reservar(ids, inicio, fim):
+                por_tutor[consulta.animal.proprietario].append(consulta)
+
+            for proprietario, consultas in por_tutor.items():
+                if not proprietario.email:
+                    # fica marcada: sem e-mail não há o que reenviar
+                    resultado['sem_email'] += 1
+                    continue
+                try:
+                    conexao.send_messages([mensagem(proprietario, consultas)])
+                except Exception:
+                    logger.exception('Falha ao enviar lembrete para %s', proprietario.email)
+                    _desfazer(consultas)
+                    resultado['falhas'] += 1
+                    continue
+                resultado['clientes'] += 1
+                resultado['consultas'] += len(consultas)
+    return resultado
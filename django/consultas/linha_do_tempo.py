@@ -0,0 +1,91 @@
+"""
+Linha do tempo clínica de um animal
+
+Todas as consultas do animal com sinais vitais, diagnóstico e receitas,
+em ordem cronológica, mais as séries temporais dos sinais vitais em
+formato compacto para gráficos:
+
+    'series': {'peso': {'datas': [...], 'valores': [...]}, ...}
+
+Custa duas queries, independente do número de consultas:
+1. consultas + prontuário (LEFT JOIN) pelo índice (animal, data_hora)
+2. receitas de todos os prontuários do animal
+"""
+
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .models import Consulta, Receita
+
+SINAIS_VITAIS = ('peso', 'temperatura', 'frequencia_cardiaca', 'frequencia_respiratoria')
+
+_CAMPOS = (
+    'id', 'data_hora', 'tipo', 'status', 'motivo',
+    'veterinario__first_name', 'veterinario__last_name', 'veterinario__username',
+    'prontuario__id', 'prontuario__diagnostico', 'prontuario__tratamento',
+    *(f'prontuario__{campo}' for campo in SINAIS_VITAIS),
+)
+
+
+def _numero(valor):
+    return float(valor) if valor is not None else None
+
+
+def _nome(linha):
+    nome = ' '.join(filter(None, [linha['veterinario__first_name'], linha['veterinario__last_name']]))
+    return nome or linha['veterinario__username']
+
+
+def linha_do_tempo(animal):
+    consultas = list(
+        Consulta.objects.filter(animal=animal)
+        .order_by('data_hora', 'id')
+        .values(*_CAMPOS)
+    )
+
+    receitas = defaultdict(list)
+    linhas_receitas = (
+        Receita.objects.filter(prontuario__consulta__animal=animal)
+        .order_by('prontuario__consulta_id', 'medicamento')
+        .values_list('prontuario__consulta_id', 'medicamento', 'dosagem', 'frequencia', 'duracao')
+    )
+    for consulta_id, medicamento, dosagem, frequencia, duracao in linhas_receitas:
+        receitas[consulta_id].append(
+            {'medicamento': medicamento, 'dosagem': dosagem, 'frequencia': frequencia, 'duracao': duracao}
+        )
+
+    tipos = dict(Consulta.TIPO_CHOICES)
+    status = dict(Consulta.STATUS_CHOICES)
+    series = {campo: {'datas': [], 'valores': []} for campo in SINAIS_VITAIS}
+    visitas = []
+
+    for linha in consultas:
+        data_hora = timezone.localtime(linha['data_hora']).isoformat()
+        sinais = {campo: _numero(linha[f'prontuario__{campo}']) for campo in SINAIS_VITAIS}
+        for campo, valor in sinais.items():
+            if valor is not None:
+                series[campo]['datas'].append(data_hora)
+                series[campo]['valores'].append(valor)
+
+        visitas.append({
+            'consulta': linha['id'],
+            'data_hora': data_hora,
+            'tipo': linha['tipo'],
+            'tipo_display': tipos.get(linha['tipo'], linha['tipo']),
+            'status': linha['status'],
+            'status_display': status.get(linha['status'], linha['status']),
+            'motivo': linha['motivo'],
+            'veterinario': _nome(linha),
+            'prontuario': linha['prontuario__id'],
+            'sinais_vitais': sinais,
+            'diagnostico': linha['prontuario__diagnostico'] or '',
+            'tratamento': linha['prontuario__tratamento'] or '',
+            'receitas': receitas.get(linha['id'], []),
+        })
+
+    return {
+        'animal': {'id': animal.pk, 'nome': animal.nome},
+        'visitas': visitas,
+        'series': series,
+    }
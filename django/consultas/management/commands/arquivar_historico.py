@@ -0,0 +1,32 @@
+"""
+Management command para mover o histórico antigo das consultas para o arquivo
+Deve rodar periodicamente (ex: cron diário fora do horário de atendimento)
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from consultas.historico import arquivar, limite_arquivamento
+
+
+class Command(BaseCommand):
+    help = 'Move HistoricoConsulta mais antigo que N meses para HistoricoConsultaArquivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses',
+            type=int,
+            default=settings.CONSULTAS_HISTORICO_MESES,
+            help=f'Mantém na tabela principal os últimos N meses (padrão: {settings.CONSULTAS_HISTORICO_MESES})'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Quantidade de entradas movidas por transação (padrão: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        antes_de = limite_arquivamento(options['meses'])
+        self.stdout.write(f'📦 Arquivando histórico anterior a {antes_de:%d/%m/%Y}...')
+        total = arquivar(antes_de, lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} entrada(s) de histórico arquivada(s)'))
@@ -0,0 +1,44 @@
+"""
+Management command para enviar os lembretes de consulta manualmente
+(o worker de tarefas já envia a cada 15 minutos; ver consultas/tarefas.py)
+
+Para testar localmente contra um servidor SMTP de teste:
+
+    python -m aiosmtpd -n -l localhost:1025
+    python manage.py enviar_lembretes --backend django.core.mail.backends.smtp.EmailBackend
+    (com EMAIL_HOST=localhost e EMAIL_PORT=1025)
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from consultas.lembretes import enviar_lembretes
+
+
+class Command(BaseCommand):
+    help = 'Envia um e-mail de lembrete por cliente com as consultas das próximas horas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horas',
+            type=int,
+            default=settings.CONSULTAS_LEMBRETES_ANTECEDENCIA_HORAS,
+            help=f'Janela de consultas a partir de agora (padrão: {settings.CONSULTAS_LEMBRETES_ANTECEDENCIA_HORAS}h)'
+        )
+        parser.add_argument(
+            '--backend',
+            default=None,
+            help='Backend de e-mail (padrão: CONSULTAS_LEMBRETES_EMAIL_BACKEND)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'📨 Enviando lembretes das próximas {options["horas"]}h...')
+        resultado = enviar_lembretes(antecedencia=timedelta(hours=options['horas']), backend=options['backend'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {resultado["clientes"]} cliente(s) avisado(s) sobre {resultado["consultas"]} consulta(s)'
+        ))
+        if resultado['sem_email']:
+            self.stdout.write(self.style.WARNING(f'⚠️  {resultado["sem_email"]} cliente(s) sem e-mail cadastrado'))
+        if resultado['falhas']:
+            self.stdout.write(self.style.ERROR(f'❌ {resultado["falhas"]} envio(s) falharam (serão tentados de novo)'))
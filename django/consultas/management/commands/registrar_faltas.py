@@ -0,0 +1,29 @@
+"""
+Management command para marcar automaticamente as faltas (status FALTOU)
+Deve rodar periodicamente (ex: cron a cada hora ou no fim do expediente)
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from consultas.estados import registrar_faltas
+
+
+class Command(BaseCommand):
+    help = 'Marca como FALTOU as consultas agendadas/confirmadas que já terminaram sem atendimento'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tolerancia',
+            type=int,
+            default=60,
+            help='Minutos após o fim previsto da consulta antes de registrar a falta (padrão: 60)'
+        )
+
+    def handle(self, *args, **options):
+        tolerancia = timedelta(minutes=options['tolerancia'])
+        self.stdout.write(f'🔎 Procurando consultas encerradas há mais de {options["tolerancia"]} minuto(s) sem atendimento...')
+        # histórico atribuído ao veterinário de cada consulta; consultas
+        # travadas por outra transação ficam para a próxima execução
+        total = registrar_faltas(tolerancia=tolerancia, pular_travadas=True)
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} falta(s) registrada(s)'))
@@ -0,0 +1,31 @@
+"""
+Management command para vincular as receitas existentes ao catálogo de medicamentos
+"""
+
+from django.core.management.base import BaseCommand
+from consultas.medicamentos import vincular_receitas
+
+
+class Command(BaseCommand):
+    help = 'Preenche Receita.medicamento_catalogo pelo nome (ou alias) do medicamento, em lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Quantidade de receitas processadas por transação (padrão: 1000)'
+        )
+        parser.add_argument(
+            '--criar',
+            action='store_true',
+            help='Cria no catálogo os medicamentos sem correspondência'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('💊 Vinculando receitas ao catálogo de medicamentos...')
+        resultado = vincular_receitas(lote=options['lote'], criar=options['criar'])
+        self.stdout.write(f"   Receitas sem vínculo processadas: {resultado['processadas']}")
+        if options['criar']:
+            self.stdout.write(f"   Medicamentos criados no catálogo: {resultado['criados']}")
+        self.stdout.write(self.style.SUCCESS(f"✅ {resultado['vinculadas']} receita(s) vinculada(s)"))
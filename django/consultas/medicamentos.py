@@ -0,0 +1,128 @@
+"""
+Catálogo de medicamentos: resolução de nomes digitados e buscas
+
+- resolver_id(): nome digitado -> id do Medicamento (nome ou alias normalizado,
+  busca exata pelos índices únicos de nome_normalizado)
+- buscar(): autocomplete/busca aproximada; no PostgreSQL usa similaridade
+  de trigramas (pg_trgm, índice GIN criado na migration 0008); nos
+  demais bancos cai para contains sobre o nome normalizado
+- vincular_receitas(): backfill em lotes de Receita.medicamento_catalogo
+  (comando vincular_medicamentos)
+- animais_com_medicamento(): farmacovigilância pelo índice
+  (medicamento_catalogo, criado_em) de Receita
+"""
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from pets.models import Animal
+from .models import Medicamento, MedicamentoAlias, Receita, normalizar_nome_medicamento
+
+# Similaridade mínima (0 a 1) para a busca aproximada
+SIMILARIDADE_MINIMA = 0.3
+
+
+def _ids_por_nome(nomes_normalizados):
+    """{nome_normalizado: medicamento_id} para nomes e aliases (2 queries indexadas)"""
+    nomes = list(nomes_normalizados)
+    encontrados = dict(
+        Medicamento.objects.filter(nome_normalizado__in=nomes).values_list('nome_normalizado', 'id')
+    )
+    faltando = [nome for nome in nomes if nome not in encontrados]
+    if faltando:
+        encontrados.update(
+            MedicamentoAlias.objects.filter(nome_normalizado__in=faltando)
+            .values_list('nome_normalizado', 'medicamento_id')
+        )
+    return encontrados
+
+
+def resolver_id(nome):
+    """Id do Medicamento do catálogo correspondente ao nome digitado, ou None"""
+    chave = normalizar_nome_medicamento(nome)
+    if not chave:
+        return None
+    return _ids_por_nome([chave]).get(chave)
+
+
+def buscar(termo, limite=10):
+    """Medicamentos ativos parecidos com o termo (nome ou alias), mais parecidos primeiro"""
+    chave = normalizar_nome_medicamento(termo)
+    if not chave:
+        return Medicamento.objects.none()
+
+    medicamentos = Medicamento.objects.filter(ativo=True)
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        ids_alias = (
+            MedicamentoAlias.objects.annotate(similaridade=TrigramSimilarity('nome_normalizado', chave))
+            .filter(similaridade__gte=SIMILARIDADE_MINIMA)
+            .values('medicamento_id')
+        )
+        return (
+            medicamentos.annotate(similaridade=TrigramSimilarity('nome_normalizado', chave))
+            .filter(Q(similaridade__gte=SIMILARIDADE_MINIMA) | Q(id__in=ids_alias))
+            .order_by('-similaridade', 'nome')[:limite]
+        )
+
+    return (
+        medicamentos.filter(Q(nome_normalizado__contains=chave) | Q(aliases__nome_normalizado__contains=chave))
+        .distinct()
+        .order_by('nome')[:limite]
+    )
+
+
+def vincular_receitas(lote=1000, criar=False):
+    """
+    Preenche Receita.medicamento_catalogo das receitas ainda sem vínculo,
+    percorrendo por id em lotes (uma transação por lote).
+    Com criar=True, nomes sem correspondência viram novos Medicamentos.
+    Retorna {'processadas', 'vinculadas', 'criados'}.
+    """
+    resultado = {'processadas': 0, 'vinculadas': 0, 'criados': 0}
+    ultimo_id = 0
+    while True:
+        receitas = list(
+            Receita.objects.filter(medicamento_catalogo__isnull=True, id__gt=ultimo_id)
+            .order_by('id')
+            .only('id', 'medicamento')[:lote]
+        )
+        if not receitas:
+            return resultado
+        ultimo_id = receitas[-1].id
+
+        chaves = {r.id: normalizar_nome_medicamento(r.medicamento) for r in receitas}
+        with transaction.atomic():
+            ids = _ids_por_nome({c for c in chaves.values() if c})
+
+            if criar:
+                # primeira grafia encontrada de cada nome vira o nome do catálogo
+                novos = {}
+                for receita in receitas:
+                    chave = chaves[receita.id]
+                    if chave and chave not in ids and chave not in novos:
+                        novos[chave] = Medicamento(nome=' '.join(receita.medicamento.split())[:200], nome_normalizado=chave)
+                if novos:
+                    Medicamento.objects.bulk_create(novos.values(), ignore_conflicts=True)
+                    resultado['criados'] += len(novos)
+                    ids.update(_ids_por_nome(novos))
+
+            vinculadas = []
+            for receita in receitas:
+                medicamento_id = ids.get(chaves[receita.id])
+                if medicamento_id:
+                    receita.medicamento_catalogo_id = medicamento_id
+                    vinculadas.append(receita)
+            Receita.objects.bulk_update(vinculadas, ['medicamento_catalogo'], batch_size=lote)
+
+        resultado['processadas'] += len(receitas)
+        resultado['vinculadas'] += len(vinculadas)
+
+
+def animais_com_medicamento(medicamento, inicio, fim):
+    """Animais que receberam o medicamento em receitas criadas em [inicio, fim)"""
+    receitas = Receita.objects.filter(
+        medicamento_catalogo=medicamento, criado_em__gte=inicio, criado_em__lt=fim
+    ).values('prontuario__consulta__animal_id')
+    return Animal.objects.filter(id__in=receitas)
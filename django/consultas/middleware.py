@@ -0,0 +1,20 @@
+"""
+Middleware do app de consultas
+"""
+
+from .auditoria import lote
+
+
+class AuditoriaMiddleware:
+    """
+    Abre um buffer de auditoria por requisição: os eventos de
+    HistoricoConsulta gerados pela view são gravados juntos, com um
+    único bulk_create, quando a resposta fica pronta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with lote():
+            return self.get_response(request)
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:11
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.conf import settings
+from django.db import migrations, models
+
+# Cópia de Consulta.DURACAO_MINUTOS no momento desta migration
+DURACAO_MINUTOS = {
+    'CONSULTA': 30,
+    'RETORNO': 20,
+    'EMERGENCIA': 60,
+    'CIRURGIA': 120,
+    'VACINACAO': 15,
+    'EXAME': 30,
+}
+
+
+def preencher_data_hora_fim(apps, schema_editor):
+    """Calcula o término previsto das consultas existentes (um UPDATE por tipo)"""
+    Consulta = apps.get_model('consultas', 'Consulta')
+    for tipo, minutos in DURACAO_MINUTOS.items():
+        Consulta.objects.filter(tipo=tipo).update(
+            data_hora_fim=models.F('data_hora') + timedelta(minutes=minutos)
+        )
+    Consulta.objects.filter(data_hora_fim__isnull=True).update(
+        data_hora_fim=models.F('data_hora') + timedelta(minutes=30)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultas', '0001_initial'),
+        ('pets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HorarioTrabalho',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia_semana', models.PositiveSmallIntegerField(choices=[(0, 'Segunda-feira'), (1, 'Terça-feira'), (2, 'Quarta-feira'), (3, 'Quinta-feira'), (4, 'Sexta-feira'), (5, 'Sábado'), (6, 'Domingo')], verbose_name='Dia da Semana')),
+                ('inicio', models.TimeField(verbose_name='Início')),
+                ('fim', models.TimeField(verbose_name='Fim')),
+            ],
+            options={
+                'verbose_name': 'Horário de Trabalho',
+                'verbose_name_plural': 'Horários de Trabalho',
+                'ordering': ['veterinario', 'dia_semana', 'inicio'],
+            },
+        ),
+        migrations.AddField(
+            model_name='consulta',
+            name='data_hora_fim',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Término Previsto'),
+        ),
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['veterinario', 'data_hora_fim'], name='consulta_vet_fim_idx'),
+        ),
+        migrations.AddField(
+            model_name='horariotrabalho',
+            name='veterinario',
+            field=models.ForeignKey(limit_choices_to={'user_type': 'VETERINARIO'}, on_delete=django.db.models.deletion.CASCADE, related_name='horarios_trabalho', to=settings.AUTH_USER_MODEL, verbose_name='Veterinário'),
+        ),
+        migrations.AddIndex(
+            model_name='horariotrabalho',
+            index=models.Index(fields=['dia_semana', 'veterinario'], name='consultas_h_dia_sem_b0332c_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='horariotrabalho',
+            constraint=models.CheckConstraint(condition=models.Q(('fim__gt', models.F('inicio'))), name='horario_trabalho_fim_apos_inicio'),
+        ),
+        migrations.RunPython(preencher_data_hora_fim, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+"""
+Impede no banco que um veterinário tenha dois atendimentos ativos
+sobrepostos: EXCLUDE USING gist sobre (veterinario_id, tstzrange).
+
+Só existe no PostgreSQL (precisa da extensão btree_gist); nos demais
+bancos vale apenas a validação de Consulta.clean().
+"""
+
+from django.db import migrations
+
+CONSTRAINT = 'consulta_veterinario_sem_sobreposicao'
+
+
+def criar_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Consulta = apps.get_model('consultas', 'Consulta')
+    tabela = schema_editor.quote_name(Consulta._meta.db_table)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT a.id, b.id FROM {tabela} a
+            JOIN {tabela} b
+              ON a.veterinario_id = b.veterinario_id AND a.id < b.id
+             AND tstzrange(a.data_hora, a.data_hora_fim) && tstzrange(b.data_hora, b.data_hora_fim)
+            WHERE a.status NOT IN ('CANCELADA', 'FALTOU')
+              AND b.status NOT IN ('CANCELADA', 'FALTOU')
+            LIMIT 20
+            """
+        )
+        conflitos = cursor.fetchall()
+    if conflitos:
+        pares = ', '.join(f'{a}x{b}' for a, b in conflitos)
+        raise RuntimeError(
+            f'Existem consultas sobrepostas para o mesmo veterinário (ids: {pares}). '
+            f'Remarque ou cancele-as antes de aplicar esta migration.'
+        )
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        f"""
+        ALTER TABLE {tabela} ADD CONSTRAINT {CONSTRAINT}
+        EXCLUDE USING gist (
+            veterinario_id WITH =,
+            tstzrange(data_hora, data_hora_fim, '[)') WITH &&
+        ) WHERE (status NOT IN ('CANCELADA', 'FALTOU'))
+        """
+    )
+
+
+def remover_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Consulta = apps.get_model('consultas', 'Consulta')
+    tabela = schema_editor.quote_name(Consulta._meta.db_table)
+    schema_editor.execute(f'ALTER TABLE {tabela} DROP CONSTRAINT IF EXISTS {CONSTRAINT}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultas', '0002_agenda_veterinarios'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_constraint, remover_constraint),
+    ]
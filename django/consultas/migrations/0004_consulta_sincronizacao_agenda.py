@@ -0,0 +1,20 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultas', '0003_consulta_sem_sobreposicao'),
+        ('pets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['veterinario', 'atualizado_em', 'id'], name='consulta_vet_atualizado_idx'),
+        ),
+    ]
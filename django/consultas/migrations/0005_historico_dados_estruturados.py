@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultas', '0004_consulta_sincronizacao_agenda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicoconsulta',
+            name='dados',
+            field=models.JSONField(blank=True, default=dict, help_text='Dados estruturados do evento (ver consultas/auditoria.py)', verbose_name='Dados'),
+        ),
+        migrations.AlterField(
+            model_name='historicoconsulta',
+            name='acao',
+            field=models.CharField(choices=[('AGENDAMENTO', 'Agendamento Criado'), ('CONFIRMACAO', 'Consulta Confirmada'), ('INICIO_ATENDIMENTO', 'Atendimento Iniciado'), ('STATUS_ALTERADO', 'Status Alterado'), ('PRONTUARIO_CRIADO', 'Prontuário Criado'), ('PRONTUARIO_ATUALIZADO', 'Prontuário Atualizado'), ('RECEITA_ADICIONADA', 'Receita Adicionada'), ('RECEITA_ATUALIZADA', 'Receita Atualizada'), ('RECEITA_REMOVIDA', 'Receita Removida'), ('CANCELAMENTO', 'Consulta Cancelada'), ('OBSERVACAO', 'Observação Adicionada')], max_length=30, verbose_name='Ação'),
+        ),
+        migrations.AlterField(
+            model_name='historicoconsulta',
+            name='criado_em',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultas', '0005_historico_dados_estruturados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricoConsultaArquivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('acao', models.CharField(choices=[('AGENDAMENTO', 'Agendamento Criado'), ('CONFIRMACAO', 'Consulta Confirmada'), ('INICIO_ATENDIMENTO', 'Atendimento Iniciado'), ('STATUS_ALTERADO', 'Status Alterado'), ('PRONTUARIO_CRIADO', 'Prontuário Criado'), ('PRONTUARIO_ATUALIZADO', 'Prontuário Atualizado'), ('RECEITA_ADICIONADA', 'Receita Adicionada'), ('RECEITA_ATUALIZADA', 'Receita Atualizada'), ('RECEITA_REMOVIDA', 'Receita Removida'), ('CANCELAMENTO', 'Consulta Cancelada'), ('OBSERVACAO', 'Observação Adicionada')], max_length=30, verbose_name='Ação')),
+                ('descricao', models.TextField(verbose_name='Descrição')),
+                ('dados', models.JSONField(blank=True, default=dict, verbose_name='Dados')),
+                ('criado_em', models.DateTimeField()),
+                ('arquivado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Histórico de Consulta (arquivo)',
+                'verbose_name_plural': 'Históricos de Consultas (arquivo)',
+                'ordering': ['-criado_em'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='historicoconsulta',
+            name='consulta',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='historico', to='consultas.consulta', verbose_name='Consulta'),
+        ),
+        migrations.AddIndex(
+            model_name='historicoconsulta',
+            index=models.Index(fields=['consulta', '-criado_em'], include=('acao', 'usuario'), name='historico_consulta_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicoconsulta',
+            index=models.Index(fields=['criado_em'], name='historico_criado_em_idx'),
+        ),
+        migrations.AddField(
+            model_name='historicoconsultaarquivo',
+            name='consulta',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historico_arquivado', to='consultas.consulta', verbose_name='Consulta'),
+        ),
+        migrations.AddField(
+            model_name='historicoconsultaarquivo',
+            name='usuario',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuário'),
+        ),
+        migrations.AddIndex(
+            model_name='historicoconsultaarquivo',
+            index=models.Index(fields=['consulta', '-criado_em'], name='historico_arq_consulta_idx'),
+        ),
+    ]
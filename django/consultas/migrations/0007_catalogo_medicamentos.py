@@ -0,0 +1,57 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultas', '0006_historico_indices_arquivo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Medicamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200, unique=True, verbose_name='Nome')),
+                ('nome_normalizado', models.CharField(editable=False, max_length=200, unique=True)),
+                ('principio_ativo', models.CharField(blank=True, max_length=200, verbose_name='Princípio Ativo')),
+                ('ativo', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Medicamento',
+                'verbose_name_plural': 'Medicamentos',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MedicamentoAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200, verbose_name='Nome')),
+                ('nome_normalizado', models.CharField(editable=False, max_length=200, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Nome Alternativo',
+                'verbose_name_plural': 'Nomes Alternativos',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.AddField(
+            model_name='receita',
+            name='medicamento_catalogo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='receitas', to='consultas.medicamento', verbose_name='Medicamento (catálogo)'),
+        ),
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(fields=['medicamento_catalogo', 'criado_em'], name='receita_medicamento_data_idx'),
+        ),
+        migrations.AddField(
+            model_name='medicamentoalias',
+            name='medicamento',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='consultas.medicamento', verbose_name='Medicamento'),
+        ),
+    ]
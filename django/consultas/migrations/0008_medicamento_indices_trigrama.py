@@ -0,0 +1,42 @@
+"""
+Índices GIN de trigramas (pg_trgm) em nome_normalizado do catálogo de
+medicamentos, usados pela busca aproximada de consultas/medicamentos.py.
+
+Só existem no PostgreSQL; nos demais bancos a busca usa LIKE.
+"""
+
+from django.db import migrations
+
+INDICES = {
+    'Medicamento': 'medicamento_nome_trgm_idx',
+    'MedicamentoAlias': 'medicamento_alias_nome_trgm_idx',
+}
+
+
+def criar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for modelo, indice in INDICES.items():
+        tabela = schema_editor.quote_name(apps.get_model('consultas', modelo)._meta.db_table)
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {indice} ON {tabela} USING gin (nome_normalizado gin_trgm_ops)'
+        )
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for indice in INDICES.values():
+        schema_editor.execute(f'DROP INDEX IF EXISTS {indice}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultas', '0007_catalogo_medicamentos'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
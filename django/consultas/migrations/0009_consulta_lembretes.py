@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultas', '0008_medicamento_indices_trigrama'),
+        ('pets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consulta',
+            name='lembrete_enviado_para',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Lembrete Enviado Para'),
+        ),
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(condition=models.Q(('status__in', ['AGENDADA', 'CONFIRMADA'])), fields=['data_hora', 'id'], name='consulta_lembrete_idx'),
+        ),
+    ]
@@ -10,18 +10,22 @@ Hierarquia:
 Relacionamentos:
 - Uma Consulta pertence a UM animal e UM veterinário
 - Um Prontuario pertence a UMA consulta
-- Uma Receita pertence a UM prontuário
+- Uma Receita pertence a UM prontuário (e opcionalmente a UM Medicamento do catálogo)
 - HistoricoConsulta registra todas as ações realizadas
+- HistoricoConsultaArquivo guarda o histórico antigo (mesmas colunas)
 """
 
+import unicodedata
+from datetime import timedelta
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from app.fragmentos import InvalidaFragmentos
 from pets.models import Animal
 
 
-class Consulta(models.Model):
+class Consulta(InvalidaFragmentos, models.Model):
     """
     Representa uma consulta veterinária agendada ou realizada
     """
@@ -43,6 +47,29 @@ class Consulta(models.Model):
         ('EXAME', 'Exame'),
     ]
     
+    # Duração padrão de cada tipo de atendimento (minutos)
+    DURACAO_MINUTOS = {
+        'CONSULTA': 30,
+        'RETORNO': 20,
+        'EMERGENCIA': 60,
+        'CIRURGIA': 120,
+        'VACINACAO': 15,
+        'EXAME': 30,
+    }
+    
+    # Status que liberam o horário do veterinário
+    STATUS_LIVRES = ('CANCELADA', 'FALTOU')
+    
+    # Transições de status permitidas: destino -> status de origem
+    # (aplicadas por consultas/estados.py com UPDATE condicional)
+    TRANSICOES = {
+        'CONFIRMADA': ('AGENDADA',),
+        'EM_ATENDIMENTO': ('AGENDADA', 'CONFIRMADA'),
+        'REALIZADA': ('AGENDADA', 'CONFIRMADA', 'EM_ATENDIMENTO'),
+        'CANCELADA': ('AGENDADA', 'CONFIRMADA'),
+        'FALTOU': ('AGENDADA', 'CONFIRMADA'),
+    }
+    
     # Relacionamentos principais
     animal = models.ForeignKey(
         Animal,
@@ -67,6 +94,14 @@ class Consulta(models.Model):
         help_text='Data e hora da consulta'
     )
     
+    # Calculado no save() a partir do tipo (ver DURACAO_MINUTOS)
+    data_hora_fim = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Término Previsto'
+    )
+    
     tipo = models.CharField(
         max_length=20,
         choices=TIPO_CHOICES,
@@ -95,6 +130,14 @@ class Consulta(models.Model):
     # Controle
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
+    # data/hora para a qual o lembrete foi enviado (ver consultas/lembretes.py);
+    # diferente de data_hora quando a consulta foi remarcada depois do envio
+    lembrete_enviado_para = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Lembrete Enviado Para'
+    )
     criado_por = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.PROTECT,
@@ -102,6 +145,13 @@ class Consulta(models.Model):
         verbose_name='Criado por'
     )
     
+    # dashboard do veterinário (app/fragmentos.py); transições via .update() invalidam em estados.py
+    dominios_fragmentos = ('consultas',)
+    
+    # animal_id como carregado do banco: trocar o animal também invalida o
+    # portal do tutor anterior (ver users/portal.py)
+    _animal_original = None
+    
     class Meta:
         verbose_name = 'Consulta'
         verbose_name_plural = 'Consultas'
@@ -109,7 +159,19 @@ class Consulta(models.Model):
         indexes = [
             models.Index(fields=['data_hora', 'veterinario']),
             models.Index(fields=['animal', 'data_hora']),
+            models.Index(fields=['veterinario', 'data_hora_fim'], name='consulta_vet_fim_idx'),
+            # sincronização incremental da agenda (ver consultas/agenda.py)
+            models.Index(fields=['veterinario', 'atualizado_em', 'id'], name='consulta_vet_atualizado_idx'),
+            # varredura dos lembretes por janela de horário (ver consultas/lembretes.py)
+            models.Index(
+                fields=['data_hora', 'id'],
+                condition=models.Q(status__in=['AGENDADA', 'CONFIRMADA']),
+                name='consulta_lembrete_idx',
+            ),
         ]
+        # Sobreposição de horários também é impedida no PostgreSQL por uma
+        # EXCLUDE USING gist (veterinario_id WITH =, tstzrange(...) WITH &&)
+        # criada na migration 0003_consulta_sem_sobreposicao
     
     def __str__(self):
         return f"{self.animal.nome} - {self.get_tipo_display()} - {self.data_hora.strftime('%d/%m/%Y %H:%M')}"
@@ -127,22 +189,127 @@ class Consulta(models.Model):
         
         if not self.pk and self.data_hora and self.data_hora < timezone.now():
             raise ValidationError({'data_hora': 'Não é possível agendar consultas no passado.'})
+        
+        # Fallback da exclusion constraint: avisa o conflito antes do INSERT
+        if self.veterinario_id and self.data_hora and self.status not in self.STATUS_LIVRES:
+            conflito = self.sobrepostas().order_by('data_hora').first()
+            if conflito:
+                raise ValidationError({
+                    'data_hora': (
+                        f'O veterinário já tem um atendimento das '
+                        f'{timezone.localtime(conflito.data_hora):%H:%M} às '
+                        f'{timezone.localtime(conflito.data_hora_fim):%H:%M} neste dia.'
+                    )
+                })
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'animal_id' in field_names:
+            instance._animal_original = instance.animal_id
+        return instance
+    
+    def save(self, *args, **kwargs):
+        self.data_hora_fim = self.calcular_fim()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # fim derivado de data_hora/tipo e atualizado_em (auto_now, cursor
+            # da sincronização em consultas/agenda.py) vão junto em toda gravação
+            kwargs['update_fields'] = {*update_fields, 'data_hora_fim', 'atualizado_em'}
+        super().save(*args, **kwargs)
+        # próxima consulta / última visita do portal do cliente
+        from users import portal
+        portal.invalidar_animais_ao_confirmar({self.animal_id, self._animal_original} - {None})
+        self._animal_original = self.animal_id
+    
+    def delete(self, *args, **kwargs):
+        from users import portal
+        portal.invalidar_animais_ao_confirmar({self.animal_id, self._animal_original} - {None})
+        return super().delete(*args, **kwargs)
+    
+    @property
+    def duracao(self):
+        return timedelta(minutes=self.DURACAO_MINUTOS.get(self.tipo, 30))
+    
+    def calcular_fim(self):
+        return self.data_hora + self.duracao if self.data_hora else None
+    
+    def sobrepostas(self):
+        """Consultas ativas do mesmo veterinário que ocupam parte deste horário"""
+        return (
+            Consulta.objects.filter(
+                veterinario_id=self.veterinario_id,
+                data_hora__lt=self.calcular_fim(),
+                data_hora_fim__gt=self.data_hora,
+            )
+            .exclude(status__in=self.STATUS_LIVRES)
+            .exclude(pk=self.pk)
+        )
     
     def pode_editar(self):
         return self.status in ['AGENDADA', 'CONFIRMADA']
     
+    def pode_mudar_para(self, status):
+        return self.status in self.TRANSICOES.get(status, ())
+    
+    def pode_confirmar(self):
+        return self.pode_mudar_para('CONFIRMADA')
+    
     def pode_cancelar(self):
-        return self.status in ['AGENDADA', 'CONFIRMADA']
+        return self.pode_mudar_para('CANCELADA')
     
     def pode_iniciar_atendimento(self):
-        return self.status in ['AGENDADA', 'CONFIRMADA']
+        return self.pode_mudar_para('EM_ATENDIMENTO')
     
     @property
     def tem_prontuario(self):
+        # Sem query quando a consulta veio com select_related('prontuario')
+        # (ver consultas/detalhes.py); caso contrário faz um SELECT
         return hasattr(self, 'prontuario')
 
 
-class Prontuario(models.Model):
+class HorarioTrabalho(models.Model):
+    """
+    Faixa de expediente semanal de um veterinário (um dia pode ter várias).
+    Sem nenhuma faixa cadastrada vale settings.CONSULTAS_EXPEDIENTE_PADRAO.
+    """
+    DIA_SEMANA_CHOICES = [
+        (0, 'Segunda-feira'),
+        (1, 'Terça-feira'),
+        (2, 'Quarta-feira'),
+        (3, 'Quinta-feira'),
+        (4, 'Sexta-feira'),
+        (5, 'Sábado'),
+        (6, 'Domingo'),
+    ]
+    
+    veterinario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='horarios_trabalho',
+        limit_choices_to={'user_type': 'VETERINARIO'},
+        verbose_name='Veterinário'
+    )
+    dia_semana = models.PositiveSmallIntegerField(choices=DIA_SEMANA_CHOICES, verbose_name='Dia da Semana')
+    inicio = models.TimeField(verbose_name='Início')
+    fim = models.TimeField(verbose_name='Fim')
+    
+    class Meta:
+        verbose_name = 'Horário de Trabalho'
+        verbose_name_plural = 'Horários de Trabalho'
+        ordering = ['veterinario', 'dia_semana', 'inicio']
+        indexes = [
+            models.Index(fields=['dia_semana', 'veterinario']),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(fim__gt=models.F('inicio')), name='horario_trabalho_fim_apos_inicio'),
+        ]
+    
+    def __str__(self):
+        return f"{self.veterinario} - {self.get_dia_semana_display()} {self.inicio:%H:%M}-{self.fim:%H:%M}"
+
+
+class Prontuario(InvalidaFragmentos, models.Model):
     consulta = models.OneToOneField(Consulta, on_delete=models.PROTECT, related_name='prontuario', verbose_name='Consulta', help_text='Consulta relacionada a este prontuário')
     peso = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name='Peso (kg)', help_text='Peso do animal em quilogramas')
     temperatura = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True, verbose_name='Temperatura (°C)', help_text='Temperatura corporal em graus Celsius')
@@ -156,6 +323,8 @@ class Prontuario(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
     
+    dominios_fragmentos = ('consultas',)
+    
     class Meta:
         verbose_name = 'Prontuário'
         verbose_name_plural = 'Prontuários'
@@ -163,17 +332,63 @@ class Prontuario(models.Model):
     
     def __str__(self):
         return f"Prontuário - {self.consulta}"
+
+
+def normalizar_nome_medicamento(nome):
+    """Chave de busca: sem acentos, minúsculas e espaços simples"""
+    sem_acento = unicodedata.normalize('NFKD', nome or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acento.lower().split())
+
+
+class Medicamento(models.Model):
+    """
+    Catálogo normalizado de medicamentos. nome_normalizado tem índice
+    único (busca exata) e índice GIN de trigramas no PostgreSQL (busca
+    aproximada, ver consultas/medicamentos.py).
+    """
+    nome = models.CharField(max_length=200, unique=True, verbose_name='Nome')
+    nome_normalizado = models.CharField(max_length=200, unique=True, editable=False)
+    principio_ativo = models.CharField(max_length=200, blank=True, verbose_name='Princípio Ativo')
+    ativo = models.BooleanField(default=True, verbose_name='Ativo')
+    criado_em = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Medicamento'
+        verbose_name_plural = 'Medicamentos'
+        ordering = ['nome']
+    
+    def __str__(self):
+        return self.nome
     
     def save(self, *args, **kwargs):
+        self.nome_normalizado = normalizar_nome_medicamento(self.nome)
+        super().save(*args, **kwargs)
+
+
+class MedicamentoAlias(models.Model):
+    """Outros nomes (comerciais, abreviações, grafias) de um medicamento"""
+    medicamento = models.ForeignKey(Medicamento, on_delete=models.CASCADE, related_name='aliases', verbose_name='Medicamento')
+    nome = models.CharField(max_length=200, verbose_name='Nome')
+    nome_normalizado = models.CharField(max_length=200, unique=True, editable=False)
+    
+    class Meta:
+        verbose_name = 'Nome Alternativo'
+        verbose_name_plural = 'Nomes Alternativos'
+        ordering = ['nome']
+    
+    def __str__(self):
+        return f"{self.nome} → {self.medicamento_id}"
+    
+    def save(self, *args, **kwargs):
+        self.nome_normalizado = normalizar_nome_medicamento(self.nome)
         super().save(*args, **kwargs)
-        if self.consulta.status != 'REALIZADA':
-            self.consulta.status = 'REALIZADA'
-            self.consulta.save(update_fields=['status', 'atualizado_em'])
 
 
 class Receita(models.Model):
     prontuario = models.ForeignKey(Prontuario, on_delete=models.PROTECT, related_name='receitas', verbose_name='Prontuário')
     medicamento = models.CharField(max_length=200, verbose_name='Medicamento', help_text='Nome do medicamento prescrito')
+    # Vínculo com o catálogo; o texto livre acima continua valendo quando não há correspondência
+    medicamento_catalogo = models.ForeignKey(Medicamento, on_delete=models.PROTECT, null=True, blank=True, related_name='receitas', verbose_name='Medicamento (catálogo)')
     dosagem = models.CharField(max_length=100, verbose_name='Dosagem', help_text='Dosagem do medicamento')
     frequencia = models.CharField(max_length=100, verbose_name='Frequência', help_text='Frequência de administração')
     duracao = models.CharField(max_length=100, verbose_name='Duração', help_text='Duração do tratamento')
@@ -186,23 +401,96 @@ class Receita(models.Model):
         verbose_name = 'Receita'
         verbose_name_plural = 'Receitas'
         ordering = ['medicamento']
+        indexes = [
+            # "quais animais receberam o medicamento X no período"
+            models.Index(fields=['medicamento_catalogo', 'criado_em'], name='receita_medicamento_data_idx'),
+        ]
+    
+    _medicamento_original = None
     
     def __str__(self):
         return f"{self.medicamento} - {self.dosagem}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'medicamento' in field_names:
+            instance._medicamento_original = instance.medicamento
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Vincula ao catálogo pelo nome digitado (de novo se o nome mudou)
+        nome_alterado = (
+            self._medicamento_original is not None
+            and normalizar_nome_medicamento(self.medicamento) != normalizar_nome_medicamento(self._medicamento_original)
+        )
+        if self.medicamento and (self.medicamento_catalogo_id is None or nome_alterado):
+            from .medicamentos import resolver_id
+            self.medicamento_catalogo_id = resolver_id(self.medicamento)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'medicamento_catalogo'}
+        super().save(*args, **kwargs)
+        self._medicamento_original = self.medicamento
+        self._tocar_prontuario()
+    
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        self._tocar_prontuario()
+        return resultado
+    
+    def _tocar_prontuario(self):
+        # Atualiza Prontuario.atualizado_em: versão do documento da receita (ver documentos.py)
+        Prontuario.objects.filter(pk=self.prontuario_id).update(atualizado_em=timezone.now())
 
 
 class HistoricoConsulta(models.Model):
-    ACAO_CHOICES = [('AGENDAMENTO', 'Agendamento Criado'), ('CONFIRMACAO', 'Consulta Confirmada'), ('INICIO_ATENDIMENTO', 'Atendimento Iniciado'), ('PRONTUARIO_CRIADO', 'Prontuário Criado'), ('PRONTUARIO_ATUALIZADO', 'Prontuário Atualizado'), ('RECEITA_ADICIONADA', 'Receita Adicionada'), ('CANCELAMENTO', 'Consulta Cancelada'), ('OBSERVACAO', 'Observação Adicionada')]
-    consulta = models.ForeignKey(Consulta, on_delete=models.CASCADE, related_name='historico', verbose_name='Consulta')
+    ACAO_CHOICES = [('AGENDAMENTO', 'Agendamento Criado'), ('CONFIRMACAO', 'Consulta Confirmada'), ('INICIO_ATENDIMENTO', 'Atendimento Iniciado'), ('STATUS_ALTERADO', 'Status Alterado'), ('PRONTUARIO_CRIADO', 'Prontuário Criado'), ('PRONTUARIO_ATUALIZADO', 'Prontuário Atualizado'), ('RECEITA_ADICIONADA', 'Receita Adicionada'), ('RECEITA_ATUALIZADA', 'Receita Atualizada'), ('RECEITA_REMOVIDA', 'Receita Removida'), ('CANCELAMENTO', 'Consulta Cancelada'), ('OBSERVACAO', 'Observação Adicionada')]
+    # sem índice próprio: coberto por historico_consulta_data_idx
+    consulta = models.ForeignKey(Consulta, on_delete=models.CASCADE, related_name='historico', verbose_name='Consulta', db_index=False)
     acao = models.CharField(max_length=30, choices=ACAO_CHOICES, verbose_name='Ação')
     descricao = models.TextField(verbose_name='Descrição', help_text='Detalhes da ação realizada')
     usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, verbose_name='Usuário', help_text='Usuário que realizou a ação')
-    criado_em = models.DateTimeField(auto_now_add=True)
+    dados = models.JSONField(default=dict, blank=True, verbose_name='Dados', help_text='Dados estruturados do evento (ver consultas/auditoria.py)')
+    # default em vez de auto_now_add: o evento é gravado em lote e guarda o instante da ação
+    criado_em = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         verbose_name = 'Histórico de Consulta'
         verbose_name_plural = 'Históricos de Consultas'
         ordering = ['-criado_em']
+        indexes = [
+            # histórico de uma consulta já ordenado, sem ir à tabela (index-only no PostgreSQL)
+            models.Index(fields=['consulta', '-criado_em'], include=['acao', 'usuario'], name='historico_consulta_data_idx'),
+            # seleção do que vai para o arquivo (ver consultas/historico.py)
+            models.Index(fields=['criado_em'], name='historico_criado_em_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_acao_display()} - {self.consulta} - {self.criado_em.strftime('%d/%m/%Y %H:%M')}"
+
+
+class HistoricoConsultaArquivo(models.Model):
+    """
+    Histórico antigo (mais de settings.CONSULTAS_HISTORICO_MESES), movido de
+    HistoricoConsulta pelo comando arquivar_historico. Mantém o id original.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    consulta = models.ForeignKey(Consulta, on_delete=models.CASCADE, related_name='historico_arquivado', verbose_name='Consulta')
+    acao = models.CharField(max_length=30, choices=HistoricoConsulta.ACAO_CHOICES, verbose_name='Ação')
+    descricao = models.TextField(verbose_name='Descrição')
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, related_name='+', verbose_name='Usuário')
+    dados = models.JSONField(default=dict, blank=True, verbose_name='Dados')
+    criado_em = models.DateTimeField()
+    arquivado_em = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Histórico de Consulta (arquivo)'
+        verbose_name_plural = 'Históricos de Consultas (arquivo)'
+        ordering = ['-criado_em']
+        indexes = [
+            models.Index(fields=['consulta', '-criado_em'], name='historico_arq_consulta_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_acao_display()} - {self.consulta_id} - {self.criado_em.strftime('%d/%m/%Y %H:%M')}"
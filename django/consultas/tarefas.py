@@ -0,0 +1,17 @@
+"""
+Tarefas em segundo plano do app de consultas (fila do app tarefas)
+
+- consultas.enviar_lembretes (periódica, a cada 15 min): envia os
+  lembretes das consultas das próximas horas, um e-mail por cliente
+  (ver consultas/lembretes.py)
+"""
+
+from datetime import timedelta
+
+from tarefas.fila import tarefa
+from .lembretes import enviar_lembretes as _enviar_lembretes
+
+
+@tarefa('consultas.enviar_lembretes', periodicidade=timedelta(minutes=15))
+def enviar_lembretes():
+    _enviar_lembretes()
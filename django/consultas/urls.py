@@ -11,12 +11,23 @@ from .views import (
     ConsultaDetailView,
     ConsultaCancelarView,
     ConsultaIniciarAtendimentoView,
+    ConfirmarConsultasView,
+    RegistrarFaltasView,
+    CancelarDiaView,
     ProntuarioCreateView,
     ProntuarioUpdateView,
     ProntuarioDetailView,
     ReceitaCreateView,
     ReceitaUpdateView,
     ReceitaDeleteView,
+    ReceitaDocumentoSolicitarView,
+    ReceitaDocumentoStatusView,
+    ReceitaDocumentoView,
+    HorariosLivresView,
+    ProximoHorarioView,
+    AgendaView,
+    AgendaICalView,
+    AnimalLinhaDoTempoView,
 )
 
 app_name = 'consultas'
@@ -33,13 +44,30 @@ urlpatterns = [
     path('consultas/<int:pk>/cancelar/', ConsultaCancelarView.as_view(), name='consulta_cancelar'),
     path('consultas/<int:pk>/iniciar/', ConsultaIniciarAtendimentoView.as_view(), name='consulta_iniciar'),
     
+    # Operações em lote
+    path('consultas/lote/confirmar/', ConfirmarConsultasView.as_view(), name='consultas_confirmar'),
+    path('consultas/lote/faltas/', RegistrarFaltasView.as_view(), name='consultas_registrar_faltas'),
+    path('consultas/lote/cancelar-dia/', CancelarDiaView.as_view(), name='consultas_cancelar_dia'),
+    
     # Prontuários
     path('consultas/<int:consulta_pk>/prontuario/criar/', ProntuarioCreateView.as_view(), name='prontuario_create'),
     path('prontuarios/<int:pk>/editar/', ProntuarioUpdateView.as_view(), name='prontuario_update'),
     path('prontuarios/<int:pk>/', ProntuarioDetailView.as_view(), name='prontuario_detail'),
     
+    # Histórico clínico do animal
+    path('animais/<int:pk>/historico-clinico/', AnimalLinhaDoTempoView.as_view(), name='animal_linha_do_tempo'),
+    
     # Receitas
     path('prontuarios/<int:prontuario_pk>/receitas/nova/', ReceitaCreateView.as_view(), name='receita_create'),
     path('receitas/<int:pk>/editar/', ReceitaUpdateView.as_view(), name='receita_update'),
     path('receitas/<int:pk>/excluir/', ReceitaDeleteView.as_view(), name='receita_delete'),
+    path('prontuarios/<int:pk>/receita/', ReceitaDocumentoSolicitarView.as_view(), name='receita_documento_solicitar'),
+    path('prontuarios/<int:pk>/receita/<str:versao>/status/', ReceitaDocumentoStatusView.as_view(), name='receita_documento_status'),
+    path('prontuarios/<int:pk>/receita/<str:versao>/', ReceitaDocumentoView.as_view(), name='receita_documento'),
+    
+    # Agenda
+    path('horarios/livres/', HorariosLivresView.as_view(), name='horarios_livres'),
+    path('horarios/proximo/', ProximoHorarioView.as_view(), name='proximo_horario'),
+    path('agenda/', AgendaView.as_view(), name='agenda'),
+    path('agenda/<str:token>.ics', AgendaICalView.as_view(), name='agenda_ical'),
 ]
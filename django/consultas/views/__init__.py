@@ -21,6 +21,25 @@ from .receitas import (
     ReceitaUpdateView,
     ReceitaDeleteView,
 )
+from .horarios import (
+    HorariosLivresView,
+    ProximoHorarioView,
+)
+from .documentos import (
+    ReceitaDocumentoSolicitarView,
+    ReceitaDocumentoStatusView,
+    ReceitaDocumentoView,
+)
+from .lote import (
+    ConfirmarConsultasView,
+    RegistrarFaltasView,
+    CancelarDiaView,
+)
+from .linha_do_tempo import AnimalLinhaDoTempoView
+from .agenda import (
+    AgendaView,
+    AgendaICalView,
+)
 
 __all__ = [
     'DashboardVetView',
@@ -30,10 +49,21 @@ __all__ = [
     'ConsultaDetailView',
     'ConsultaCancelarView',
     'ConsultaIniciarAtendimentoView',
+    'ConfirmarConsultasView',
+    'RegistrarFaltasView',
+    'CancelarDiaView',
     'ProntuarioCreateView',
     'ProntuarioUpdateView',
     'ProntuarioDetailView',
     'ReceitaCreateView',
     'ReceitaUpdateView',
     'ReceitaDeleteView',
+    'ReceitaDocumentoSolicitarView',
+    'ReceitaDocumentoStatusView',
+    'ReceitaDocumentoView',
+    'HorariosLivresView',
+    'ProximoHorarioView',
+    'AgendaView',
+    'AgendaICalView',
+    'AnimalLinhaDoTempoView',
 ]
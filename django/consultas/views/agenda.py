@@ -0,0 +1,118 @@
+"""
+Views da agenda: API JSON (período e sincronização incremental) e feed iCal
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views import View
+from consultas import agenda
+from consultas.models import Consulta
+from consultas.views.horarios import EquipeRequiredMixin
+from users.models import User
+
+# Maior período aceito em uma chamada (dias)
+PERIODO_MAXIMO_DIAS = 92
+
+# Janela publicada no feed iCal (dias antes/depois de hoje)
+ICAL_DIAS_ANTES = 30
+ICAL_DIAS_DEPOIS = 180
+
+
+def _data(valor, padrao):
+    try:
+        return date.fromisoformat(valor) if valor else padrao
+    except ValueError:
+        raise ValueError(f'data inválida: {valor!r} (use AAAA-MM-DD)')
+
+
+def _inicio_do_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+class AgendaView(LoginRequiredMixin, EquipeRequiredMixin, View):
+    """
+    GET ?inicio=AAAA-MM-DD&fim=AAAA-MM-DD   consultas do período (fim inclusivo)
+    GET ?updated_since=<cursor>             apenas o que mudou desde o cursor
+    Opcional: ?veterinario=<id> (padrão: o próprio usuário)
+    """
+
+    def get(self, request):
+        try:
+            veterinario_id = int(request.GET.get('veterinario') or request.user.pk)
+        except ValueError:
+            return HttpResponseBadRequest('veterinario inválido')
+        veterinario = get_object_or_404(User, pk=veterinario_id, user_type=User.VETERINARIO)
+
+        if 'updated_since' in request.GET:
+            try:
+                consultas, cursor, tem_mais = agenda.alteracoes(veterinario, request.GET['updated_since'])
+            except ValueError:
+                return HttpResponseBadRequest('updated_since inválido')
+            return JsonResponse({'consultas': consultas, 'cursor': cursor, 'tem_mais': tem_mais})
+
+        hoje = timezone.localdate()
+        try:
+            inicio = _data(request.GET.get('inicio'), hoje)
+            fim = _data(request.GET.get('fim'), inicio + timedelta(days=6))
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        if fim < inicio or (fim - inicio).days >= PERIODO_MAXIMO_DIAS:
+            return HttpResponseBadRequest(f'período inválido (máximo de {PERIODO_MAXIMO_DIAS} dias)')
+
+        # cursor lido antes do período: nada alterado entre as duas leituras se perde
+        ultima = (
+            Consulta.objects.filter(veterinario=veterinario)
+            .order_by('-atualizado_em', '-id')
+            .values_list('atualizado_em', 'id')
+            .first()
+        )
+        linhas = agenda.periodo(veterinario, _inicio_do_dia(inicio), _inicio_do_dia(fim + timedelta(days=1)))
+        return JsonResponse({
+            'inicio': inicio.isoformat(),
+            'fim': fim.isoformat(),
+            'consultas': [agenda.serializar(linha) for linha in linhas],
+            'cursor': agenda.codificar_cursor(*ultima) if ultima else None,
+        })
+
+
+class AgendaICalView(View):
+    """
+    Feed iCalendar da agenda de um veterinário, autenticado pelo token
+    assinado da URL. Responde 304 se a agenda não mudou desde o último
+    download (If-None-Match / If-Modified-Since).
+    """
+
+    def get(self, request, token):
+        veterinario_id = agenda.veterinario_do_token(token)
+        if veterinario_id is None:
+            raise Http404
+        veterinario = get_object_or_404(User, pk=veterinario_id, user_type=User.VETERINARIO, is_active=True)
+
+        hoje = timezone.localdate()
+        ultima, total = agenda.versao(veterinario)
+        etag = quote_etag(f'{ultima.timestamp() if ultima else 0}-{total}-{hoje.isoformat()}')
+        last_modified = int(ultima.timestamp()) if ultima else None
+
+        resposta = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if resposta is not None:
+            return resposta
+
+        linhas = agenda.periodo(
+            veterinario,
+            _inicio_do_dia(hoje - timedelta(days=ICAL_DIAS_ANTES)),
+            _inicio_do_dia(hoje + timedelta(days=ICAL_DIAS_DEPOIS)),
+        ).iterator(chunk_size=500)
+        resposta = StreamingHttpResponse(
+            agenda.ical(linhas, nome=f'Agenda - {veterinario}'),
+            content_type='text/calendar; charset=utf-8',
+        )
+        resposta['ETag'] = etag
+        if last_modified:
+            resposta['Last-Modified'] = http_date(last_modified)
+        return resposta
@@ -7,15 +7,22 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
-from consultas.models import Consulta, HistoricoConsulta
+from app.db_router import ReplicaMixin
+from consultas import auditoria, estados
+from consultas.detalhes import consultas_para_detalhe, montar_detalhe
+from consultas.models import Consulta
 from consultas.forms import ConsultaForm, ConsultaUpdateForm
 from pets.models import Animal
 from users.models import User
 
 
+MENSAGEM_CONFLITO = 'Este horário acabou de ser ocupado. Escolha outro horário.'
+
+
 class VeterinarioRequiredMixin(UserPassesTestMixin):
     """Mixin para verificar se o usuário é veterinário"""
     
@@ -23,7 +30,7 @@ class VeterinarioRequiredMixin(UserPassesTestMixin):
         return self.request.user.is_veterinario()
 
 
-class ConsultaListView(LoginRequiredMixin, VeterinarioRequiredMixin, ListView):
+class ConsultaListView(LoginRequiredMixin, VeterinarioRequiredMixin, ReplicaMixin, ListView):
     """Lista todas as consultas do veterinário"""
     model = Consulta
     template_name = 'consultas/consulta_list.html'
@@ -88,16 +95,16 @@ class ConsultaCreateView(LoginRequiredMixin, VeterinarioRequiredMixin, CreateVie
         form.instance.veterinario = self.request.user
         form.instance.criado_por = self.request.user
         
-        # Salva a instância
-        response = super().form_valid(form)
+        # Salva a instância (a exclusion constraint pega agendamentos simultâneos)
+        try:
+            with transaction.atomic():
+                response = super().form_valid(form)
+        except IntegrityError:
+            form.add_error('data_hora', MENSAGEM_CONFLITO)
+            return self.form_invalid(form)
         
         # Registra no histórico
-        HistoricoConsulta.objects.create(
-            consulta=self.object,
-            acao='AGENDAMENTO',
-            descricao=f'Consulta agendada para {self.object.data_hora.strftime("%d/%m/%Y às %H:%M")}',
-            usuario=self.request.user
-        )
+        auditoria.agendamento(self.object, self.request.user)
         
         messages.success(self.request, 'Consulta agendada com sucesso!')
         return response
@@ -113,7 +120,7 @@ class ConsultaUpdateView(LoginRequiredMixin, VeterinarioRequiredMixin, UpdateVie
     """Atualiza uma consulta existente"""
     model = Consulta
     template_name = 'consultas/consulta_form.html'
-    fields = ['animal', 'data_hora', 'tipo', 'status', 'motivo', 'observacoes']
+    form_class = ConsultaUpdateForm
     success_url = reverse_lazy('consultas:consulta_list')
     
     def get_queryset(self):
@@ -133,26 +140,32 @@ class ConsultaUpdateView(LoginRequiredMixin, VeterinarioRequiredMixin, UpdateVie
         })
         
         # Filtra apenas animais ativos
-        form.fields['animal'].queryset = Animal.objects.filter(ativo=True).select_related(
+        form.fields['animal'].queryset = Animal.ativos.select_related(
             'proprietario', 'raca', 'tipo_animal'
         )
         
         return form
     
     def form_valid(self, form):
-        response = super().form_valid(form)
-        
-        # Registra no histórico se houve mudança de status
-        if 'status' in form.changed_data:
-            HistoricoConsulta.objects.create(
-                consulta=self.object,
-                acao='OBSERVACAO',
-                descricao=f'Status alterado para: {self.object.get_status_display()}',
-                usuario=self.request.user
-            )
+        novo_status = form.cleaned_data.get('novo_status')
+        try:
+            with transaction.atomic():
+                # Grava só os campos do formulário: o status (talvez já
+                # alterado por outra requisição) não é sobrescrito
+                self.object = form.save(commit=False)
+                self.object.save(update_fields=form._meta.fields)
+                # Mudança de status: UPDATE condicional + histórico (ver consultas/estados.py)
+                if novo_status:
+                    estados.transicionar(self.object, novo_status, self.request.user)
+        except IntegrityError:
+            form.add_error('data_hora', MENSAGEM_CONFLITO)
+            return self.form_invalid(form)
+        except estados.TransicaoInvalida:
+            form.add_error('novo_status', 'O status desta consulta mudou enquanto você editava. Confira e tente novamente.')
+            return self.form_invalid(form)
         
         messages.success(self.request, 'Consulta atualizada com sucesso!')
-        return response
+        return redirect(self.get_success_url())
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -168,28 +181,14 @@ class ConsultaDetailView(LoginRequiredMixin, VeterinarioRequiredMixin, DetailVie
     context_object_name = 'consulta'
     
     def get_queryset(self):
-        # Apenas consultas do veterinário logado
-        return Consulta.objects.filter(
-            veterinario=self.request.user
-        ).select_related(
-            'animal', 'animal__proprietario', 'animal__raca', 'animal__tipo_animal',
-            'veterinario', 'criado_por'
-        ).prefetch_related('historico')
+        # Apenas consultas do veterinário logado, já com prontuário e receitas
+        return consultas_para_detalhe().filter(veterinario=self.request.user)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # Busca prontuário se existir
-        try:
-            context['prontuario'] = self.object.prontuario
-            context['receitas'] = self.object.prontuario.receitas.all()
-        except:
-            context['prontuario'] = None
-            context['receitas'] = []
-        
-        # Histórico da consulta
-        context['historico'] = self.object.historico.select_related('usuario').order_by('-criado_em')
-        
+        # Prontuário, receitas e histórico (ver consultas/detalhes.py)
+        context['detalhe'] = montar_detalhe(self.object)
+        context.update(context['detalhe'].contexto())
         return context
 
 
@@ -197,23 +196,15 @@ class ConsultaCancelarView(LoginRequiredMixin, VeterinarioRequiredMixin, View):
     """Cancela uma consulta"""
     
     def post(self, request, pk):
-        consulta = get_object_or_404(Consulta, pk=pk, veterinario=request.user)
+        consulta = get_object_or_404(Consulta.objects.only('id', 'status', 'animal_id'), pk=pk, veterinario=request.user)
         
-        if not consulta.pode_cancelar():
+        # UPDATE condicional + histórico (ver consultas/estados.py)
+        try:
+            estados.cancelar(consulta, request.user)
+        except estados.TransicaoInvalida:
             messages.error(request, 'Esta consulta não pode ser cancelada.')
             return redirect('consultas:consulta_detail', pk=pk)
         
-        consulta.status = 'CANCELADA'
-        consulta.save()
-        
-        # Registra no histórico
-        HistoricoConsulta.objects.create(
-            consulta=consulta,
-            acao='CANCELAMENTO',
-            descricao='Consulta cancelada pelo veterinário',
-            usuario=request.user
-        )
-        
         messages.success(request, 'Consulta cancelada com sucesso!')
         return redirect('consultas:consulta_list')
 
@@ -222,22 +213,13 @@ class ConsultaIniciarAtendimentoView(LoginRequiredMixin, VeterinarioRequiredMixi
     """Inicia o atendimento de uma consulta"""
     
     def post(self, request, pk):
-        consulta = get_object_or_404(Consulta, pk=pk, veterinario=request.user)
+        consulta = get_object_or_404(Consulta.objects.only('id', 'status', 'animal_id'), pk=pk, veterinario=request.user)
         
-        if not consulta.pode_iniciar_atendimento():
+        try:
+            estados.iniciar_atendimento(consulta, request.user)
+        except estados.TransicaoInvalida:
             messages.error(request, 'Esta consulta não pode ser iniciada.')
             return redirect('consultas:consulta_detail', pk=pk)
         
-        consulta.status = 'EM_ATENDIMENTO'
-        consulta.save()
-        
-        # Registra no histórico
-        HistoricoConsulta.objects.create(
-            consulta=consulta,
-            acao='INICIO_ATENDIMENTO',
-            descricao='Atendimento iniciado',
-            usuario=request.user
-        )
-        
         messages.success(request, 'Atendimento iniciado! Agora você pode criar o prontuário.')
         return redirect('consultas:prontuario_create', consulta_pk=pk)
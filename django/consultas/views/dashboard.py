@@ -6,10 +6,13 @@ Exibe estatísticas e resumo das consultas
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db.models import Count, Q
+from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
+from app.fragmentos import adiado, versao
 from datetime import timedelta
+from consultas.agenda import token_ical
 from consultas.models import Consulta, Prontuario
 
 
@@ -46,26 +49,30 @@ class DashboardVetView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         # Consultas do veterinário
         consultas_vet = Consulta.objects.filter(veterinario=veterinario)
         
+        # Chave dos blocos em cache no template; as estatísticas e listas só
+        # são consultadas quando o bloco não está no cache
+        context['versao_dashboard'] = f'{veterinario.pk}.{hoje}.{versao("consultas", "pets")}'
+        
         # Estatísticas gerais
-        context['total_consultas'] = consultas_vet.count()
-        context['consultas_hoje'] = consultas_vet.filter(
+        context['total_consultas'] = adiado(consultas_vet.count)
+        context['consultas_hoje'] = adiado(consultas_vet.filter(
             data_hora__date=hoje
-        ).count()
-        context['consultas_semana'] = consultas_vet.filter(
+        ).count)
+        context['consultas_semana'] = adiado(consultas_vet.filter(
             data_hora__date__gte=inicio_semana,
             data_hora__date__lte=fim_semana
-        ).count()
+        ).count)
         
         # Consultas por status
-        context['consultas_agendadas'] = consultas_vet.filter(
+        context['consultas_agendadas'] = adiado(consultas_vet.filter(
             status='AGENDADA'
-        ).count()
-        context['consultas_confirmadas'] = consultas_vet.filter(
+        ).count)
+        context['consultas_confirmadas'] = adiado(consultas_vet.filter(
             status='CONFIRMADA'
-        ).count()
-        context['consultas_realizadas'] = consultas_vet.filter(
+        ).count)
+        context['consultas_realizadas'] = adiado(consultas_vet.filter(
             status='REALIZADA'
-        ).count()
+        ).count)
         
         # Próximas consultas (próximos 7 dias)
         proximo_periodo = hoje + timedelta(days=7)
@@ -92,8 +99,13 @@ class DashboardVetView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         ).order_by('-data_hora')[:5]
         
         # Estatísticas de atendimento
-        context['total_prontuarios'] = Prontuario.objects.filter(
+        context['total_prontuarios'] = adiado(Prontuario.objects.filter(
             consulta__veterinario=veterinario
-        ).count()
+        ).count)
+        
+        # Link de assinatura da agenda em apps de calendário
+        context['agenda_ical_url'] = self.request.build_absolute_uri(
+            reverse('consultas:agenda_ical', args=[token_ical(veterinario)])
+        )
         
         return context
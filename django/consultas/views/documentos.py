@@ -0,0 +1,69 @@
+"""
+Views do documento de receita (HTML para impressão) de um prontuário
+
+Fluxo: POST em receita_documento_solicitar agenda a geração e devolve a
+versão; o cliente consulta receita_documento_status até 'pronto' e abre
+receita_documento (ver consultas/documentos.py)
+"""
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views import View
+from consultas import documentos
+from consultas.models import Prontuario
+from .consultas import VeterinarioRequiredMixin
+
+
+def _urls(prontuario_id, versao):
+    kwargs = {'pk': prontuario_id, 'versao': versao}
+    return {
+        'status_url': reverse('consultas:receita_documento_status', kwargs=kwargs),
+        'documento_url': reverse('consultas:receita_documento', kwargs=kwargs),
+    }
+
+
+class ProntuarioDoVeterinarioMixin:
+    """Restringe aos prontuários das consultas do veterinário logado"""
+    
+    def get_prontuario(self):
+        return get_object_or_404(Prontuario, pk=self.kwargs['pk'], consulta__veterinario=self.request.user)
+
+
+class ReceitaDocumentoSolicitarView(LoginRequiredMixin, VeterinarioRequiredMixin, ProntuarioDoVeterinarioMixin, View):
+    """Agenda a geração do documento da versão atual e retorna na hora"""
+    
+    def post(self, request, pk):
+        prontuario = self.get_prontuario()
+        versao, status = documentos.solicitar(prontuario)
+        return JsonResponse(
+            {'versao': versao, 'status': status, **_urls(prontuario.pk, versao)},
+            status=200 if status == documentos.PRONTO else 202,
+        )
+
+
+class ReceitaDocumentoStatusView(LoginRequiredMixin, VeterinarioRequiredMixin, ProntuarioDoVeterinarioMixin, View):
+    """Situação da geração de uma versão do documento"""
+    
+    def get(self, request, pk, versao):
+        prontuario = self.get_prontuario()
+        return JsonResponse({
+            'versao': versao,
+            'status': documentos.status(prontuario.pk, versao),
+            **_urls(prontuario.pk, versao),
+        })
+
+
+class ReceitaDocumentoView(LoginRequiredMixin, VeterinarioRequiredMixin, ProntuarioDoVeterinarioMixin, View):
+    """
+    Documento pronto para impressão. Se a versão não está em cache (ex: cache
+    expirado ou de outro processo), renderiza na hora a versão atual.
+    """
+    
+    def get(self, request, pk, versao):
+        prontuario = self.get_prontuario()
+        html = documentos.documento(prontuario.pk, versao)
+        if html is None:
+            _, html = documentos.renderizar(prontuario.pk)
+        return HttpResponse(html)
@@ -0,0 +1,84 @@
+"""
+Views de consulta à agenda (horários livres) para a equipe
+"""
+
+from datetime import date
+
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views import View
+from consultas.horarios import horarios_livres, proximo_horario_livre
+from consultas.models import Consulta
+from users.models import User
+
+
+class EquipeRequiredMixin(UserPassesTestMixin):
+    """Mixin para verificar se o usuário é da equipe (recepção ou veterinário)"""
+
+    def test_func(self):
+        return self.request.user.is_staff_member()
+
+
+def _tipo(request):
+    tipo = request.GET.get('tipo', 'CONSULTA')
+    return tipo if tipo in Consulta.DURACAO_MINUTOS else 'CONSULTA'
+
+
+def _a_partir_de(request):
+    try:
+        valor = parse_datetime(request.GET.get('a_partir_de', ''))
+    except ValueError:
+        # formato certo com data/hora inexistente (ex: mês 13): usa o padrão
+        valor = None
+    if valor is not None and timezone.is_naive(valor):
+        valor = timezone.make_aware(valor)
+    return valor
+
+
+class HorariosLivresView(LoginRequiredMixin, EquipeRequiredMixin, View):
+    """Horários livres de um veterinário em um dia: ?veterinario=<id>&data=AAAA-MM-DD&tipo=..."""
+
+    def get(self, request):
+        veterinario_id = request.GET.get('veterinario') or request.user.pk
+        try:
+            veterinario_id = int(veterinario_id)
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'veterinario inválido'}, status=400)
+        veterinario = get_object_or_404(User, pk=veterinario_id, user_type=User.VETERINARIO)
+        try:
+            dia = date.fromisoformat(request.GET.get('data', ''))
+        except ValueError:
+            dia = timezone.localdate()
+
+        tipo = _tipo(request)
+        horarios = horarios_livres(veterinario, dia, tipo, a_partir_de=_a_partir_de(request))
+        return JsonResponse({
+            'veterinario': veterinario.pk,
+            'data': dia.isoformat(),
+            'tipo': tipo,
+            'duracao_minutos': Consulta.DURACAO_MINUTOS[tipo],
+            'horarios': [timezone.localtime(h).isoformat() for h in horarios],
+        })
+
+
+class ProximoHorarioView(LoginRequiredMixin, EquipeRequiredMixin, View):
+    """Próximo horário livre de qualquer veterinário: ?tipo=...&a_partir_de=..."""
+
+    def get(self, request):
+        tipo = _tipo(request)
+        resultado = proximo_horario_livre(tipo, a_partir_de=_a_partir_de(request))
+        if resultado is None:
+            return JsonResponse({'tipo': tipo, 'horario': None})
+
+        veterinario, inicio, fim = resultado
+        return JsonResponse({
+            'tipo': tipo,
+            'horario': {
+                'veterinario': {'id': veterinario.pk, 'nome': str(veterinario)},
+                'inicio': timezone.localtime(inicio).isoformat(),
+                'fim': timezone.localtime(fim).isoformat(),
+            },
+        })
@@ -0,0 +1,39 @@
+"""
+View da linha do tempo clínica de um animal
+"""
+
+from datetime import datetime
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.generic import TemplateView
+from app.db_router import ReplicaMixin
+from consultas.linha_do_tempo import SINAIS_VITAIS, linha_do_tempo
+from pets.models import Animal
+from .consultas import VeterinarioRequiredMixin
+
+
+class AnimalLinhaDoTempoView(LoginRequiredMixin, VeterinarioRequiredMixin, ReplicaMixin, TemplateView):
+    """Histórico clínico completo do animal (HTML ou ?formato=json)"""
+    template_name = 'consultas/animal_linha_do_tempo.html'
+    
+    def get(self, request, *args, **kwargs):
+        self.animal = get_object_or_404(
+            Animal.objects.select_related('proprietario', 'raca', 'tipo_animal'), pk=kwargs['pk']
+        )
+        self.dados = linha_do_tempo(self.animal)
+        if request.GET.get('formato') == 'json':
+            return JsonResponse(self.dados)
+        return super().get(request, *args, **kwargs)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['animal'] = self.animal
+        # mais recente primeiro, com a data como datetime para o filtro |date
+        context['visitas'] = [
+            {**visita, 'data': datetime.fromisoformat(visita['data_hora'])}
+            for visita in reversed(self.dados['visitas'])
+        ]
+        context['dados'] = self.dados
+        context['sinais_vitais'] = SINAIS_VITAIS
+        return context
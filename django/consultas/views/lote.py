@@ -0,0 +1,92 @@
+"""
+Views de operações em lote sobre o status das consultas (equipe)
+
+Todas recebem POST e voltam para `next` (ou o dashboard) com uma mensagem.
+Parâmetro opcional veterinario=<id>: recepção/gerência escolhem o
+veterinário; veterinários operam apenas na própria agenda (com ou sem o
+parâmetro). Id não numérico responde 400.
+"""
+
+from datetime import date, timedelta
+
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest, PermissionDenied
+from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views import View
+from consultas import estados
+from consultas.views.horarios import EquipeRequiredMixin
+from users.models import User
+
+
+class OperacaoEmLoteView(LoginRequiredMixin, EquipeRequiredMixin, View):
+    """Base: resolve veterinário, data e redirecionamento"""
+    
+    def get_veterinario(self):
+        user = self.request.user
+        veterinario_id = self.request.POST.get('veterinario')
+        if not veterinario_id:
+            return user if user.is_veterinario() else None
+        try:
+            veterinario_id = int(veterinario_id)
+        except ValueError:
+            raise BadRequest('veterinario inválido')
+        if user.is_veterinario():
+            # veterinário não altera a agenda de outro (como ConsultaCancelarView)
+            if veterinario_id != user.pk:
+                raise PermissionDenied
+            return user
+        return get_object_or_404(User, pk=veterinario_id, user_type=User.VETERINARIO)
+    
+    def get_data(self, padrao=None):
+        valor = self.request.POST.get('data')
+        try:
+            return date.fromisoformat(valor) if valor else padrao
+        except ValueError:
+            return None
+    
+    def voltar(self):
+        destino = self.request.POST.get('next')
+        if destino and url_has_allowed_host_and_scheme(destino, allowed_hosts={self.request.get_host()}):
+            return redirect(destino)
+        return redirect('consultas:dashboard')
+
+
+class ConfirmarConsultasView(OperacaoEmLoteView):
+    """Confirma as consultas agendadas de um dia (padrão: amanhã)"""
+    
+    def post(self, request):
+        dia = self.get_data(timezone.localdate() + timedelta(days=1))
+        if dia is None:
+            messages.error(request, 'Data inválida.')
+            return self.voltar()
+        total = estados.confirmar_do_dia(dia, request.user, veterinario=self.get_veterinario())
+        messages.success(request, f'{total} consulta(s) de {dia:%d/%m/%Y} confirmada(s).')
+        return self.voltar()
+
+
+class RegistrarFaltasView(OperacaoEmLoteView):
+    """Marca como FALTOU as consultas passadas que não foram atendidas"""
+    
+    def post(self, request):
+        total = estados.registrar_faltas(usuario=request.user, veterinario=self.get_veterinario())
+        messages.success(request, f'{total} falta(s) registrada(s).')
+        return self.voltar()
+
+
+class CancelarDiaView(OperacaoEmLoteView):
+    """Cancela todas as consultas não atendidas de um veterinário em um dia"""
+    
+    def post(self, request):
+        dia = self.get_data()
+        veterinario = self.get_veterinario()
+        if dia is None or veterinario is None:
+            messages.error(request, 'Informe o veterinário e uma data válida.')
+            return self.voltar()
+        texto = request.POST.get('motivo', '').strip()[:200]
+        motivo = f'({texto})' if texto else 'pelo veterinário'
+        total = estados.cancelar_dia(veterinario, dia, request.user, motivo)
+        messages.success(request, f'{total} consulta(s) de {dia:%d/%m/%Y} cancelada(s).')
+        return self.voltar()
@@ -7,7 +7,10 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
-from consultas.models import Consulta, Prontuario, HistoricoConsulta
+from django.db import transaction
+from consultas import auditoria, estados
+from consultas.detalhes import consultas_para_detalhe, montar_detalhe
+from consultas.models import Consulta, Prontuario
 from .consultas import VeterinarioRequiredMixin
 
 
@@ -50,15 +53,20 @@ class ProntuarioCreateView(LoginRequiredMixin, VeterinarioRequiredMixin, CreateV
     
     def form_valid(self, form):
         form.instance.consulta = self.consulta
-        response = super().form_valid(form)
-        
-        # Registra no histórico
-        HistoricoConsulta.objects.create(
-            consulta=self.consulta,
-            acao='PRONTUARIO_CRIADO',
-            descricao='Prontuário criado',
-            usuario=self.request.user
-        )
+        try:
+            with transaction.atomic():
+                response = super().form_valid(form)
+                # Registra no histórico
+                auditoria.prontuario_criado(self.consulta, self.request.user)
+                # Consulta com prontuário é dada como realizada (UPDATE condicional)
+                if self.consulta.status != 'REALIZADA':
+                    estados.finalizar(self.consulta, self.request.user)
+        except estados.TransicaoInvalida:
+            messages.error(
+                self.request,
+                f'Não é possível registrar prontuário de uma consulta com status "{self.consulta.get_status_display()}".',
+            )
+            return redirect('consultas:consulta_detail', pk=self.consulta.pk)
         
         messages.success(self.request, 'Prontuário criado com sucesso!')
         return response
@@ -105,12 +113,7 @@ class ProntuarioUpdateView(LoginRequiredMixin, VeterinarioRequiredMixin, UpdateV
         response = super().form_valid(form)
         
         # Registra no histórico
-        HistoricoConsulta.objects.create(
-            consulta=self.object.consulta,
-            acao='PRONTUARIO_ATUALIZADO',
-            descricao='Prontuário atualizado',
-            usuario=self.request.user
-        )
+        auditoria.prontuario_atualizado(self.object.consulta, self.request.user, form.changed_data)
         
         messages.success(self.request, 'Prontuário atualizado com sucesso!')
         return response
@@ -127,22 +130,23 @@ class ProntuarioUpdateView(LoginRequiredMixin, VeterinarioRequiredMixin, UpdateV
 
 
 class ProntuarioDetailView(LoginRequiredMixin, VeterinarioRequiredMixin, DetailView):
-    """Exibe detalhes de um prontuário"""
+    """Exibe um prontuário junto com a consulta, receitas e histórico"""
     model = Prontuario
-    template_name = 'consultas/prontuario_detail.html'
+    template_name = 'consultas/consulta_detail.html'
     context_object_name = 'prontuario'
     
-    def get_queryset(self):
+    def get_object(self, queryset=None):
         # Apenas prontuários de consultas do veterinário logado
-        return Prontuario.objects.filter(
-            consulta__veterinario=self.request.user
-        ).select_related(
-            'consulta', 'consulta__animal', 'consulta__animal__proprietario',
-            'consulta__animal__raca', 'consulta__animal__tipo_animal'
-        ).prefetch_related('receitas')
+        consulta = get_object_or_404(
+            consultas_para_detalhe(),
+            prontuario__pk=self.kwargs['pk'],
+            veterinario=self.request.user
+        )
+        self.detalhe = montar_detalhe(consulta)
+        return self.detalhe.prontuario
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['consulta'] = self.object.consulta
-        context['receitas'] = self.object.receitas.all()
+        context['detalhe'] = self.detalhe
+        context.update(self.detalhe.contexto())
         return context
@@ -7,7 +7,8 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
-from consultas.models import Prontuario, Receita, HistoricoConsulta
+from consultas import auditoria
+from consultas.models import Prontuario, Receita
 from .consultas import VeterinarioRequiredMixin
 
 
@@ -42,12 +43,7 @@ class ReceitaCreateView(LoginRequiredMixin, VeterinarioRequiredMixin, CreateView
         response = super().form_valid(form)
         
         # Registra no histórico
-        HistoricoConsulta.objects.create(
-            consulta=self.prontuario.consulta,
-            acao='RECEITA_ADICIONADA',
-            descricao=f'Receita adicionada: {self.object.medicamento}',
-            usuario=self.request.user
-        )
+        auditoria.receita_adicionada(self.prontuario.consulta_id, self.request.user, self.object.medicamento)
         
         messages.success(self.request, 'Receita adicionada com sucesso!')
         return response
@@ -90,12 +86,7 @@ class ReceitaUpdateView(LoginRequiredMixin, VeterinarioRequiredMixin, UpdateView
         response = super().form_valid(form)
         
         # Registra no histórico
-        HistoricoConsulta.objects.create(
-            consulta=self.object.prontuario.consulta,
-            acao='OBSERVACAO',
-            descricao=f'Receita atualizada: {self.object.medicamento}',
-            usuario=self.request.user
-        )
+        auditoria.receita_atualizada(self.object.prontuario.consulta_id, self.request.user, self.object.medicamento)
         
         messages.success(self.request, 'Receita atualizada com sucesso!')
         return response
@@ -124,22 +115,17 @@ class ReceitaDeleteView(LoginRequiredMixin, VeterinarioRequiredMixin, DeleteView
     def get_success_url(self):
         return reverse_lazy('consultas:consulta_detail', kwargs={'pk': self.object.prontuario.consulta.pk})
     
-    def delete(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        consulta = self.object.prontuario.consulta
+    def form_valid(self, form):
+        # DeleteView usa form_valid() desde o Django 4.0 (delete() não é chamado no POST)
+        consulta_id = self.object.prontuario.consulta_id
         medicamento = self.object.medicamento
         
-        response = super().delete(request, *args, **kwargs)
+        response = super().form_valid(form)
         
         # Registra no histórico
-        HistoricoConsulta.objects.create(
-            consulta=consulta,
-            acao='OBSERVACAO',
-            descricao=f'Receita removida: {medicamento}',
-            usuario=request.user
-        )
+        auditoria.receita_removida(consulta_id, self.request.user, medicamento)
         
-        messages.success(request, 'Receita removida com sucesso!')
+        messages.success(self.request, 'Receita removida com sucesso!')
         return response
     
     def get_context_data(self, **kwargs):
@@ -69,13 +69,13 @@ class ClienteComPetForm(forms.Form):
     )
     
     pet_tipo = forms.ModelChoiceField(
-        queryset=TipoAnimal.objects.filter(ativo=True),
+        queryset=TipoAnimal.ativos.all(),
         label="Tipo de Animal",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
     
     pet_raca = forms.ModelChoiceField(
-        queryset=Raca.objects.filter(ativo=True),
+        queryset=Raca.ativos.all(),
         label="Raça",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
@@ -178,3 +178,24 @@ class ClienteComPetForm(forms.Form):
         )
         
         return user, pet
+
+
+class ProdutoImportForm(forms.Form):
+    """
+    Upload de catálogo de produtos (CSV ou JSON lines)
+    """
+    arquivo = forms.FileField(
+        label="Arquivo",
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.jsonl,.ndjson,.json'
+        }),
+        help_text="Colunas: sku, nome, descricao, preco, estoque, categoria, imagem_url"
+    )
+
+    def clean_arquivo(self):
+        """Aceita apenas CSV ou JSON lines"""
+        arquivo = self.cleaned_data.get('arquivo')
+        if arquivo and not arquivo.name.lower().endswith(('.csv', '.jsonl', '.ndjson', '.json')):
+            raise forms.ValidationError("Envie um arquivo .csv ou .jsonl")
+        return arquivo
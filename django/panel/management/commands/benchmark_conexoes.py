@@ -0,0 +1,168 @@
+"""
+Management command de benchmark das conexões com o banco
+
+Mede a latência por requisição em três modos de conexão:
+- sem: CONN_MAX_AGE=0, uma conexão nova por requisição (o comportamento antigo)
+- persistente: CONN_MAX_AGE > 0 com health checks, a conexão é reaproveitada
+- pool: pool de conexões do Django (precisa de PostgreSQL + psycopg 3 com psycopg_pool)
+
+Cada requisição segue o ciclo do Django (request_started/request_finished,
+que abrem/fecham ou devolvem a conexão). Sem --url a requisição é uma
+consulta simples ao banco, isolando o custo de conexão; com --url a página
+é carregada pelo test client (--usuario para páginas que exigem login).
+
+Uso: python manage.py benchmark_conexoes --requisicoes 500 --url /painel-veterinario/ --usuario vet
+"""
+
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import override_settings
+
+from users.models import User
+
+MODOS = ('sem', 'persistente', 'pool')
+
+
+def _pool_disponivel():
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    if not is_psycopg3:
+        return False
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@contextmanager
+def _modo(nome):
+    """Reconfigura a conexão default para o modo durante o bloco"""
+    original = {chave: connection.settings_dict[chave] for chave in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS')}
+    opcoes = {chave: valor for chave, valor in original['OPTIONS'].items() if chave != 'pool'}
+    connection.close()
+    if nome == 'sem':
+        connection.settings_dict.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS=opcoes)
+    elif nome == 'persistente':
+        connection.settings_dict.update(CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True, OPTIONS=opcoes)
+    else:
+        connection.settings_dict.update(
+            CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False,
+            OPTIONS={**opcoes, 'pool': original['OPTIONS'].get('pool') or True},
+        )
+    try:
+        yield
+    finally:
+        connection.close()
+        if nome == 'pool':
+            connection.close_pool()
+        connection.settings_dict.update(original)
+
+
+def _percentil(amostras, p):
+    return statistics.quantiles(amostras, n=100, method='inclusive')[p - 1]
+
+
+class Command(BaseCommand):
+    help = 'Compara a latência por requisição sem conexões persistentes, com conexões persistentes e com pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=200, help='Requisições medidas por modo (padrão: 200)')
+        parser.add_argument('--aquecimento', type=int, default=10, help='Requisições descartadas antes de medir (padrão: 10)')
+        parser.add_argument('--url', help='Página carregada em cada requisição (padrão: só uma consulta ao banco)')
+        parser.add_argument('--usuario', help='Username para login antes de carregar --url')
+        parser.add_argument('--modos', nargs='+', choices=MODOS, default=list(MODOS), help='Modos comparados (padrão: todos)')
+
+    def handle(self, *args, **options):
+        if options['requisicoes'] < 2:
+            raise CommandError('Use pelo menos 2 requisições.')
+        requisicao = self._requisicao(options['url'], options['usuario'])
+
+        resultados = {}
+        for modo in options['modos']:
+            if modo == 'pool' and not _pool_disponivel():
+                self.stdout.write(self.style.WARNING(
+                    '⚠️  pool ignorado: precisa de PostgreSQL com psycopg 3 e psycopg_pool'
+                ))
+                continue
+            with _modo(modo):
+                resultados[modo] = self._medir(requisicao, options['requisicoes'], options['aquecimento'], modo)
+
+        self.stdout.write(f'  {"Modo":<12} {"p50":>9} {"p95":>9} {"p99":>9} {"média":>9} {"conexões":>9}')
+        for modo, (amostras, conexoes) in resultados.items():
+            self.stdout.write(
+                f'  {modo:<12} {_percentil(amostras, 50):>7.2f}ms {_percentil(amostras, 95):>7.2f}ms '
+                f'{_percentil(amostras, 99):>7.2f}ms {statistics.fmean(amostras):>7.2f}ms {conexoes:>9}'
+            )
+
+        if 'sem' in resultados and len(resultados) > 1:
+            base = _percentil(resultados['sem'][0], 50)
+            for modo, (amostras, _) in resultados.items():
+                if modo != 'sem':
+                    ganho = base - _percentil(amostras, 50)
+                    self.stdout.write(self.style.SUCCESS(
+                        f'✅ {modo}: p50 {ganho:.2f}ms ({ganho / base:.0%}) menor que sem reaproveitar conexões'
+                    ))
+
+    def _requisicao(self, url, username):
+        """Função que executa uma requisição completa"""
+        if url is None:
+            def requisicao():
+                request_started.send(sender=self.__class__)
+                try:
+                    User.objects.filter(is_active=True).exists()
+                finally:
+                    request_finished.send(sender=self.__class__)
+            return requisicao
+
+        client = Client()
+        if username:
+            try:
+                client.force_login(User.objects.get(username=username))
+            except User.DoesNotExist:
+                raise CommandError(f'Usuário {username!r} não encontrado.')
+
+        def requisicao():
+            # o test client não dispara close_old_connections no início da
+            # requisição (é onde o health check acontece); o ciclo real dispara
+            request_started.send(sender=self.__class__)
+            with override_settings(ALLOWED_HOSTS=['*']):
+                response = client.get(url)
+            if response.status_code >= 400:
+                raise CommandError(f'{url} respondeu {response.status_code}')
+        return requisicao
+
+    def _medir(self, requisicao, total, aquecimento, modo):
+        conexoes = 0
+
+        def contar(sender, connection, **kwargs):
+            nonlocal conexoes
+            if connection.alias == 'default':
+                conexoes += 1
+
+        for _ in range(aquecimento):
+            requisicao()
+
+        connection_created.connect(contar)
+        try:
+            amostras = []
+            for _ in range(total):
+                inicio = time.perf_counter()
+                requisicao()
+                amostras.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            connection_created.disconnect(contar)
+
+        if modo == 'pool':
+            # connection_created conta cada conexão tirada do pool; o que
+            # interessa é quantas o pool realmente abriu
+            conexoes = connection.pool.get_stats().get('connections_num', 0)
+        return amostras, conexoes
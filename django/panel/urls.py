@@ -14,6 +14,8 @@ from .views import (
     ClienteCadastroFuncView,
     ClienteEditarView,
     ClienteAdicionarPetView,
+    ProdutoImportView,
+    ProdutoExportView,
 )
 
 app_name = 'panel'
@@ -48,5 +50,9 @@ urlpatterns = [
     
     # Visualização de pets
     path('pets/', PetAdminListView.as_view(), name='pets_list'),
+    
+    # Importação/exportação de produtos
+    path('produtos/importar/', ProdutoImportView.as_view(), name='produtos_importar'),
+    path('produtos/exportar/', ProdutoExportView.as_view(), name='produtos_exportar'),
 ]
 
@@ -11,6 +11,7 @@ from .pets import PetAdminListView
 from .clientes import ClienteListView
 from .cliente_cadastro import ClienteCadastroFuncView
 from .cliente_edicao import ClienteEditarView, ClienteAdicionarPetView
+from .produtos import ProdutoImportView, ProdutoExportView
 
 __all__ = [
     'DashboardView',
@@ -32,5 +33,7 @@ __all__ = [
     'ClienteCadastroFuncView',
     'ClienteEditarView',
     'ClienteAdicionarPetView',
+    'ProdutoImportView',
+    'ProdutoExportView',
 ]
 
@@ -4,12 +4,13 @@ Views para gerenciamento de clientes no painel do funcionário
 
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count, Q
+from app.db_router import ReplicaMixin
+from users import busca
 from users.models import User
 from pets.models import Animal
 
 
-class ClienteListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class ClienteListView(LoginRequiredMixin, UserPassesTestMixin, ReplicaMixin, ListView):
     """Lista todos os clientes com seus pets"""
     model = User
     template_name = 'clientes/list.html'
@@ -27,21 +28,16 @@ class ClienteListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     
     def get_queryset(self):
         """Retorna todos os clientes (incluindo os que se cadastraram por conta própria)"""
+        # total de pets vem do contador User.total_pets_ativos: sem JOIN/GROUP BY,
+        # a página é lida direto pelo índice (user_type, -date_joined)
         queryset = User.objects.filter(
             user_type=User.CLIENTE
-        ).annotate(
-            total_pets=Count('animais')
         ).order_by('-date_joined')
         
-        # Filtro de busca
-        search = self.request.GET.get('search')
+        # Busca por nome, e-mail, CPF ou telefone (índice de trigramas em User.busca)
+        search = self.request.GET.get('search', '').strip()
         if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(username__icontains=search)
-            )
+            queryset = queryset.filter(busca.filtro(search))
         
         return queryset
     
@@ -50,9 +46,8 @@ class ClienteListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         
         # Adiciona os pets de cada cliente
         for cliente in context['clientes']:
-            cliente.pets = Animal.objects.filter(
-                proprietario=cliente,
-                ativo=True
+            cliente.pets = Animal.ativos.filter(
+                proprietario=cliente
             ).select_related('tipo_animal', 'raca')[:5]  # Limita a 5 pets por cliente
         
         context['total_clientes'] = User.objects.filter(
@@ -7,6 +7,8 @@ from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db.models import Count, Q
 from django.utils import timezone
+from app.fragmentos import adiado, versao
+from produtos.cache import versao_catalogo
 from users.models import User
 from pets.models import Animal, TipoAnimal, Raca
 
@@ -35,18 +37,22 @@ class DashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        # Chave do bloco em cache no template; as estatísticas só são
+        # consultadas quando o bloco não está no cache
+        context['versao_dashboard'] = versao('usuarios', 'pets')
+        
         # Estatísticas de usuários
-        context['total_usuarios'] = User.objects.count()
-        context['usuarios_ativos'] = User.objects.filter(is_active=True).count()
-        context['usuarios_staff'] = User.objects.filter(is_staff=True).count()
+        context['total_usuarios'] = adiado(User.objects.count)
+        context['usuarios_ativos'] = adiado(User.objects.filter(is_active=True).count)
+        context['usuarios_staff'] = adiado(User.objects.filter(is_staff=True).count)
         
         # Estatísticas de pets
-        context['total_pets'] = Animal.objects.filter(ativo=True).count()
-        context['total_tipos_animais'] = TipoAnimal.objects.filter(ativo=True).count()
-        context['total_racas'] = Raca.objects.filter(ativo=True).count()
+        context['total_pets'] = adiado(Animal.ativos.count)
+        context['total_tipos_animais'] = adiado(TipoAnimal.ativos.count)
+        context['total_racas'] = adiado(Raca.ativos.count)
         
         # Distribuição de pets por tipo
-        context['pets_por_tipo'] = Animal.objects.filter(ativo=True).values(
+        context['pets_por_tipo'] = Animal.ativos.values(
             'tipo_animal__nome'
         ).annotate(
             total=Count('id')
@@ -56,7 +62,7 @@ class DashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         context['ultimos_usuarios'] = User.objects.order_by('-date_joined')[:5]
         
         # Últimos pets cadastrados
-        context['ultimos_pets'] = Animal.objects.filter(ativo=True).select_related(
+        context['ultimos_pets'] = Animal.ativos.select_related(
             'proprietario', 'tipo_animal', 'raca'
         ).order_by('-criado_em')[:5]
         
@@ -88,16 +94,18 @@ class DashboardFuncView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        context['versao_dashboard'] = f'{versao("usuarios", "pets")}.{versao_catalogo()}'
+        
         # Estatísticas de clientes e pets
-        context['total_clientes'] = User.objects.filter(user_type=User.CLIENTE, is_active=True).count()
-        context['total_pets'] = Animal.objects.filter(ativo=True).count()
-        context['total_tipos_animais'] = TipoAnimal.objects.filter(ativo=True).count()
-        context['total_racas'] = Raca.objects.filter(ativo=True).count()
+        context['total_clientes'] = adiado(User.objects.filter(user_type=User.CLIENTE, is_active=True).count)
+        context['total_pets'] = adiado(Animal.ativos.count)
+        context['total_tipos_animais'] = adiado(TipoAnimal.ativos.count)
+        context['total_racas'] = adiado(Raca.ativos.count)
         
         # Produtos disponíveis (importar modelo somente se existir)
         try:
             from produtos.models import Produto
-            context['total_produtos'] = Produto.objects.filter(estoque__gt=0).count()
+            context['total_produtos'] = adiado(Produto.objects.filter(estoque__gt=0).count)
             context['produtos_destaque'] = Produto.objects.filter(
                 estoque__gt=0
             ).order_by('-produto_id')[:5]
@@ -111,7 +119,7 @@ class DashboardFuncView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         ).order_by('-date_joined')[:5]
         
         # Últimos pets cadastrados
-        context['ultimos_pets'] = Animal.objects.filter(ativo=True).select_related(
+        context['ultimos_pets'] = Animal.ativos.select_related(
             'proprietario', 'tipo_animal', 'raca'
         ).order_by('-criado_em')[:5]
         
@@ -6,10 +6,13 @@ Painel administrativo para ver todos os pets do sistema
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db.models import Q
+from app.db_router import ReplicaMixin
 from pets.models import Animal, TipoAnimal
+from users import busca
+from users.models import User
 
 
-class PetAdminListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class PetAdminListView(LoginRequiredMixin, UserPassesTestMixin, ReplicaMixin, ListView):
     """Lista todos os pets cadastrados no sistema"""
     model = Animal
     template_name = 'pets/list.html'
@@ -32,29 +35,30 @@ class PetAdminListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         # Filtro por status
         status = self.request.GET.get('status', '')
         if status == 'ativo':
-            queryset = queryset.filter(ativo=True)
+            queryset = queryset.ativos()
         elif status == 'inativo':
-            queryset = queryset.filter(ativo=False)
+            queryset = queryset.inativos()
         
         # Filtro por tipo de animal
         tipo_id = self.request.GET.get('tipo', '')
         if tipo_id:
             queryset = queryset.filter(tipo_animal_id=tipo_id)
         
-        # Busca por nome do pet ou proprietário
+        # Busca por nome do pet ou proprietário (nome, e-mail, CPF, telefone);
+        # os proprietários saem do índice de busca numa subquery, sem JOIN
         search = self.request.GET.get('search', '').strip()
         if search:
+            proprietarios = User.objects.filter(busca.filtro(search)).values('pk')
             queryset = queryset.filter(
                 Q(nome__icontains=search) |
-                Q(proprietario__username__icontains=search) |
-                Q(proprietario__email__icontains=search)
+                Q(proprietario__in=proprietarios)
             )
         
         return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tipos_animais'] = TipoAnimal.objects.filter(ativo=True).order_by('nome')
+        context['tipos_animais'] = TipoAnimal.ativos.order_by('nome')
         context['status_filter'] = self.request.GET.get('status', '')
         context['tipo_filter'] = self.request.GET.get('tipo', '')
         context['search'] = self.request.GET.get('search', '')
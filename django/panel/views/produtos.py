@@ -0,0 +1,61 @@
+"""
+Views para importação e exportação do catálogo de produtos
+Apenas para administradores
+"""
+
+from django.views.generic import FormView, View
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.urls import reverse_lazy
+from django.contrib import messages
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from app.db_router import ReplicaMixin
+from panel.forms import ProdutoImportForm
+from produtos.importacao import importar_arquivo, exportar_csv, exportar_jsonl
+
+
+class ProdutoImportView(LoginRequiredMixin, UserPassesTestMixin, FormView):
+    """Importa/atualiza produtos em lote a partir de um arquivo enviado"""
+    template_name = 'produtos/importar.html'
+    form_class = ProdutoImportForm
+    success_url = reverse_lazy('panel:produtos_importar')
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def form_valid(self, form):
+        arquivo = form.cleaned_data['arquivo']
+        # o upload já está em disco/memória do Django; a leitura é linha a linha
+        resultado = importar_arquivo(arquivo.file, arquivo.name)
+
+        messages.success(
+            self.request,
+            f"✅ {resultado['gravadas']} produto(s) importado(s) de {resultado['lidas']} linha(s)."
+        )
+        if resultado['invalidas']:
+            messages.warning(
+                self.request,
+                f"⚠️ {resultado['invalidas']} linha(s) ignorada(s): " + '; '.join(resultado['erros'][:5])
+            )
+        return super().form_valid(form)
+
+
+class ProdutoExportView(LoginRequiredMixin, UserPassesTestMixin, ReplicaMixin, View):
+    """Exporta o catálogo em streaming (sem montar o arquivo em memória)"""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        formato = request.GET.get('formato', 'csv')
+        data = timezone.localdate().strftime('%Y%m%d')
+
+        if formato == 'jsonl':
+            response = StreamingHttpResponse(exportar_jsonl(), content_type='application/x-ndjson')
+            nome = f'produtos-{data}.jsonl'
+        else:
+            response = StreamingHttpResponse(exportar_csv(), content_type='text/csv; charset=utf-8')
+            nome = f'produtos-{data}.csv'
+
+        response['Content-Disposition'] = f'attachment; filename="{nome}"'
+        return response
@@ -9,10 +9,11 @@ from django.urls import reverse_lazy
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.db.models import Q
+from app.db_router import ReplicaMixin
 from pets.models import Raca, TipoAnimal, Animal
 
 
-class RacaAdminListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class RacaAdminListView(LoginRequiredMixin, UserPassesTestMixin, ReplicaMixin, ListView):
     """Lista todas as raças com filtro por tipo"""
     model = Raca
     template_name = 'racas/list.html'
@@ -41,7 +42,7 @@ class RacaAdminListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tipos_animais'] = TipoAnimal.objects.filter(ativo=True).order_by('nome')
+        context['tipos_animais'] = TipoAnimal.ativos.order_by('nome')
         context['tipo_filter'] = self.request.GET.get('tipo', '')
         context['search'] = self.request.GET.get('search', '')
         return context
@@ -59,7 +60,7 @@ class RacaAdminCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tipos_animais'] = TipoAnimal.objects.filter(ativo=True).order_by('nome')
+        context['tipos_animais'] = TipoAnimal.ativos.order_by('nome')
         context['titulo'] = 'Cadastrar Raça'
         context['botao'] = 'Cadastrar'
         return context
@@ -84,7 +85,7 @@ class RacaAdminUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tipos_animais'] = TipoAnimal.objects.filter(ativo=True).order_by('nome')
+        context['tipos_animais'] = TipoAnimal.ativos.order_by('nome')
         context['titulo'] = f'Editar {self.object.nome}'
         context['botao'] = 'Salvar Alterações'
         return context
@@ -8,10 +8,11 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.shortcuts import redirect
+from app.db_router import ReplicaMixin
 from pets.models import TipoAnimal, Raca, Animal
 
 
-class TipoAnimalAdminListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class TipoAnimalAdminListView(LoginRequiredMixin, UserPassesTestMixin, ReplicaMixin, ListView):
     """Lista todos os tipos de animais"""
     model = TipoAnimal
     template_name = 'tipos_animais/list.html'
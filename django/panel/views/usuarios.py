@@ -8,12 +8,13 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib import messages
-from django.db.models import Q
+from app.db_router import ReplicaMixin
+from users import busca
 from users.models import User
 from users.forms import FuncionarioCreateForm
 
 
-class UsuarioListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class UsuarioListView(LoginRequiredMixin, UserPassesTestMixin, ReplicaMixin, ListView):
     """Lista todos os usuários do sistema com busca"""
     model = User
     template_name = 'usuarios/list.html'
@@ -26,16 +27,10 @@ class UsuarioListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     def get_queryset(self):
         queryset = User.objects.all().order_by('-date_joined')
         
-        # Busca por nome, email ou username
+        # Busca por nome, email, username, CRMV, CPF ou telefone
         search = self.request.GET.get('search', '').strip()
         if search:
-            queryset = queryset.filter(
-                Q(username__icontains=search) |
-                Q(email__icontains=search) |
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(crmv__icontains=search)
-            )
+            queryset = queryset.filter(busca.filtro(search))
         
         # Filtro por status
         status = self.request.GET.get('status', '')
@@ -0,0 +1,102 @@
+"""
+Contador desnormalizado User.total_pets_ativos
+
+Mantido pelo save()/delete() de Animal, na mesma transação da alteração,
+com UPDATE ... SET total_pets_ativos = total_pets_ativos + delta (F()):
+atualizações simultâneas do mesmo tutor não se perdem. Só muda quando o
+animal é criado/excluído ativo, é ativado/desativado ou troca de tutor.
+
+Caminhos que não passam pelo model (QuerySet.update/delete, SQL manual)
+deixam o contador divergente; reconciliar() (comando
+reconciliar_contadores_pets) recalcula e corrige em lotes. Até lá, um
+decremento sobre um contador já zerado para em 0 em vez de violar o
+CHECK do PositiveIntegerField.
+"""
+
+from django.db import transaction
+from django.db.models import Case, Count, F, PositiveIntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from users.models import User
+
+from .models import Animal
+
+
+def ajustar(proprietario_id, delta):
+    total = F('total_pets_ativos') + delta
+    if delta < 0:
+        # contador divergente (já em 0) não pode quebrar a desativação/exclusão do pet
+        total = Greatest(total, 0)
+    User.objects.filter(pk=proprietario_id).update(total_pets_ativos=total)
+
+
+def recalcular(proprietario_id):
+    """Recalcula o contador de um tutor a partir da tabela de animais"""
+    ativos = Animal.ativos.filter(proprietario_id=proprietario_id).order_by()
+    User.objects.filter(pk=proprietario_id).update(
+        total_pets_ativos=Coalesce(ativos.values('proprietario_id').annotate(total=Count('id')).values('total'), 0)
+    )
+
+
+def animal_salvo(animal, anterior, novo):
+    """
+    Ajusta os contadores depois de salvar o animal.
+    anterior: (proprietario_id, ativo) como estava no banco, ou None se desconhecido
+    """
+    if novo:
+        if animal.ativo:
+            ajustar(animal.proprietario_id, 1)
+        return
+    if anterior is None:
+        # instância carregada sem esses campos (.only()/.defer()): conta de novo
+        recalcular(animal.proprietario_id)
+        return
+    proprietario_anterior, ativo_anterior = anterior
+    if (proprietario_anterior, ativo_anterior) == (animal.proprietario_id, animal.ativo):
+        return
+    if ativo_anterior:
+        ajustar(proprietario_anterior, -1)
+    if animal.ativo:
+        ajustar(animal.proprietario_id, 1)
+
+
+def animal_excluido(animal, anterior):
+    if anterior is None:
+        recalcular(animal.proprietario_id)
+    elif anterior[1]:
+        ajustar(anterior[0], -1)
+
+
+def reconciliar(lote=1000, corrigir=True):
+    """
+    Confere o contador de todos os usuários com a contagem real, em lotes
+    por id. Ao corrigir, as linhas do lote ficam travadas (SELECT ... FOR
+    UPDATE) enquanto conta, então um ajuste simultâneo espera e é aplicado
+    sobre o valor corrigido. Retorna (verificados, divergentes).
+    """
+    verificados = divergentes = 0
+    ultimo_id = 0
+    while True:
+        with transaction.atomic():
+            usuarios = User.objects.filter(id__gt=ultimo_id).order_by('id')
+            if corrigir:
+                usuarios = usuarios.select_for_update()
+            linhas = list(usuarios.values_list('id', 'total_pets_ativos')[:lote])
+            if not linhas:
+                return verificados, divergentes
+            ultimo_id = linhas[-1][0]
+
+            reais = dict(
+                Animal.ativos.filter(proprietario_id__in=[id_ for id_, _ in linhas])
+                .order_by().values_list('proprietario_id').annotate(total=Count('id'))
+            )
+            errados = {id_: reais.get(id_, 0) for id_, atual in linhas if reais.get(id_, 0) != atual}
+            if errados and corrigir:
+                User.objects.filter(pk__in=errados).update(total_pets_ativos=Case(
+                    *[When(pk=id_, then=Value(total)) for id_, total in errados.items()],
+                    output_field=PositiveIntegerField(),
+                ))
+        verificados += len(linhas)
+        divergentes += len(errados)
+        if len(linhas) < lote:
+            return verificados, divergentes
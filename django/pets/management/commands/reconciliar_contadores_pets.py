@@ -0,0 +1,38 @@
+"""
+Management command para reconciliar o contador User.total_pets_ativos
+Recalcula a contagem real de pets ativos de cada usuário e corrige os
+contadores divergentes (ex: depois de QuerySet.update() ou SQL manual)
+
+Uso: python manage.py reconciliar_contadores_pets [--apenas-verificar]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pets import contadores
+
+
+class Command(BaseCommand):
+    help = 'Confere e corrige o contador de pets ativos dos usuários'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Usuários por transação (padrão: 1000)')
+        parser.add_argument('--apenas-verificar', action='store_true', help='Só conta as divergências, sem corrigir')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote precisa ser maior que zero.')
+        corrigir = not options['apenas_verificar']
+
+        self.stdout.write(self.style.WARNING('🔄 Conferindo contadores de pets ativos...'))
+        verificados, divergentes = contadores.reconciliar(options['lote'], corrigir=corrigir)
+
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS(f'✅ {verificados} usuário(s) verificado(s), nenhum contador divergente'))
+        elif corrigir:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {verificados} usuário(s) verificado(s), {divergentes} contador(es) corrigido(s)'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {verificados} usuário(s) verificado(s), {divergentes} contador(es) divergente(s)'
+            ))
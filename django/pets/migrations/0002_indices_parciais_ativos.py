@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='animal',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['proprietario', '-criado_em'], name='animal_tutor_ativo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='raca',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['tipo_animal', 'nome'], name='raca_tipo_nome_ativa_idx'),
+        ),
+    ]
@@ -13,11 +13,34 @@ Relacionamentos:
 - Um Animal pertence a UMA Raça
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 
+from app.fragmentos import InvalidaFragmentos
 
-class TipoAnimal(models.Model):
+
+class AtivoQuerySet(models.QuerySet):
+    """QuerySet de models com exclusão lógica (campo ativo)"""
+
+    def ativos(self):
+        return self.filter(ativo=True)
+
+    def inativos(self):
+        return self.filter(ativo=False)
+
+
+class AtivosManager(models.Manager.from_queryset(AtivoQuerySet)):
+    """
+    Só registros ativos: Model.ativos.filter(...). O manager padrão
+    (objects) continua com todos, para o admin, filtros de inativos e
+    para acessar raça/tipo desativados de um animal.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().ativos()
+
+
+class TipoAnimal(InvalidaFragmentos, models.Model):
     """
     Tipo/Espécie de animal (Cachorro, Gato, etc)
     """
@@ -38,6 +61,12 @@ class TipoAnimal(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    objects = AtivoQuerySet.as_manager()
+    ativos = AtivosManager()
+
+    # 'racas': nomes de espécie/raça em cache no portal do cliente (users/portal.py)
+    dominios_fragmentos = ('pets', 'racas')
+
     class Meta:
         verbose_name = "Tipo de Animal"
         verbose_name_plural = "Tipos de Animais"
@@ -47,7 +76,7 @@ class TipoAnimal(models.Model):
         return f"{self.icone} {self.nome}" if self.icone else self.nome
 
 
-class Raca(models.Model):
+class Raca(InvalidaFragmentos, models.Model):
     """
     Raça de um tipo específico de animal
     """
@@ -72,17 +101,29 @@ class Raca(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    objects = AtivoQuerySet.as_manager()
+    ativos = AtivosManager()
+
+    # 'racas': nomes de espécie/raça em cache no portal do cliente (users/portal.py)
+    dominios_fragmentos = ('pets', 'racas')
+
     class Meta:
         verbose_name = "Raça"
         verbose_name_plural = "Raças"
         ordering = ['tipo_animal', 'nome']
         unique_together = ['tipo_animal', 'nome']  # Evita raça duplicada para mesmo tipo
+        indexes = [
+            # raças ativas de um tipo, por nome (selects e API de raças por tipo)
+            models.Index(
+                fields=['tipo_animal', 'nome'], condition=models.Q(ativo=True), name='raca_tipo_nome_ativa_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.nome} ({self.tipo_animal.nome})"
 
 
-class Animal(models.Model):
+class Animal(InvalidaFragmentos, models.Model):
     """
     Animal (Pet) individual com proprietário
     
@@ -151,16 +192,50 @@ class Animal(models.Model):
     #     help_text="Foto do animal"
     # )
 
+    objects = AtivoQuerySet.as_manager()
+    ativos = AtivosManager()
+
+    dominios_fragmentos = ('pets',)
+
+    # (proprietario_id, ativo) como carregados do banco, para o contador
+    # User.total_pets_ativos no save()/delete() (ver pets/contadores.py)
+    _contador_original = None
+
     class Meta:
         verbose_name = "Animal"
         verbose_name_plural = "Animais"
         ordering = ['-criado_em']  # Mais recentes primeiro
         # Um usuário não pode ter dois animais com o mesmo nome
         unique_together = ['proprietario', 'nome']
+        indexes = [
+            # pets ativos de um tutor, mais recentes primeiro (home, "meus pets",
+            # listagem de clientes, contador de pets ativos)
+            models.Index(
+                fields=['proprietario', '-criado_em'], condition=models.Q(ativo=True), name='animal_tutor_ativo_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.nome} ({self.raca.nome}) - {self.proprietario.username}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'proprietario_id' in field_names and 'ativo' in field_names:
+            instance._contador_original = (instance.proprietario_id, instance.ativo)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        from pets import contadores
+        from users import portal
+        novo = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            contadores.animal_salvo(self, self._contador_original, novo)
+            proprietario_anterior = self._contador_original[0] if self._contador_original else None
+            portal.invalidar_ao_confirmar(self.proprietario_id, proprietario_anterior)
+        self._contador_original = (self.proprietario_id, self.ativo)
+    
     @property
     def idade_anos(self):
         from datetime import date
@@ -206,4 +281,9 @@ class Animal(models.Model):
                 "Cancele as consultas antes de excluir o animal."
             )
         
-        super().delete(*args, **kwargs)
+        from pets import contadores
+        from users import portal
+        with transaction.atomic():
+            super().delete(*args, **kwargs)
+            contadores.animal_excluido(self, self._contador_original)
+            portal.invalidar_ao_confirmar(self.proprietario_id)
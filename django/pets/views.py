@@ -14,6 +14,7 @@ from django.contrib.auth.decorators import login_required
 from django.urls import reverse_lazy
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
+from app.db_router import ReplicaMixin, usar_replica
 from .models import TipoAnimal, Raca, Animal
 
 
@@ -21,7 +22,7 @@ from .models import TipoAnimal, Raca, Animal
 # Views de animal (pet)
 # ====================================
 
-class AnimalListView(LoginRequiredMixin, ListView):
+class AnimalListView(LoginRequiredMixin, ReplicaMixin, ListView):
     """Lista apenas os animais do usuário logado"""
     model = Animal
     template_name = 'animal_list.html'
@@ -29,9 +30,8 @@ class AnimalListView(LoginRequiredMixin, ListView):
     
     def get_queryset(self):
         # Retorna apenas animais ativos do usuário logado
-        return Animal.objects.filter(
-            proprietario=self.request.user,
-            ativo=True
+        return Animal.ativos.filter(
+            proprietario=self.request.user
         ).select_related('tipo_animal', 'raca').order_by('-criado_em')
 
 
@@ -44,7 +44,7 @@ class AnimalCreateView(LoginRequiredMixin, CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tipos_de_animais'] = TipoAnimal.objects.filter(ativo=True)
+        context['tipos_de_animais'] = TipoAnimal.ativos.all()
         context['titulo'] = 'Cadastrar Novo Pet'
         context['botao'] = 'Cadastrar'
         return context
@@ -77,7 +77,7 @@ class AnimalUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tipos_de_animais'] = TipoAnimal.objects.filter(ativo=True)
+        context['tipos_de_animais'] = TipoAnimal.ativos.all()
         context['titulo'] = f'Editar {self.object.nome}'
         context['botao'] = 'Salvar Alterações'
         return context
@@ -110,14 +110,14 @@ class AnimalDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 # Views de tipo de animal
 # ====================================
 
-class TipoAnimalListView(LoginRequiredMixin, ListView):
+class TipoAnimalListView(LoginRequiredMixin, ReplicaMixin, ListView):
     """Lista todos os tipos de animais"""
     model = TipoAnimal
     template_name = 'tipoanimal_list.html'
     context_object_name = 'tipos'
     
     def get_queryset(self):
-        return TipoAnimal.objects.filter(ativo=True)
+        return TipoAnimal.ativos.all()
 
 
 class TipoAnimalCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
@@ -139,14 +139,14 @@ class TipoAnimalCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
 # Views de Raça
 # ====================================
 
-class RacaListView(LoginRequiredMixin, ListView):
+class RacaListView(LoginRequiredMixin, ReplicaMixin, ListView):
     """Lista todas as raças"""
     model = Raca
     template_name = 'raca_list.html'
     context_object_name = 'racas'
     
     def get_queryset(self):
-        return Raca.objects.filter(ativo=True).select_related('tipo_animal')
+        return Raca.ativos.select_related('tipo_animal')
 
 
 class RacaCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
@@ -161,7 +161,7 @@ class RacaCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tipos_de_animais'] = TipoAnimal.objects.filter(ativo=True)
+        context['tipos_de_animais'] = TipoAnimal.ativos.all()
         return context
     
     def form_valid(self, form):
@@ -174,6 +174,7 @@ class RacaCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
 # ====================================
 
 @login_required
+@usar_replica
 def get_racas_by_tipo(request):
     """
     API endpoint para buscar raças de um tipo específico
@@ -183,9 +184,8 @@ def get_racas_by_tipo(request):
     if not tipo_animal_id:
         return JsonResponse({'error': 'tipo_id não fornecido'}, status=400)
     
-    racas = Raca.objects.filter(
-        tipo_animal_id=tipo_animal_id,
-        ativo=True
+    racas = Raca.ativos.filter(
+        tipo_animal_id=tipo_animal_id
     ).order_by('nome').values('id', 'nome')
     
     return JsonResponse(list(racas), safe=False)
@@ -0,0 +1,27 @@
+"""
+Versão do catálogo de produtos usada nas chaves de cache
+
+Qualquer alteração em Produto (preço, nome, imagem, exclusão) incrementa
+a versão; caches que dependem do catálogo incluem a versão na chave e
+ficam obsoletos automaticamente, sem precisar apagar chave por chave.
+"""
+
+from django.core.cache import cache
+
+CHAVE_VERSAO = 'produtos:catalogo:versao'
+
+
+def versao_catalogo():
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        cache.add(CHAVE_VERSAO, 1, timeout=None)
+        versao = cache.get(CHAVE_VERSAO, 1)
+    return versao
+
+
+def invalidar_catalogo():
+    try:
+        cache.incr(CHAVE_VERSAO)
+    except ValueError:
+        # chave ainda não existe (ou expirou do cache)
+        cache.add(CHAVE_VERSAO, 2, timeout=None)
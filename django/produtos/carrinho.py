@@ -0,0 +1,176 @@
+"""
+Operações atômicas sobre o carrinho de compras
+
+Em vez de get_or_create + leitura/escrita da quantidade em Python
+(que perde atualizações com cliques concorrentes), cada operação é
+feita com upserts de uma única instrução:
+
+- o carrinho do usuário: INSERT ... ON CONFLICT (usuario_id) ... RETURNING id
+- os itens: INSERT ... ON CONFLICT (carrinho_id, produto_id)
+  DO UPDATE SET quantidade = quantidade + EXCLUDED.quantidade
+
+As constraints únicas de CarrinhoDeCompras(usuario) e
+ItemDoCarrinho(carrinho, produto) são o alvo dos ON CONFLICT.
+
+O resumo do carrinho (quantidade de itens e total) é calculado no banco
+com Sum(F('quantidade') * F('produto__preco')) e guardado em cache por
+usuário; as operações acima invalidam o cache após o commit e mudanças
+no catálogo invalidam via versão (ver produtos/cache.py).
+"""
+
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
+from .cache import versao_catalogo
+from .models import Produto, CarrinhoDeCompras, ItemDoCarrinho
+
+# Tempo máximo do resumo em cache (segundos)
+RESUMO_TIMEOUT = 60 * 15
+
+_VALOR = DecimalField(max_digits=12, decimal_places=2)
+
+
+def _normalizar(itens):
+    """
+    Aceita {produto_id: quantidade} ou [(produto_id, quantidade)] e
+    retorna um dict com ids inteiros (somando ids repetidos)
+    """
+    if hasattr(itens, 'items'):
+        itens = itens.items()
+    normalizados = {}
+    for produto_id, quantidade in itens:
+        produto_id = int(produto_id)
+        normalizados[produto_id] = normalizados.get(produto_id, 0) + int(quantidade)
+    return normalizados
+
+
+def _produtos_existentes(ids):
+    return set(Produto.objects.filter(produto_id__in=ids).values_list('produto_id', flat=True))
+
+
+def obter_carrinho_id(usuario):
+    """Retorna o id do carrinho do usuário, criando-o se necessário (1 query)"""
+    tabela = connection.ops.quote_name(CarrinhoDeCompras._meta.db_table)
+    with connection.cursor() as cursor:
+        # o DO UPDATE "vazio" faz o RETURNING devolver a linha já existente
+        cursor.execute(
+            f'INSERT INTO {tabela} (usuario_id) VALUES (%s) '
+            f'ON CONFLICT (usuario_id) DO UPDATE SET usuario_id = EXCLUDED.usuario_id '
+            f'RETURNING id',
+            [usuario.pk],
+        )
+        return cursor.fetchone()[0]
+
+
+def adicionar_itens(usuario, itens):
+    """
+    Soma quantidades aos itens do carrinho em uma única instrução.
+    Produtos inexistentes e quantidades <= 0 são ignorados.
+    Retorna a lista de produto_ids efetivamente adicionados.
+    """
+    itens = {pid: qtd for pid, qtd in _normalizar(itens).items() if qtd > 0}
+    if not itens:
+        return []
+
+    existentes = _produtos_existentes(itens)
+    linhas = [(pid, qtd) for pid, qtd in itens.items() if pid in existentes]
+    if not linhas:
+        return []
+
+    tabela = connection.ops.quote_name(ItemDoCarrinho._meta.db_table)
+    with transaction.atomic():
+        carrinho_id = obter_carrinho_id(usuario)
+        valores = ', '.join(['(%s, %s, %s)'] * len(linhas))
+        parametros = [v for pid, qtd in linhas for v in (carrinho_id, pid, qtd)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {tabela} (carrinho_id, produto_id, quantidade) VALUES {valores} '
+                f'ON CONFLICT (carrinho_id, produto_id) '
+                f'DO UPDATE SET quantidade = {tabela}.quantidade + EXCLUDED.quantidade',
+                parametros,
+            )
+        invalidar_resumo(usuario.pk)
+    return [pid for pid, _ in linhas]
+
+
+def adicionar_item(usuario, produto_id, quantidade=1):
+    """Atalho para adicionar um único produto"""
+    return adicionar_itens(usuario, {produto_id: quantidade})
+
+
+def definir_quantidades(usuario, itens):
+    """
+    Define a quantidade absoluta de vários itens de uma vez.
+    Quantidade <= 0 remove o item do carrinho.
+    """
+    itens = _normalizar(itens)
+    if not itens:
+        return
+
+    remover = [pid for pid, qtd in itens.items() if qtd <= 0]
+    existentes = _produtos_existentes([pid for pid, qtd in itens.items() if qtd > 0])
+
+    with transaction.atomic():
+        carrinho_id = obter_carrinho_id(usuario)
+        if remover:
+            ItemDoCarrinho.objects.filter(carrinho_id=carrinho_id, produto_id__in=remover).delete()
+        if existentes:
+            ItemDoCarrinho.objects.bulk_create(
+                [
+                    ItemDoCarrinho(carrinho_id=carrinho_id, produto_id=pid, quantidade=itens[pid])
+                    for pid in existentes
+                ],
+                update_conflicts=True,
+                unique_fields=['carrinho', 'produto'],
+                update_fields=['quantidade'],
+            )
+        invalidar_resumo(usuario.pk)
+
+
+def subtotal_expr():
+    """Expressão de subtotal por item (quantidade x preço), calculada no banco"""
+    return ExpressionWrapper(F('quantidade') * F('produto__preco'), output_field=_VALOR)
+
+
+def itens_do_carrinho(usuario):
+    """Itens do carrinho do usuário com o subtotal anotado pelo banco"""
+    return (
+        ItemDoCarrinho.objects.filter(carrinho__usuario=usuario)
+        .select_related('produto', 'produto__categoria')
+        .annotate(subtotal=subtotal_expr())
+        .order_by('id')
+    )
+
+
+def _chave_resumo(usuario_id):
+    return f'carrinho:resumo:{versao_catalogo()}:{usuario_id}'
+
+
+def calcular_resumo(usuario):
+    """Agrega quantidade de itens e total em uma única query"""
+    resumo = ItemDoCarrinho.objects.filter(carrinho__usuario=usuario).aggregate(
+        itens=Coalesce(Sum('quantidade'), 0),
+        total=Coalesce(Sum(subtotal_expr()), Value(Decimal('0.00')), output_field=_VALOR),
+    )
+    return {'itens': resumo['itens'], 'total': resumo['total'].quantize(Decimal('0.01'))}
+
+
+def resumo_carrinho(usuario):
+    """
+    Resumo do carrinho ({'itens': int, 'total': Decimal}) lido do cache
+    quando possível
+    """
+    chave = _chave_resumo(usuario.pk)
+    resumo = cache.get(chave)
+    if resumo is None:
+        resumo = calcular_resumo(usuario)
+        cache.set(chave, resumo, RESUMO_TIMEOUT)
+    return resumo
+
+
+def invalidar_resumo(usuario_id):
+    """Apaga o resumo em cache após o commit da transação atual"""
+    transaction.on_commit(lambda: cache.delete(_chave_resumo(usuario_id)))
+
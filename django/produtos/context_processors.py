@@ -0,0 +1,16 @@
+"""
+Context processors do app de produtos
+"""
+
+from django.utils.functional import SimpleLazyObject
+from . import carrinho
+
+
+def resumo_carrinho(request):
+    """
+    Disponibiliza {{ resumo_carrinho.itens }} / {{ resumo_carrinho.total }}
+    nos templates. É preguiçoso: só consulta o cache/banco se o template usar.
+    """
+    if not getattr(request, 'user', None) or not request.user.is_authenticated:
+        return {}
+    return {'resumo_carrinho': SimpleLazyObject(lambda: carrinho.resumo_carrinho(request.user))}
@@ -0,0 +1,147 @@
+"""
+Pipeline de variantes responsivas para Produto.imagem
+
+Quando uma imagem é enviada, gera versões redimensionadas (WebP e JPEG)
+em larguras fixas, salvas ao lado do original com o hash do conteúdo no
+nome (ex: imagens/7/racao-320w.1a2b3c4d5e6f.webp). Como o nome muda
+sempre que o conteúdo muda, os arquivos podem ser servidos com cache
+de longo prazo.
+
+O processamento roda em um pool de threads em segundo plano, disparado
+após o commit da transação, para não atrasar a requisição de upload.
+"""
+
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Larguras geradas para cada imagem (em pixels)
+LARGURAS = getattr(settings, 'PRODUTOS_IMAGEM_LARGURAS', (320, 640, 960))
+
+# Formatos gerados: nome do formato no Pillow -> (extensão, qualidade)
+FORMATOS = {
+    'WEBP': ('webp', 80),
+    'JPEG': ('jpg', 82),
+}
+
+_executor = None
+
+
+def _get_executor():
+    """Cria o pool de workers sob demanda (um por processo)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'PRODUTOS_IMAGEM_WORKERS', 2),
+            thread_name_prefix='produtos-imagens',
+        )
+    return _executor
+
+
+def agendar_variantes(produto_id):
+    """
+    Agenda a geração das variantes para depois do commit.
+    Assim o worker sempre lê a imagem já persistida.
+    """
+    transaction.on_commit(lambda: executar_em_segundo_plano(gerar_variantes, produto_id))
+
+
+def executar_em_segundo_plano(funcao, *args):
+    """Envia uma tarefa de imagem para o pool de workers"""
+    return _get_executor().submit(_executar, funcao, *args)
+
+
+def _executar(funcao, *args):
+    """Executado no worker: roda a tarefa e trata erros/conexões"""
+    try:
+        funcao(*args)
+    except Exception:
+        logger.exception('Erro na tarefa de imagem %s%r', funcao.__name__, args)
+    finally:
+        # Threads do pool não passam pelo ciclo de requisição do Django
+        close_old_connections()
+
+
+def _nome_variante(nome_original, largura, conteudo, extensao):
+    """Monta o nome com hash do conteúdo ao lado da imagem original"""
+    pasta, arquivo = os.path.split(nome_original)
+    base = os.path.splitext(arquivo)[0]
+    digest = hashlib.sha256(conteudo).hexdigest()[:12]
+    return os.path.join(pasta, f'{base}-{largura}w.{digest}.{extensao}')
+
+
+def _redimensionar(imagem, largura):
+    from PIL import Image
+
+    if imagem.width <= largura:
+        return imagem
+    altura = round(imagem.height * largura / imagem.width)
+    return imagem.resize((largura, altura), Image.LANCZOS)
+
+
+def _codificar(imagem, formato, qualidade):
+    if formato == 'JPEG' and imagem.mode not in ('RGB', 'L'):
+        imagem = imagem.convert('RGB')
+    buffer = io.BytesIO()
+    imagem.save(buffer, format=formato, quality=qualidade, optimize=True)
+    return buffer.getvalue()
+
+
+def gerar_variantes(produto_id):
+    """
+    Gera as variantes da imagem atual do produto e grava o mapa em
+    Produto.imagem_variantes. Retorna o mapa gerado.
+
+    Formato do mapa: {'webp': {'320': 'imagens/...webp', ...}, 'jpg': {...}}
+    """
+    from PIL import Image, ImageOps
+    from produtos.models import Produto
+
+    produto = Produto.objects.filter(pk=produto_id).only('imagem', 'imagem_variantes').first()
+    if produto is None:
+        return {}
+
+    antigas = _arquivos(produto.imagem_variantes)
+
+    if not produto.imagem:
+        variantes = {}
+    else:
+        with produto.imagem.open('rb') as arquivo:
+            original = Image.open(arquivo)
+            original.load()
+        original = ImageOps.exif_transpose(original)
+
+        # Não amplia imagens menores que a menor largura
+        larguras = [l for l in LARGURAS if l <= original.width] or [original.width]
+
+        variantes = {}
+        for formato, (extensao, qualidade) in FORMATOS.items():
+            variantes[extensao] = {}
+            for largura in larguras:
+                conteudo = _codificar(_redimensionar(original, largura), formato, qualidade)
+                nome = _nome_variante(produto.imagem.name, largura, conteudo, extensao)
+                # Mesmo hash = mesmo conteúdo, não precisa regravar
+                if not default_storage.exists(nome):
+                    nome = default_storage.save(nome, ContentFile(conteudo))
+                variantes[extensao][str(largura)] = nome
+
+    # update() evita disparar o save() do model (e reagendar o pipeline)
+    Produto.objects.filter(pk=produto_id).update(imagem_variantes=variantes)
+
+    for nome in antigas - _arquivos(variantes):
+        default_storage.delete(nome)
+
+    return variantes
+
+
+def _arquivos(variantes):
+    return {nome for por_largura in (variantes or {}).values() for nome in por_largura.values()}
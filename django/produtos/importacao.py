@@ -0,0 +1,330 @@
+"""
+Importação e exportação de produtos em lote (CSV ou JSON lines)
+
+Importação:
+- as linhas são lidas de forma preguiçosa (gerador), nunca o arquivo todo
+- a cada lote, Categoria e Produto são gravados com
+  bulk_create(update_conflicts=True) usando nome_categoria e sku como chave
+- imagens (coluna imagem_url) são baixadas depois, no pool de
+  produtos.imagens, apenas para produtos que ainda não têm imagem
+
+Assim a memória usada é limitada pelo tamanho do lote, e não pelo
+número de linhas do catálogo do fornecedor.
+
+Colunas: sku, nome, descricao, preco, estoque, categoria, imagem_url
+(sku e nome são obrigatórios)
+
+Arquivos que não são UTF-8 válido (ex: CSV exportado pelo Excel no
+Windows) são lidos como cp1252.
+"""
+
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+from decimal import Decimal
+from functools import partial
+from itertools import islice
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+
+from app.rastreamento import span
+
+from .cache import invalidar_catalogo
+from .imagens import executar_em_segundo_plano
+from .models import Categoria, Produto
+
+logger = logging.getLogger(__name__)
+
+COLUNAS = ['sku', 'nome', 'descricao', 'preco', 'estoque', 'categoria', 'imagem_url']
+
+# Máximo de erros guardados no resultado (o total continua sendo contado)
+MAX_ERROS = 50
+
+# Codificação usada quando o arquivo não é UTF-8 válido (padrão do Excel no Windows)
+CODIFICACAO_ALTERNATIVA = 'cp1252'
+
+# Tamanho máximo de uma imagem baixada de imagem_url
+IMAGEM_MAXIMO_BYTES = getattr(settings, 'PRODUTOS_IMAGEM_MAXIMO_BYTES', 10 * 1024 * 1024)
+
+
+class LinhaInvalida(ValueError):
+    pass
+
+
+# ====================================
+# Leitura
+# ====================================
+
+def ler_csv(arquivo):
+    """Gera um dict por linha de um arquivo CSV (texto)"""
+    yield from csv.DictReader(arquivo)
+
+
+def ler_jsonl(arquivo):
+    """Gera um dict por linha de um arquivo JSON lines (texto)"""
+    for linha in arquivo:
+        linha = linha.strip()
+        if linha:
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                # validar_linha reporta como linha inválida, sem abortar a importação
+                yield linha
+
+
+def detectar_codificacao(arquivo_binario, bloco=64 * 1024):
+    """
+    'utf-8-sig' se o arquivo inteiro é UTF-8 válido, senão CODIFICACAO_ALTERNATIVA.
+    Lê em blocos (memória constante) e volta ao início do arquivo: um erro de
+    decodificação no meio da importação deixaria os lotes anteriores gravados.
+    """
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    try:
+        while dados := arquivo_binario.read(bloco):
+            decodificador.decode(dados)
+        decodificador.decode(b'', final=True)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return CODIFICACAO_ALTERNATIVA
+    finally:
+        arquivo_binario.seek(0)
+
+
+def abrir_texto(arquivo_binario):
+    """Envolve um arquivo binário (ex: upload) para leitura como texto (UTF-8 ou cp1252)"""
+    return io.TextIOWrapper(
+        # errors='replace': bytes sem caractere no cp1252 (0x81, 0x8d...) não abortam a leitura
+        arquivo_binario, encoding=detectar_codificacao(arquivo_binario), errors='replace', newline=''
+    )
+
+
+def detectar_formato(nome_arquivo):
+    return 'jsonl' if os.path.splitext(nome_arquivo)[1].lower() in ('.jsonl', '.ndjson', '.json') else 'csv'
+
+
+def ler(arquivo_texto, formato):
+    return ler_jsonl(arquivo_texto) if formato == 'jsonl' else ler_csv(arquivo_texto)
+
+
+# ====================================
+# Validação
+# ====================================
+
+# limites das colunas: preco DecimalField(max_digits=10, decimal_places=2), estoque integer
+PRECO_MAXIMO = Decimal('1e8')
+ESTOQUE_MAXIMO = 2147483647
+
+
+def validar_linha(dados):
+    """Normaliza uma linha; levanta LinhaInvalida com a mensagem do erro"""
+    if not isinstance(dados, dict):
+        raise LinhaInvalida('linha não é um objeto JSON válido')
+    sku = str(dados.get('sku') or '').strip()
+    nome = str(dados.get('nome') or '').strip()
+    if not sku:
+        raise LinhaInvalida('sku é obrigatório')
+    if not nome:
+        raise LinhaInvalida('nome é obrigatório')
+    if len(sku) > 64 or len(nome) > 100:
+        raise LinhaInvalida('sku (64) ou nome (100) maior que o permitido')
+
+    # NaN/sNaN/Infinity e valores fora do DecimalField(max_digits=10, decimal_places=2)
+    # falhariam só no upsert, com os lotes anteriores já gravados
+    try:
+        preco = Decimal(str(dados.get('preco') or '0').replace(',', '.'))
+        if preco.is_finite():
+            preco = preco.quantize(Decimal('0.01'))
+        if not preco.is_finite() or preco >= PRECO_MAXIMO:
+            raise LinhaInvalida(f'preço inválido: {dados.get("preco")!r}')
+    except ArithmeticError:
+        raise LinhaInvalida(f'preço inválido: {dados.get("preco")!r}')
+    if preco < 0:
+        raise LinhaInvalida('preço negativo')
+
+    try:
+        estoque = int(dados.get('estoque') or 0)
+    except (TypeError, ValueError, OverflowError):
+        raise LinhaInvalida(f'estoque inválido: {dados.get("estoque")!r}')
+    if estoque < 0:
+        raise LinhaInvalida('estoque negativo')
+    if estoque > ESTOQUE_MAXIMO:
+        raise LinhaInvalida(f'estoque maior que {ESTOQUE_MAXIMO}')
+
+    imagem_url = str(dados.get('imagem_url') or '').strip()
+
+    return {
+        'sku': sku,
+        'nome': nome,
+        'descricao': str(dados.get('descricao') or ''),
+        'preco': preco,
+        'estoque': estoque,
+        'categoria': str(dados.get('categoria') or '').strip()[:100],
+        # só URLs absolutas podem ser baixadas; o resto é ignorado
+        'imagem_url': imagem_url if urlparse(imagem_url).scheme in ('http', 'https') else '',
+    }
+
+
+# ====================================
+# Gravação
+# ====================================
+
+def _upsert_categorias(nomes, cache_ids):
+    """Garante as categorias do lote e devolve {nome: id} (com cache entre lotes)"""
+    novos = [n for n in nomes if n not in cache_ids]
+    if novos:
+        Categoria.objects.bulk_create(
+            [Categoria(nome_categoria=n) for n in novos],
+            update_conflicts=True,
+            unique_fields=['nome_categoria'],
+            update_fields=['nome_categoria'],
+        )
+        cache_ids.update(
+            Categoria.objects.filter(nome_categoria__in=novos).values_list('nome_categoria', 'id_categoria')
+        )
+    return cache_ids
+
+
+def _gravar_lote(linhas, categorias_ids):
+    # última ocorrência de cada sku vence dentro do lote
+    por_sku = {linha['sku']: linha for linha in linhas}
+    linhas = list(por_sku.values())
+
+    with transaction.atomic():
+        _upsert_categorias({l['categoria'] for l in linhas if l['categoria']}, categorias_ids)
+        Produto.objects.bulk_create(
+            [
+                Produto(
+                    sku=l['sku'],
+                    nome=l['nome'],
+                    descricao=l['descricao'],
+                    preco=l['preco'],
+                    estoque=l['estoque'],
+                    categoria_id=categorias_ids.get(l['categoria']),
+                )
+                for l in linhas
+            ],
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=['nome', 'descricao', 'preco', 'estoque', 'categoria'],
+        )
+
+    imagens = {l['sku']: l['imagem_url'] for l in linhas if l['imagem_url']}
+    if imagens:
+        sem_imagem = (
+            Produto.objects.filter(sku__in=list(imagens))
+            .filter(Q(imagem='') | Q(imagem__isnull=True))
+            .values_list('sku', flat=True)
+        )
+        for sku in sem_imagem:
+            transaction.on_commit(partial(executar_em_segundo_plano, anexar_imagem, sku, imagens[sku]))
+
+    return len(linhas)
+
+
+def importar(linhas, lote=1000):
+    """
+    Importa um iterável de dicts (ex: ler_csv(arquivo)) em lotes.
+    Retorna {'lidas', 'gravadas', 'invalidas', 'erros': [...]}.
+    """
+    resultado = {'lidas': 0, 'gravadas': 0, 'invalidas': 0, 'erros': []}
+    categorias_ids = {}
+    numeradas = enumerate(linhas, start=1)
+
+    while True:
+        bloco = list(islice(numeradas, lote))
+        if not bloco:
+            break
+
+        validas = []
+        for numero, dados in bloco:
+            try:
+                validas.append(validar_linha(dados))
+            except LinhaInvalida as e:
+                resultado['invalidas'] += 1
+                if len(resultado['erros']) < MAX_ERROS:
+                    resultado['erros'].append(f'linha {numero}: {e}')
+
+        resultado['lidas'] += len(bloco)
+        if validas:
+            resultado['gravadas'] += _gravar_lote(validas, categorias_ids)
+
+    if resultado['gravadas']:
+        # bulk_create não passa pelo save(): invalida caches do catálogo uma vez
+        transaction.on_commit(invalidar_catalogo)
+    return resultado
+
+
+def importar_arquivo(arquivo_binario, nome_arquivo, lote=1000):
+    formato = detectar_formato(nome_arquivo)
+    return importar(ler(abrir_texto(arquivo_binario), formato), lote=lote)
+
+
+def anexar_imagem(sku, url):
+    """Executado no pool: baixa a imagem e grava em Produto.imagem (gera variantes)"""
+    import requests
+
+    produto = Produto.objects.filter(sku=sku).first()
+    if produto is None or produto.imagem:
+        return
+
+    # URL vem do arquivo importado: lê em streaming até IMAGEM_MAXIMO_BYTES
+    conteudo = bytearray()
+    with span('produtos.baixar_imagem'), requests.get(url, timeout=15, stream=True) as resposta:
+        resposta.raise_for_status()
+        for parte in resposta.iter_content(chunk_size=64 * 1024):
+            conteudo += parte
+            if len(conteudo) > IMAGEM_MAXIMO_BYTES:
+                logger.warning('Imagem do produto %s ignorada: maior que %d bytes (%s)', sku, IMAGEM_MAXIMO_BYTES, url)
+                return
+    nome = os.path.basename(urlparse(url).path) or f'{sku}.jpg'
+    produto.imagem.save(nome, ContentFile(bytes(conteudo)), save=True)
+
+
+# ====================================
+# Exportação
+# ====================================
+
+class _Eco:
+    """Pseudo-arquivo que devolve o que foi escrito (para csv.writer em streaming)"""
+
+    def write(self, valor):
+        return valor
+
+
+def _linhas_exportacao(lote=2000):
+    produtos = (
+        Produto.objects.order_by('produto_id')
+        .values_list('sku', 'nome', 'descricao', 'preco', 'estoque', 'categoria__nome_categoria', 'imagem')
+        .iterator(chunk_size=lote)
+    )
+    for sku, nome, descricao, preco, estoque, categoria, imagem in produtos:
+        yield {
+            'sku': sku or '',
+            'nome': nome,
+            'descricao': descricao,
+            'preco': f'{preco:.2f}',
+            'estoque': estoque,
+            'categoria': categoria or '',
+            'imagem_url': default_storage.url(imagem) if imagem else '',
+        }
+
+
+def exportar_csv():
+    """Gerador de linhas CSV (cabeçalho + produtos), para StreamingHttpResponse"""
+    writer = csv.DictWriter(_Eco(), fieldnames=COLUNAS)
+    yield writer.writeheader()
+    for linha in _linhas_exportacao():
+        yield writer.writerow(linha)
+
+
+def exportar_jsonl():
+    for linha in _linhas_exportacao():
+        yield json.dumps(linha, ensure_ascii=False) + '\n'
@@ -0,0 +1,21 @@
+"""
+Management command para exportar o catálogo de produtos em CSV ou JSON lines
+(mesmo formato aceito por importar_produtos)
+
+Uso: python manage.py exportar_produtos > catalogo.csv
+"""
+
+from django.core.management.base import BaseCommand
+from produtos.importacao import exportar_csv, exportar_jsonl
+
+
+class Command(BaseCommand):
+    help = 'Exporta todos os produtos em streaming (CSV ou JSON lines)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=['csv', 'jsonl'], default='csv')
+
+    def handle(self, *args, **options):
+        linhas = exportar_jsonl() if options['formato'] == 'jsonl' else exportar_csv()
+        for linha in linhas:
+            self.stdout.write(linha, ending='')
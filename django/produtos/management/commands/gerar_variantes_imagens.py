@@ -0,0 +1,34 @@
+"""
+Management command para gerar as variantes responsivas das imagens
+de produtos já cadastrados (ex: imagens enviadas antes do pipeline)
+"""
+
+from django.core.management.base import BaseCommand
+from produtos.imagens import gerar_variantes
+from produtos.models import Produto
+
+
+class Command(BaseCommand):
+    help = 'Gera variantes WebP/JPEG redimensionadas para as imagens dos produtos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--todas',
+            action='store_true',
+            help='Regera também produtos que já possuem variantes'
+        )
+
+    def handle(self, *args, **options):
+        produtos = Produto.objects.exclude(imagem='').exclude(imagem__isnull=True)
+        if not options['todas']:
+            produtos = produtos.filter(imagem_variantes={})
+
+        total = 0
+        for produto_id in produtos.values_list('produto_id', flat=True).iterator():
+            try:
+                gerar_variantes(produto_id)
+                total += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'  ❌ Produto {produto_id}: {e}'))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Variantes geradas para {total} produto(s)'))
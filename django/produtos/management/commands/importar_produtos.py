@@ -0,0 +1,48 @@
+"""
+Management command para importar o catálogo de produtos de um arquivo
+CSV ou JSON lines (ver produtos/importacao.py para as colunas)
+
+Uso: python manage.py importar_produtos catalogo.csv --lote 2000
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from produtos.importacao import abrir_texto, detectar_formato, importar, ler
+
+
+class Command(BaseCommand):
+    help = 'Importa/atualiza produtos e categorias em lote a partir de CSV ou JSON lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo (.csv ou .jsonl)')
+        parser.add_argument(
+            '--formato',
+            choices=['csv', 'jsonl'],
+            help='Formato do arquivo (padrão: detectado pela extensão)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Linhas gravadas por lote (padrão: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or detectar_formato(options['arquivo'])
+
+        try:
+            # UTF-8 ou cp1252 (ver abrir_texto)
+            arquivo = abrir_texto(open(options['arquivo'], 'rb'))
+        except OSError as e:
+            raise CommandError(f'Não foi possível abrir o arquivo: {e}')
+
+        self.stdout.write(self.style.WARNING(f'📦 Importando {options["arquivo"]} ({formato})...'))
+        with arquivo:
+            resultado = importar(ler(arquivo, formato), lote=options['lote'])
+
+        for erro in resultado['erros']:
+            self.stdout.write(self.style.ERROR(f'  ❌ {erro}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {resultado["lidas"]} linha(s) lida(s), {resultado["gravadas"]} produto(s) gravado(s), '
+            f'{resultado["invalidas"]} inválida(s)'
+        ))
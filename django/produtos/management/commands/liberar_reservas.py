@@ -0,0 +1,23 @@
+"""
+Management command para devolver ao estoque as reservas expiradas
+Deve rodar periodicamente (ex: cron a cada minuto)
+"""
+
+from django.core.management.base import BaseCommand
+from produtos.pedidos import liberar_reservas_expiradas
+
+
+class Command(BaseCommand):
+    help = 'Expira pedidos não confirmados dentro do prazo e devolve o estoque reservado'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Quantidade de pedidos processados por transação (padrão: 500)'
+        )
+
+    def handle(self, *args, **options):
+        total = liberar_reservas_expiradas(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} reserva(s) expirada(s) liberada(s)'))
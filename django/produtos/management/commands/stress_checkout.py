@@ -0,0 +1,104 @@
+"""
+Management command de teste de concorrência do checkout
+
+Cria um produto "quente" com estoque limitado e vários clientes com o
+mesmo produto no carrinho, dispara todos os checkouts ao mesmo tempo em
+threads e verifica que:
+- nunca se vende mais do que o estoque
+- o estoque final bate com o que foi vendido
+- não há deadlocks nem erros inesperados
+
+Precisa de PostgreSQL (o SQLite serializa as escritas e não tem
+SELECT ... FOR UPDATE). Os dados criados são removidos ao final.
+
+Uso: python manage.py stress_checkout --clientes 100 --estoque 30
+"""
+
+import threading
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from produtos import carrinho
+from produtos.models import Pedido, Produto
+from produtos.pedidos import EstoqueInsuficiente, finalizar_compra
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Teste de estresse: checkouts concorrentes do mesmo produto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=50, help='Checkouts simultâneos (padrão: 50)')
+        parser.add_argument('--estoque', type=int, default=20, help='Estoque inicial do produto (padrão: 20)')
+        parser.add_argument('--quantidade', type=int, default=1, help='Unidades por checkout (padrão: 1)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Este teste precisa de PostgreSQL.')
+
+        n, estoque, qtd = options['clientes'], options['estoque'], options['quantidade']
+        prefixo = f'stress-{uuid.uuid4().hex[:8]}'
+
+        produto = Produto.objects.create(nome=prefixo, descricao='stress', preco=10, estoque=estoque)
+        usuarios = [
+            User.objects.create_user(username=f'{prefixo}-{i}', email=f'{prefixo}-{i}@stress.local')
+            for i in range(n)
+        ]
+        for usuario in usuarios:
+            carrinho.adicionar_item(usuario, produto.produto_id, qtd)
+
+        resultados = {'ok': 0, 'sem_estoque': 0, 'erros': []}
+        trava = threading.Lock()
+        largada = threading.Barrier(n)
+
+        def comprar(usuario):
+            try:
+                largada.wait()
+                finalizar_compra(usuario)
+                with trava:
+                    resultados['ok'] += 1
+            except EstoqueInsuficiente:
+                with trava:
+                    resultados['sem_estoque'] += 1
+            except Exception as e:
+                with trava:
+                    resultados['erros'].append(repr(e))
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=comprar, args=(u,)) for u in usuarios]
+        inicio = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+
+        produto.refresh_from_db()
+        vendidos = resultados['ok'] * qtd
+        esperado_ok = min(n, estoque // qtd)
+
+        self.stdout.write(f'  Checkouts: {n} em {duracao:.2f}s ({n / duracao:.0f}/s)')
+        self.stdout.write(f'  Confirmados: {resultados["ok"]} | Sem estoque: {resultados["sem_estoque"]}')
+        self.stdout.write(f'  Estoque final: {produto.estoque}')
+
+        falhas = []
+        if resultados['erros']:
+            falhas.append(f'{len(resultados["erros"])} erro(s): {resultados["erros"][:3]}')
+        if produto.estoque != estoque - vendidos:
+            falhas.append(f'estoque final {produto.estoque} != {estoque - vendidos}')
+        if produto.estoque < 0:
+            falhas.append('estoque negativo')
+        if resultados['ok'] != esperado_ok:
+            falhas.append(f'{resultados["ok"]} vendas, esperado {esperado_ok}')
+
+        # limpeza
+        Pedido.objects.filter(usuario__in=usuarios).delete()
+        User.objects.filter(pk__in=[u.pk for u in usuarios]).delete()
+        produto.delete()
+
+        if falhas:
+            raise CommandError('❌ ' + '; '.join(falhas))
+        self.stdout.write(self.style.SUCCESS('✅ Checkout concorrente consistente'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produtos', '0005_merge_20251119_0758'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produto',
+            name='imagem_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:04
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def unificar_duplicados(apps, schema_editor):
+    """
+    Junta carrinhos/itens duplicados antes de criar as constraints:
+    mantém o carrinho mais antigo do usuário e soma as quantidades
+    de itens repetidos do mesmo produto.
+    """
+    CarrinhoDeCompras = apps.get_model('produtos', 'CarrinhoDeCompras')
+    ItemDoCarrinho = apps.get_model('produtos', 'ItemDoCarrinho')
+
+    usuarios = (
+        CarrinhoDeCompras.objects.values('usuario_id')
+        .annotate(total=models.Count('id'))
+        .filter(total__gt=1)
+        .values_list('usuario_id', flat=True)
+    )
+    for usuario_id in list(usuarios):
+        ids = list(
+            CarrinhoDeCompras.objects.filter(usuario_id=usuario_id)
+            .order_by('id').values_list('id', flat=True)
+        )
+        ItemDoCarrinho.objects.filter(carrinho_id__in=ids[1:]).update(carrinho_id=ids[0])
+        CarrinhoDeCompras.objects.filter(id__in=ids[1:]).delete()
+
+    repetidos = (
+        ItemDoCarrinho.objects.values('carrinho_id', 'produto_id')
+        .annotate(total=models.Count('id'), soma=Sum('quantidade'))
+        .filter(total__gt=1)
+    )
+    for grupo in list(repetidos):
+        itens = ItemDoCarrinho.objects.filter(
+            carrinho_id=grupo['carrinho_id'], produto_id=grupo['produto_id']
+        ).order_by('id')
+        primeiro = itens.first()
+        itens.exclude(id=primeiro.id).delete()
+        ItemDoCarrinho.objects.filter(id=primeiro.id).update(quantidade=grupo['soma'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produtos', '0006_produto_imagem_variantes'),
+    ]
+
+    operations = [
+        migrations.RunPython(unificar_duplicados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produtos', '0007_unificar_carrinhos_duplicados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='carrinhodecompras',
+            constraint=models.UniqueConstraint(fields=('usuario',), name='carrinho_usuario_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='itemdocarrinho',
+            constraint=models.UniqueConstraint(fields=('carrinho', 'produto'), name='item_carrinho_produto_unico'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+def unificar_categorias(apps, schema_editor):
+    """
+    Junta categorias com o mesmo nome antes de torná-lo único:
+    os produtos passam para a categoria mais antiga.
+    """
+    Categoria = apps.get_model('produtos', 'Categoria')
+    Produto = apps.get_model('produtos', 'Produto')
+
+    nomes = (
+        Categoria.objects.values('nome_categoria')
+        .annotate(total=models.Count('id_categoria'))
+        .filter(total__gt=1)
+        .values_list('nome_categoria', flat=True)
+    )
+    for nome in list(nomes):
+        ids = list(
+            Categoria.objects.filter(nome_categoria=nome)
+            .order_by('id_categoria').values_list('id_categoria', flat=True)
+        )
+        Produto.objects.filter(categoria_id__in=ids[1:]).update(categoria_id=ids[0])
+        Categoria.objects.filter(id_categoria__in=ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produtos', '0009_pedido_itempedido'),
+    ]
+
+    operations = [
+        migrations.RunPython(unificar_categorias, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produtos', '0010_unificar_categorias_duplicadas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produto',
+            name='sku',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='categoria',
+            name='nome_categoria',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
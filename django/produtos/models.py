@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from users.models import User
+from .cache import invalidar_catalogo
 
 
 # Create your models here.
@@ -13,6 +14,8 @@ def caminho_imagem(instance, filename):
 
 class Produto(models.Model):
     produto_id = models.AutoField(primary_key=True)
+    # código do fornecedor; chave do upsert na importação em lote (produtos/importacao.py)
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     nome = models.CharField(max_length=100)
     descricao = models.TextField()
     preco = models.DecimalField(max_digits=10, decimal_places=2)
@@ -20,14 +23,45 @@ class Produto(models.Model):
     imagem = models.ImageField(upload_to=caminho_imagem, null=True, blank=True)
     # o blank=True permite que o campo seja opcional no formulário
     categoria = models.ForeignKey('Categoria', on_delete=models.CASCADE, null=True, blank=True)
+    # variantes redimensionadas geradas por produtos.imagens (preenchido em segundo plano)
+    imagem_variantes = models.JSONField(default=dict, blank=True, editable=False)
+
+    # nome da imagem carregada do banco, para detectar troca no save()
+    _imagem_original = None
 
     def __str__(self):
         return self.nome
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'imagem' in field_names:
+            instance._imagem_original = instance.imagem.name
+        return instance
+
+    def save(self, *args, **kwargs):
+        imagem_alterada = (self.imagem.name or None) != (self._imagem_original or None)
+        super().save(*args, **kwargs)
+        transaction.on_commit(invalidar_catalogo)
+        if imagem_alterada:
+            self._imagem_original = self.imagem.name
+            from produtos.imagens import agendar_variantes
+            agendar_variantes(self.pk)
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidar_catalogo)
+        return resultado
+
+    def variantes_imagem(self, formato):
+        """Lista [(largura, nome_arquivo)] de um formato, da menor para a maior"""
+        por_largura = (self.imagem_variantes or {}).get(formato, {})
+        return sorted((int(largura), nome) for largura, nome in por_largura.items())
+
 
 class Categoria(models.Model):
     id_categoria = models.AutoField(primary_key=True)
-    nome_categoria = models.CharField(max_length=100)
+    nome_categoria = models.CharField(max_length=100, unique=True)
 
     def __str__(self):
         return self.nome_categoria
@@ -36,6 +70,12 @@ class CarrinhoDeCompras(models.Model):
 
     usuario = models.ForeignKey(User, on_delete= models.CASCADE)
 
+    class Meta:
+        # um carrinho por usuário (necessário para o upsert em produtos.carrinho)
+        constraints = [
+            models.UniqueConstraint(fields=['usuario'], name='carrinho_usuario_unico'),
+        ]
+
     def __str__(self):
         return f'Carrinho de {self.usuario.username}'
 
@@ -44,5 +84,57 @@ class ItemDoCarrinho(models.Model):
     produto = models.ForeignKey(Produto, on_delete=models.CASCADE)
     quantidade = models.IntegerField(default=1)
 
+    class Meta:
+        # um item por produto em cada carrinho (alvo do ON CONFLICT)
+        constraints = [
+            models.UniqueConstraint(fields=['carrinho', 'produto'], name='item_carrinho_produto_unico'),
+        ]
+
+    def __str__(self):
+        return f'{self.quantidade} x {self.produto.nome} no carrinho de {self.carrinho.usuario.username}'
+
+class Pedido(models.Model):
+    """
+    Pedido gerado a partir do carrinho (ver produtos/pedidos.py).
+    Ao ser criado já reserva o estoque; se não for confirmado até
+    expira_em, o comando liberar_reservas devolve o estoque.
+    """
+    RESERVADO = 'RESERVADO'
+    CONFIRMADO = 'CONFIRMADO'
+    CANCELADO = 'CANCELADO'
+    EXPIRADO = 'EXPIRADO'
+
+    STATUS_CHOICES = [
+        (RESERVADO, 'Aguardando pagamento'),
+        (CONFIRMADO, 'Confirmado'),
+        (CANCELADO, 'Cancelado'),
+        (EXPIRADO, 'Reserva expirada'),
+    ]
+
+    usuario = models.ForeignKey(User, on_delete=models.PROTECT, related_name='pedidos')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=RESERVADO)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    expira_em = models.DateTimeField()
+    criado_em = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-criado_em']
+        indexes = [
+            # varredura de reservas expiradas
+            models.Index(fields=['status', 'expira_em']),
+        ]
+
+    def __str__(self):
+        return f'Pedido #{self.pk} de {self.usuario.username}'
+
+
+class ItemPedido(models.Model):
+    pedido = models.ForeignKey(Pedido, on_delete=models.CASCADE, related_name='itens')
+    produto = models.ForeignKey(Produto, on_delete=models.PROTECT)
+    quantidade = models.PositiveIntegerField()
+    # preço no momento da compra
+    preco_unitario = models.DecimalField(max_digits=10, decimal_places=2)
+
     def __str__(self):
-        return f'{self.quantidade} x {self.produto.nome} no carrinho de {self.carrinho.usuario.username}'
\ No newline at end of file
+        return f'{self.quantidade} x {self.produto.nome} (pedido #{self.pedido_id})'
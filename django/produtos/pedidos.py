@@ -0,0 +1,169 @@
+"""
+Checkout: transforma o carrinho em Pedido reservando o estoque
+
+Tudo acontece em uma única transação:
+1. trava o carrinho do usuário (evita dois checkouts do mesmo carrinho)
+2. trava as linhas de Produto envolvidas com SELECT ... FOR UPDATE,
+   sempre em ordem crescente de produto_id (ordem determinística
+   entre transações concorrentes = sem deadlock)
+3. valida o estoque e decrementa todos os produtos com um único UPDATE
+4. cria o Pedido/ItemPedido com bulk_create e esvazia o carrinho
+
+Reservas não confirmadas até Pedido.expira_em são devolvidas ao estoque
+por liberar_reservas_expiradas() (comando liberar_reservas).
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.utils import timezone
+from .carrinho import invalidar_resumo
+from .models import CarrinhoDeCompras, ItemDoCarrinho, ItemPedido, Pedido, Produto
+
+
+class CheckoutError(Exception):
+    """Erro de negócio ao finalizar a compra"""
+
+
+class CarrinhoVazio(CheckoutError):
+    pass
+
+
+class EstoqueInsuficiente(CheckoutError):
+    def __init__(self, produtos):
+        # produtos: lista de (nome, disponivel, solicitado)
+        self.produtos = produtos
+        nomes = ', '.join(nome for nome, _, _ in produtos)
+        super().__init__(f'Estoque insuficiente para: {nomes}')
+
+
+def _ajustar_estoque(quantidades, sinal):
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) quantidades do estoque de vários
+    produtos em um único UPDATE ... SET estoque = estoque +/- CASE ... END
+    """
+    if not quantidades:
+        return
+    delta = Case(
+        *[When(produto_id=pid, then=Value(qtd * sinal)) for pid, qtd in quantidades.items()],
+        default=Value(0),
+    )
+    Produto.objects.filter(produto_id__in=list(quantidades)).update(estoque=F('estoque') + delta)
+
+
+def _travar_produtos(ids, campos=('produto_id',)):
+    """SELECT ... FOR UPDATE nas linhas de Produto, em ordem de produto_id"""
+    return list(
+        Produto.objects.select_for_update()
+        .filter(produto_id__in=list(ids))
+        .order_by('produto_id')
+        .only(*campos)
+    )
+
+
+def finalizar_compra(usuario):
+    """
+    Converte o carrinho do usuário em um Pedido RESERVADO.
+    Levanta CarrinhoVazio ou EstoqueInsuficiente (nada é alterado nesses casos).
+    """
+    with transaction.atomic():
+        carrinho = CarrinhoDeCompras.objects.select_for_update().filter(usuario=usuario).first()
+        if carrinho is None:
+            raise CarrinhoVazio('Seu carrinho está vazio.')
+
+        quantidades = dict(
+            ItemDoCarrinho.objects.filter(carrinho=carrinho, quantidade__gt=0)
+            .values_list('produto_id', 'quantidade')
+        )
+        if not quantidades:
+            raise CarrinhoVazio('Seu carrinho está vazio.')
+
+        produtos = _travar_produtos(quantidades, ('produto_id', 'nome', 'preco', 'estoque'))
+
+        faltando = [
+            (p.nome, p.estoque, quantidades[p.produto_id])
+            for p in produtos
+            if p.estoque < quantidades[p.produto_id]
+        ]
+        if faltando:
+            raise EstoqueInsuficiente(faltando)
+
+        _ajustar_estoque(quantidades, -1)
+
+        itens = [
+            ItemPedido(produto_id=p.produto_id, quantidade=quantidades[p.produto_id], preco_unitario=p.preco)
+            for p in produtos
+        ]
+        pedido = Pedido.objects.create(
+            usuario=usuario,
+            total=sum((i.preco_unitario * i.quantidade for i in itens), Decimal('0.00')),
+            expira_em=timezone.now() + timedelta(minutes=settings.PEDIDO_RESERVA_MINUTOS),
+        )
+        for item in itens:
+            item.pedido = pedido
+        ItemPedido.objects.bulk_create(itens)
+
+        ItemDoCarrinho.objects.filter(carrinho=carrinho).delete()
+        invalidar_resumo(usuario.pk)
+
+    return pedido
+
+
+def confirmar_pedido(pedido_id, usuario=None):
+    """
+    Confirma (pagamento aprovado) um pedido cuja reserva ainda é válida.
+    UPDATE condicional: retorna False se já expirou/foi cancelado.
+    """
+    pedidos = Pedido.objects.filter(pk=pedido_id, status=Pedido.RESERVADO, expira_em__gt=timezone.now())
+    if usuario is not None:
+        pedidos = pedidos.filter(usuario=usuario)
+    return pedidos.update(status=Pedido.CONFIRMADO, atualizado_em=timezone.now()) == 1
+
+
+def _liberar(pedido_ids, novo_status):
+    """Devolve ao estoque os itens dos pedidos (já travados) e muda o status"""
+    quantidades = dict(
+        ItemPedido.objects.filter(pedido_id__in=pedido_ids)
+        .values('produto_id').annotate(total=Sum('quantidade'))
+        .values_list('produto_id', 'total')
+    )
+    _travar_produtos(quantidades)
+    _ajustar_estoque(quantidades, 1)
+    Pedido.objects.filter(pk__in=pedido_ids).update(status=novo_status, atualizado_em=timezone.now())
+
+
+def cancelar_pedido(pedido_id, usuario=None):
+    """Cancela um pedido ainda reservado e devolve o estoque"""
+    with transaction.atomic():
+        pedidos = Pedido.objects.select_for_update().filter(pk=pedido_id, status=Pedido.RESERVADO)
+        if usuario is not None:
+            pedidos = pedidos.filter(usuario=usuario)
+        ids = list(pedidos.values_list('pk', flat=True))
+        if ids:
+            _liberar(ids, Pedido.CANCELADO)
+    return bool(ids)
+
+
+def liberar_reservas_expiradas(lote=500, agora=None):
+    """
+    Marca como EXPIRADO os pedidos RESERVADO vencidos e devolve o estoque,
+    em lotes curtos (uma transação por lote). SKIP LOCKED permite rodar
+    vários workers ao mesmo tempo sem disputa. Retorna o total liberado.
+    """
+    agora = agora or timezone.now()
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Pedido.objects.select_for_update(skip_locked=True)
+                .filter(status=Pedido.RESERVADO, expira_em__lte=agora)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:lote]
+            )
+            if ids:
+                _liberar(ids, Pedido.EXPIRADO)
+        total += len(ids)
+        if len(ids) < lote:
+            return total
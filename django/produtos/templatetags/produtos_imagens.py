@@ -0,0 +1,45 @@
+"""
+Template tags para exibir imagens de produtos com as variantes responsivas
+
+Uso:
+    {% load produtos_imagens %}
+    {% imagem_produto produto "(max-width: 600px) 100vw, 240px" %}
+"""
+
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+def _srcset(produto, formato):
+    return ', '.join(
+        f'{default_storage.url(nome)} {largura}w'
+        for largura, nome in produto.variantes_imagem(formato)
+    )
+
+
+@register.simple_tag
+def imagem_produto(produto, sizes='100vw'):
+    """
+    Renderiza um <picture> com srcset WebP/JPEG quando as variantes já
+    foram geradas; enquanto isso, usa a imagem original.
+    """
+    jpegs = produto.variantes_imagem('jpg')
+    if not jpegs:
+        return format_html('<img src="{}" alt="{}" loading="lazy">', produto.imagem.url, produto.nome)
+
+    fonte_webp = ''
+    if produto.variantes_imagem('webp'):
+        fonte_webp = format_html(
+            '<source type="image/webp" srcset="{}" sizes="{}">', _srcset(produto, 'webp'), sizes
+        )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy"></picture>',
+        fonte_webp,
+        default_storage.url(jpegs[0][1]),
+        _srcset(produto, 'jpg'),
+        sizes,
+        produto.nome,
+    )
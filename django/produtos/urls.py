@@ -8,4 +8,10 @@ urlpatterns = [
     path("delete/<int:produto_id>/", views.delete_produto, name="delete_produto"),
     path("adicionar_carrinho/<int:produto_id>/", views.adicionar_ao_carrinho, name = "adicionar_ao_carrinho"),
     path("carrinho/", views.ver_carrinho, name = "ver_carrinho"),
+    path("carrinho/atualizar/", views.atualizar_carrinho, name = "atualizar_carrinho"),
+    path("carrinho/resumo/", views.resumo_carrinho, name = "resumo_carrinho"),
+    path("carrinho/finalizar/", views.finalizar_compra, name = "finalizar_compra"),
+    path("pedidos/<int:pedido_id>/", views.pedido_detalhe, name = "pedido_detalhe"),
+    path("pedidos/<int:pedido_id>/confirmar/", views.confirmar_pedido, name = "confirmar_pedido"),
+    path("pedidos/<int:pedido_id>/cancelar/", views.cancelar_pedido, name = "cancelar_pedido"),
 ]
\ No newline at end of file
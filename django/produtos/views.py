@@ -1,10 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from decimal import Decimal
-from .models import Produto, Categoria, CarrinhoDeCompras, ItemDoCarrinho
+from django.http import Http404, JsonResponse
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.db.models import ProtectedError
+from .models import Produto, Categoria, Pedido
+from . import carrinho, pedidos
 from django.contrib.auth.decorators import login_required
+from app.db_router import usar_replica
 
 # Create your views here.
 
+@usar_replica
 def produto_list(request):
 
     produtos = Produto.objects.all()
@@ -59,6 +65,10 @@ def delete_produto(request, produto_id):
         return redirect('add_produto')
     except Produto.DoesNotExist:
         return redirect('add_produto')
+    except ProtectedError:
+        # produto já vendido: mantém para o histórico dos pedidos
+        messages.error(request, 'Produto possui pedidos e não pode ser excluído.')
+        return redirect('add_produto')
 
 
 @login_required
@@ -71,54 +81,103 @@ def adicionar_ao_carrinho(request, produto_id):
         except (TypeError, ValueError):
             quantidade = 1
 
-        # garante que o produto existe
-        produto = get_object_or_404(Produto, produto_id=produto_id)
+        # upsert atômico: cria carrinho/item ou soma a quantidade no banco
+        if quantidade > 0 and not carrinho.adicionar_item(request.user, produto_id, quantidade):
+            raise Http404('Produto não encontrado.')
 
-        # Verifica se o carrinho existe para o usuário autenticado, se não, cria um novo
-        carrinho, criado_carrinho = CarrinhoDeCompras.objects.get_or_create(usuario=request.user)
+        return redirect('produto_list')
 
-        # verifica se o item já está no carrinho, se não, cria um novo com a quantidade
-        item, criado_item = ItemDoCarrinho.objects.get_or_create(
-            carrinho=carrinho,
-            produto=produto,
-            defaults={'quantidade': quantidade}
-        )
+    return redirect('produto_list')
 
-        if not criado_item:
-            # atualiza a quantidade existente
-            item.quantidade = (item.quantidade or 0) + quantidade
-            item.save()
 
-        return redirect('produto_list')
+@login_required
+def atualizar_carrinho(request):
+    """
+    Adiciona ou atualiza vários itens de uma vez.
+    Espera listas paralelas 'produto_id' e 'quantidade' no POST e
+    'acao' = 'adicionar' (soma) ou 'definir' (quantidade absoluta, 0 remove).
+    """
+    if request.method == 'POST':
+        itens = []
+        for produto_id, quantidade in zip(request.POST.getlist('produto_id'), request.POST.getlist('quantidade')):
+            try:
+                itens.append((int(produto_id), int(quantidade)))
+            except (TypeError, ValueError):
+                continue
 
-    return redirect('produto_list')
+        if request.POST.get('acao') == 'adicionar':
+            carrinho.adicionar_itens(request.user, itens)
+        else:
+            carrinho.definir_quantidades(request.user, itens)
+
+    return redirect('ver_carrinho')
 
 @login_required
 def ver_carrinho(request):
-    # Obtém ou cria o carrinho do usuário autenticado
-    carrinho, carrinho_criado = CarrinhoDeCompras.objects.get_or_create(usuario=request.user)
+    # Itens com subtotal calculado no banco; total e contagem vêm do resumo em cache
+    itens = carrinho.itens_do_carrinho(request.user)
+    resumo = carrinho.resumo_carrinho(request.user)
+
+    return render(request, 'carrinho_de_compras.html', {
+        'produtos': itens,
+        'produto_total': resumo['total'],
+        'total_itens': resumo['itens'],
+    })
+
 
-    # Busca itens relacionados ao carrinho, e o select_related para otimizar consultas
-    itens = ItemDoCarrinho.objects.filter(carrinho=carrinho).select_related('produto')
+@login_required
+def resumo_carrinho(request):
+    """Resumo do carrinho em JSON (badge do cabeçalho / atualização via JS)"""
+    resumo = carrinho.resumo_carrinho(request.user)
+    return JsonResponse({'itens': resumo['itens'], 'total': f"{resumo['total']:.2f}"})
 
-    # Monta estrutura esperada pelo template
-    produtos = []
-    total = Decimal('0.00')
-    for item in itens:
-        preco = item.produto.preco or Decimal('0.00')
-        subtotal = preco * item.quantidade
-        produtos.append({
-            'produto': item.produto,
-            'quantidade': item.quantidade,
-            'subtotal': f"{subtotal:.2f}"
-        })
-        total += subtotal
 
-    return render(request, 'carrinho_de_compras.html', {'produtos': produtos, 'produto_total': f"{total:.2f}"})
+@login_required
+def finalizar_compra(request):
+    """Converte o carrinho em pedido, reservando o estoque"""
+    if request.method != 'POST':
+        return redirect('ver_carrinho')
 
+    try:
+        pedido = pedidos.finalizar_compra(request.user)
+    except pedidos.CheckoutError as e:
+        messages.error(request, str(e))
+        return redirect('ver_carrinho')
 
+    return redirect('pedido_detalhe', pedido_id=pedido.pk)
 
 
+@login_required
+def pedido_detalhe(request, pedido_id):
+    # cliente vê os próprios pedidos; a equipe vê todos (confirmação do pagamento)
+    pedidos_visiveis = Pedido.objects.all() if request.user.is_staff_member() else request.user.pedidos.all()
+    pedido = get_object_or_404(pedidos_visiveis, pk=pedido_id)
+    itens = pedido.itens.select_related('produto')
+    return render(request, 'pedido_detalhe.html', {'pedido': pedido, 'itens': itens})
 
-    
 
+@login_required
+def confirmar_pedido(request, pedido_id):
+    """
+    Confirma o pagamento enquanto a reserva de estoque ainda é válida.
+    Só a equipe confirma (pagamento conferido no caixa); o cliente não
+    marca o próprio pedido como pago.
+    """
+    if not request.user.is_staff_member():
+        raise PermissionDenied
+    if request.method == 'POST':
+        if pedidos.confirmar_pedido(pedido_id):
+            messages.success(request, 'Pedido confirmado!')
+        else:
+            messages.error(request, 'A reserva deste pedido expirou ou ele já foi processado.')
+    return redirect('pedido_detalhe', pedido_id=pedido_id)
+
+
+@login_required
+def cancelar_pedido(request, pedido_id):
+    if request.method == 'POST':
+        if pedidos.cancelar_pedido(pedido_id, usuario=request.user):
+            messages.success(request, 'Pedido cancelado e estoque liberado.')
+        else:
+            messages.error(request, 'Este pedido não pode mais ser cancelado.')
+    return redirect('pedido_detalhe', pedido_id=pedido_id)
@@ -0,0 +1,23 @@
+"""
+Configuração do Django Admin para a fila de tarefas
+"""
+
+from django.contrib import admin
+from django.utils import timezone
+from .models import Tarefa
+
+
+@admin.register(Tarefa)
+class TarefaAdmin(admin.ModelAdmin):
+    list_display = ['id', 'nome', 'status', 'tentativas', 'executar_em', 'iniciada_em', 'concluida_em']
+    list_filter = ['status', 'nome']
+    search_fields = ['nome', 'chave']
+    readonly_fields = ['criado_em', 'iniciada_em', 'concluida_em', 'erro']
+    actions = ['reenfileirar']
+
+    @admin.action(description='Reenfileirar tarefas selecionadas')
+    def reenfileirar(self, request, queryset):
+        total = queryset.exclude(status=Tarefa.EXECUTANDO).update(
+            status=Tarefa.PENDENTE, tentativas=0, executar_em=timezone.now(), erro=''
+        )
+        self.message_user(request, f'{total} tarefa(s) reenfileirada(s).')
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TarefasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tarefas'
+    verbose_name = 'Tarefas em Segundo Plano'
+
+    def ready(self):
+        # registra os handlers declarados em <app>/tarefas.py (ver tarefas/fila.py)
+        autodiscover_modules('tarefas')
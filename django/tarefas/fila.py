@@ -0,0 +1,250 @@
+"""
+API da fila de tarefas
+
+Registro de handlers (em <app>/tarefas.py, carregados automaticamente):
+
+    @tarefa('consultas.lembrete')
+    def enviar_lembrete(consulta_id, data_hora): ...
+
+    # executada pelos workers a cada 15 minutos
+    @tarefa('consultas.agendar_lembretes', periodicidade=timedelta(minutes=15))
+    def agendar(): ...
+
+Enfileirar (dentro da transação da requisição: a tarefa só fica visível
+para os workers se a transação for confirmada):
+
+    enfileirar('consultas.lembrete', {'consulta_id': 1, ...}, chave='lembrete:1')
+
+Ciclo de vida: PENDENTE -> EXECUTANDO -> CONCLUIDA, ou de volta a
+PENDENTE com backoff exponencial até max_tentativas, e então FALHOU.
+Tarefas presas em EXECUTANDO além de TAREFAS_TIMEOUT_SEGUNDOS (worker
+morto no meio) voltam para a fila em recuperar_presas().
+"""
+
+import logging
+import random
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, F, Min, Q
+from django.utils import timezone
+
+from .models import Tarefa
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Handler:
+    nome: str
+    funcao: Callable[..., Any]
+    max_tentativas: int
+    periodicidade: timedelta | None
+
+
+_handlers: dict[str, Handler] = {}
+
+
+def _config(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def tarefa(nome, max_tentativas=5, periodicidade=None):
+    """Registra a função como handler de tarefas com esse nome"""
+    def decorador(funcao):
+        _handlers[nome] = Handler(nome, funcao, max_tentativas, periodicidade)
+        funcao.nome_tarefa = nome
+        return funcao
+    return decorador
+
+
+def handlers():
+    return dict(_handlers)
+
+
+def _nova(nome, argumentos=None, chave=None, executar_em=None):
+    if nome not in _handlers:
+        raise LookupError(f'Tarefa não registrada: {nome!r}')
+    return Tarefa(
+        nome=nome,
+        argumentos=argumentos or {},
+        chave=chave,
+        executar_em=executar_em or timezone.now(),
+        max_tentativas=_handlers[nome].max_tentativas,
+    )
+
+
+def enfileirar(nome, argumentos=None, chave=None, executar_em=None):
+    """
+    Cria a tarefa. Com chave, não duplica: se já existe uma tarefa com a
+    mesma chave retorna None.
+    """
+    tarefa = _nova(nome, argumentos, chave, executar_em)
+    if chave is None:
+        tarefa.save()
+        return tarefa
+    try:
+        with transaction.atomic():
+            tarefa.save()
+    except IntegrityError:
+        return None
+    return tarefa
+
+
+def enfileirar_varias(nome, itens, lote=1000):
+    """
+    Enfileira várias tarefas do mesmo handler com um bulk_create.
+    itens: iterável de (argumentos, chave, executar_em); chaves repetidas
+    são ignoradas.
+    """
+    tarefas = [_nova(nome, argumentos, chave, executar_em) for argumentos, chave, executar_em in itens]
+    Tarefa.objects.bulk_create(tarefas, batch_size=lote, ignore_conflicts=True)
+    return len(tarefas)
+
+
+# ====================================
+# Consumo (usado pelo worker)
+# ====================================
+
+def reservar(limite=10):
+    """
+    Reserva até `limite` tarefas vencidas para este worker: SELECT ... FOR
+    UPDATE SKIP LOCKED (outros workers pulam as linhas travadas) e um UPDATE
+    para EXECUTANDO, na mesma transação curta.
+    """
+    agora = timezone.now()
+    with transaction.atomic():
+        tarefas = list(
+            Tarefa.objects.select_for_update(skip_locked=True)
+            .filter(status=Tarefa.PENDENTE, executar_em__lte=agora)
+            .order_by('executar_em', 'id')[:limite]
+        )
+        if tarefas:
+            Tarefa.objects.filter(id__in=[t.id for t in tarefas]).update(
+                status=Tarefa.EXECUTANDO, iniciada_em=agora, tentativas=F('tentativas') + 1
+            )
+    for t in tarefas:
+        t.status = Tarefa.EXECUTANDO
+        t.iniciada_em = agora
+        t.tentativas += 1
+    return tarefas
+
+
+def backoff(tentativas):
+    """Espera antes da próxima tentativa: exponencial, com teto e 10% de jitter"""
+    base = _config('TAREFAS_BACKOFF_SEGUNDOS', 30)
+    segundos = min(base * 2 ** (tentativas - 1), _config('TAREFAS_BACKOFF_MAXIMO_SEGUNDOS', 3600))
+    return timedelta(seconds=segundos * random.uniform(1, 1.1))
+
+
+def executar(tarefa):
+    """Roda o handler da tarefa já reservada e grava o resultado. Retorna True se deu certo."""
+    handler = _handlers.get(tarefa.nome)
+    try:
+        if handler is None:
+            raise LookupError(f'Tarefa não registrada: {tarefa.nome!r}')
+        handler.funcao(**tarefa.argumentos)
+    except Exception:
+        _falhou(tarefa, traceback.format_exc())
+        return False
+    Tarefa.objects.filter(pk=tarefa.pk, status=Tarefa.EXECUTANDO).update(
+        status=Tarefa.CONCLUIDA, concluida_em=timezone.now(), erro=''
+    )
+    return True
+
+
+def _falhou(tarefa, erro):
+    agora = timezone.now()
+    erro = erro[-5000:]
+    if tarefa.tentativas >= tarefa.max_tentativas:
+        logger.error('Tarefa %s #%s falhou definitivamente após %d tentativas', tarefa.nome, tarefa.pk, tarefa.tentativas)
+        campos = {'status': Tarefa.FALHOU, 'concluida_em': agora}
+    else:
+        logger.warning('Tarefa %s #%s falhou (tentativa %d), nova tentativa agendada', tarefa.nome, tarefa.pk, tarefa.tentativas)
+        campos = {'status': Tarefa.PENDENTE, 'executar_em': agora + backoff(tarefa.tentativas)}
+    Tarefa.objects.filter(pk=tarefa.pk, status=Tarefa.EXECUTANDO).update(erro=erro, **campos)
+
+
+def recuperar_presas():
+    """Devolve à fila as tarefas em EXECUTANDO há mais que o timeout (worker morreu)"""
+    agora = timezone.now()
+    limite = agora - timedelta(seconds=_config('TAREFAS_TIMEOUT_SEGUNDOS', 900))
+    presas = Tarefa.objects.filter(status=Tarefa.EXECUTANDO, iniciada_em__lt=limite)
+    esgotadas = presas.filter(tentativas__gte=F('max_tentativas')).update(
+        status=Tarefa.FALHOU, concluida_em=agora, erro='Tempo esgotado (worker interrompido)'
+    )
+    devolvidas = presas.update(status=Tarefa.PENDENTE, executar_em=agora)
+    return devolvidas + esgotadas
+
+
+def agendar_periodicas():
+    """
+    Enfileira a execução atual de cada handler periódico. A chave inclui o
+    intervalo corrente, então vários workers chamando ao mesmo tempo criam
+    uma única tarefa por intervalo.
+    """
+    agora = timezone.now()
+    total = 0
+    for handler in _handlers.values():
+        if handler.periodicidade is None:
+            continue
+        intervalo = int(agora.timestamp() // handler.periodicidade.total_seconds())
+        if enfileirar(handler.nome, chave=f'{handler.nome}:periodica:{intervalo}') is not None:
+            total += 1
+    return total
+
+
+def limpar(dias=None, lote=5000):
+    """Apaga tarefas concluídas há mais de `dias` (em lotes). Retorna a quantidade."""
+    dias = dias if dias is not None else _config('TAREFAS_RETENCAO_DIAS', 7)
+    antes_de = timezone.now() - timedelta(days=dias)
+    total = 0
+    while True:
+        ids = list(
+            Tarefa.objects.filter(status=Tarefa.CONCLUIDA, iniciada_em__lt=antes_de)
+            .values_list('id', flat=True)[:lote]
+        )
+        if not ids:
+            return total
+        total += Tarefa.objects.filter(id__in=ids).delete()[0]
+
+
+def metricas(janela=timedelta(hours=1)):
+    """
+    Situação da fila:
+    - por_status: quantidade de tarefas em cada status
+    - vencidas / atraso_segundos: pendentes que já deveriam ter rodado e há quanto tempo a mais antiga espera
+    - por_nome: execuções terminadas na janela (concluídas, falhas, duração média em segundos)
+    """
+    agora = timezone.now()
+    por_status = dict(Tarefa.objects.order_by().values_list('status').annotate(total=Count('id')))
+    vencidas = Tarefa.objects.filter(status=Tarefa.PENDENTE, executar_em__lte=agora).aggregate(
+        total=Count('id'), mais_antiga=Min('executar_em')
+    )
+    recentes = (
+        Tarefa.objects.filter(status__in=[Tarefa.CONCLUIDA, Tarefa.FALHOU], iniciada_em__gte=agora - janela)
+        .order_by()
+        .values('nome')
+        .annotate(
+            concluidas=Count('id', filter=Q(status=Tarefa.CONCLUIDA)),
+            falhas=Count('id', filter=Q(status=Tarefa.FALHOU)),
+            duracao_media=Avg(F('concluida_em') - F('iniciada_em')),
+        )
+    )
+    return {
+        'por_status': {status: por_status.get(status, 0) for status, _ in Tarefa.STATUS_CHOICES},
+        'vencidas': vencidas['total'],
+        'atraso_segundos': (agora - vencidas['mais_antiga']).total_seconds() if vencidas['mais_antiga'] else 0,
+        'por_nome': {
+            linha['nome']: {
+                'concluidas': linha['concluidas'],
+                'falhas': linha['falhas'],
+                'duracao_media': linha['duracao_media'].total_seconds() if linha['duracao_media'] else None,
+            }
+            for linha in recentes
+        },
+    }
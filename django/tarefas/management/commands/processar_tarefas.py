@@ -0,0 +1,88 @@
+"""
+Management command do worker da fila de tarefas
+Em produção, rode como serviço (ex: systemd/supervisor/container próprio):
+
+    python manage.py processar_tarefas --concorrencia 4
+
+Para consultar a situação da fila:
+
+    python manage.py processar_tarefas --metricas
+"""
+
+import signal
+
+from django.core.management.base import BaseCommand
+from tarefas import fila
+from tarefas.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em segundo plano da fila (SELECT ... FOR UPDATE SKIP LOCKED)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concorrencia',
+            type=int,
+            default=2,
+            help='Threads consumindo a fila neste processo (padrão: 2)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=10,
+            help='Tarefas reservadas por vez em cada thread (padrão: 10)'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=1.0,
+            help='Segundos de espera quando a fila está vazia (padrão: 1)'
+        )
+        parser.add_argument(
+            '--uma-vez',
+            action='store_true',
+            help='Processa o que estiver vencido e sai (útil em cron)'
+        )
+        parser.add_argument(
+            '--metricas',
+            action='store_true',
+            help='Mostra as métricas da fila e sai'
+        )
+
+    def handle(self, *args, **options):
+        if options['metricas']:
+            self.mostrar_metricas()
+            return
+
+        worker = Worker(
+            concorrencia=options['concorrencia'],
+            lote=options['lote'],
+            intervalo=options['intervalo'],
+            uma_vez=options['uma_vez'],
+        )
+
+        def encerrar(signum, frame):
+            self.stdout.write('⏹️  Encerrando após as tarefas em andamento...')
+            worker.parar.set()
+
+        signal.signal(signal.SIGTERM, encerrar)
+        signal.signal(signal.SIGINT, encerrar)
+
+        self.stdout.write(f'🚀 Worker iniciado com {options["concorrencia"]} thread(s)')
+        resumo = worker.executar()
+        media = f'{resumo["duracao_media"]:.3f}s' if resumo['duracao_media'] is not None else '-'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {resumo["concluidas"]} concluída(s), {resumo["falhas"]} falha(s), duração média {media}'
+        ))
+
+    def mostrar_metricas(self):
+        dados = fila.metricas()
+        self.stdout.write('📊 Tarefas por status:')
+        for status, total in dados['por_status'].items():
+            self.stdout.write(f'   {status}: {total}')
+        self.stdout.write(f'⏳ Vencidas aguardando: {dados["vencidas"]} (mais antiga há {dados["atraso_segundos"]:.0f}s)')
+        if dados['por_nome']:
+            self.stdout.write('🕐 Última hora:')
+            for nome, linha in dados['por_nome'].items():
+                media = f'{linha["duracao_media"]:.3f}s' if linha['duracao_media'] is not None else '-'
+                self.stdout.write(f'   {nome}: {linha["concluidas"]} ok, {linha["falhas"]} falha(s), média {media}')
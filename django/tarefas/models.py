@@ -0,0 +1,62 @@
+"""
+Fila de tarefas em segundo plano guardada no próprio PostgreSQL
+
+Cada linha é uma execução pendente (ou já feita) de um handler registrado
+com @tarefa (ver fila.py). Os workers (comando processar_tarefas) reservam
+as linhas com SELECT ... FOR UPDATE SKIP LOCKED, então vários processos
+podem consumir a fila sem pegar a mesma tarefa.
+"""
+
+from django.db import models
+from django.utils import timezone
+
+
+class Tarefa(models.Model):
+    PENDENTE = 'PENDENTE'
+    EXECUTANDO = 'EXECUTANDO'
+    CONCLUIDA = 'CONCLUIDA'
+    FALHOU = 'FALHOU'
+
+    STATUS_CHOICES = [
+        (PENDENTE, 'Pendente'),
+        (EXECUTANDO, 'Executando'),
+        (CONCLUIDA, 'Concluída'),
+        (FALHOU, 'Falhou'),
+    ]
+
+    nome = models.CharField(max_length=100, verbose_name='Handler')
+    argumentos = models.JSONField(default=dict, blank=True, verbose_name='Argumentos')
+    # Evita enfileirar duas vezes a mesma tarefa (ex: lembrete de uma consulta)
+    chave = models.CharField(max_length=200, null=True, blank=True, unique=True, verbose_name='Chave de deduplicação')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDENTE, verbose_name='Status')
+    tentativas = models.PositiveIntegerField(default=0, verbose_name='Tentativas')
+    max_tentativas = models.PositiveIntegerField(default=5, verbose_name='Máximo de tentativas')
+    executar_em = models.DateTimeField(default=timezone.now, verbose_name='Executar em')
+    iniciada_em = models.DateTimeField(null=True, blank=True, verbose_name='Iniciada em')
+    concluida_em = models.DateTimeField(null=True, blank=True, verbose_name='Concluída em')
+    erro = models.TextField(blank=True, verbose_name='Último erro')
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name='Criada em')
+
+    class Meta:
+        verbose_name = 'Tarefa'
+        verbose_name_plural = 'Tarefas'
+        ordering = ['-criado_em']
+        indexes = [
+            # fila: só as pendentes, na ordem em que devem rodar
+            models.Index(
+                fields=['executar_em', 'id'],
+                condition=models.Q(status='PENDENTE'),
+                name='tarefa_pendente_idx',
+            ),
+            # tarefas presas em EXECUTANDO (worker morreu) e métricas
+            models.Index(fields=['status', 'iniciada_em'], name='tarefa_status_inicio_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.nome} #{self.pk} ({self.get_status_display()})'
+
+    @property
+    def duracao(self):
+        if self.iniciada_em and self.concluida_em:
+            return self.concluida_em - self.iniciada_em
+        return None
@@ -0,0 +1,105 @@
+"""
+Worker da fila de tarefas (usado pelo comando processar_tarefas)
+
+N threads consomem a fila em paralelo, cada uma reservando um pequeno
+lote por vez. A thread principal faz a manutenção periódica (tarefas
+presas, tarefas periódicas, limpeza) e trata o encerramento: ao receber
+SIGTERM/SIGINT os lotes em andamento terminam antes de sair.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.db import DatabaseError, close_old_connections, connection
+
+from . import fila
+
+logger = logging.getLogger(__name__)
+
+# Intervalo da manutenção feita pela thread principal (segundos)
+MANUTENCAO_SEGUNDOS = 60
+
+
+class Worker:
+    def __init__(self, concorrencia=1, lote=10, intervalo=1.0, uma_vez=False):
+        self.concorrencia = concorrencia
+        self.lote = lote
+        self.intervalo = intervalo
+        self.uma_vez = uma_vez
+        self.parar = threading.Event()
+        self.contadores = Counter()
+        self.duracao_total = 0.0
+        self._trava = threading.Lock()
+
+    def _registrar(self, tarefa, sucesso, duracao):
+        with self._trava:
+            self.contadores['concluidas' if sucesso else 'falhas'] += 1
+            self.duracao_total += duracao
+        logger.info('Tarefa %s #%s %s em %.3fs', tarefa.nome, tarefa.pk, 'concluída' if sucesso else 'falhou', duracao)
+
+    def _consumir(self):
+        try:
+            while not self.parar.is_set():
+                try:
+                    tarefas = fila.reservar(self.lote)
+                except DatabaseError:
+                    # banco indisponível por um instante: tenta de novo após o intervalo
+                    logger.exception('Erro ao reservar tarefas')
+                    close_old_connections()
+                    self.parar.wait(self.intervalo)
+                    continue
+                if not tarefas:
+                    if self.uma_vez:
+                        return
+                    self.parar.wait(self.intervalo)
+                    continue
+                for tarefa in tarefas:
+                    inicio = time.monotonic()
+                    sucesso = fila.executar(tarefa)
+                    self._registrar(tarefa, sucesso, time.monotonic() - inicio)
+                    close_old_connections()
+        except Exception:
+            logger.exception('Thread do worker interrompida por erro inesperado')
+        finally:
+            # cada thread tem a própria conexão com o banco
+            connection.close()
+
+    def manutencao(self):
+        recuperadas = fila.recuperar_presas()
+        periodicas = fila.agendar_periodicas()
+        removidas = fila.limpar()
+        if recuperadas or removidas:
+            logger.info('Manutenção: %d recuperada(s), %d removida(s)', recuperadas, removidas)
+        return {'recuperadas': recuperadas, 'periodicas': periodicas, 'removidas': removidas}
+
+    def executar(self):
+        """Roda até self.parar ser acionado (ou a fila esvaziar, com uma_vez)"""
+        self.manutencao()
+        threads = [
+            threading.Thread(target=self._consumir, name=f'tarefas-worker-{i}', daemon=True)
+            for i in range(self.concorrencia)
+        ]
+        for thread in threads:
+            thread.start()
+
+        proxima_manutencao = time.monotonic() + MANUTENCAO_SEGUNDOS
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+            if not self.parar.is_set() and time.monotonic() >= proxima_manutencao:
+                try:
+                    self.manutencao()
+                finally:
+                    close_old_connections()
+                proxima_manutencao = time.monotonic() + MANUTENCAO_SEGUNDOS
+        return self.resumo()
+
+    def resumo(self):
+        total = self.contadores['concluidas'] + self.contadores['falhas']
+        return {
+            'concluidas': self.contadores['concluidas'],
+            'falhas': self.contadores['falhas'],
+            'duracao_media': self.duracao_total / total if total else None,
+        }
@@ -5,11 +5,23 @@ Funções auxiliares para autenticação Google OAuth2
 Contém toda a lógica de comunicação com a API do Google.
 """
 
+import logging
 import os
 import requests
 from secrets import token_urlsafe
 from urllib.parse import urlencode
 
+try:
+    # spans de rastreamento do projeto (app/rastreamento.py)
+    from app.rastreamento import span
+except ImportError:  # módulo copiado para outro projeto
+    from contextlib import nullcontext
+
+    def span(nome, **atributos):
+        return nullcontext(atributos)
+
+logger = logging.getLogger(__name__)
+
 
 # ============================================
 # Configurações 
@@ -97,11 +109,12 @@ def exchange_code_for_token(code):
     }
     
     try:
-        response = requests.post(token_url, data=data, timeout=10)
-        response.raise_for_status()
+        with span('google.token', url=token_url):
+            response = requests.post(token_url, data=data, timeout=10)
+            response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
-        print(f'Erro ao trocar código por token: {e}')
+        logger.warning('Erro ao trocar código por token: %s', e)
         return None
 
 
@@ -119,11 +132,12 @@ def get_user_info_from_google(access_token):
     headers = {'Authorization': f'Bearer {access_token}'}
     
     try:
-        response = requests.get(user_info_url, headers=headers, timeout=10)
-        response.raise_for_status()
+        with span('google.userinfo', url=user_info_url):
+            response = requests.get(user_info_url, headers=headers, timeout=10)
+            response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
-        print(f'Erro ao buscar informações do usuário: {e}')
+        logger.warning('Erro ao buscar informações do usuário: %s', e)
         return None
 
 
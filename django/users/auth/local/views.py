@@ -25,6 +25,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth import get_user_model
 from django.contrib import messages
+from django.db.models import ProtectedError
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.middleware.csrf import rotate_token
 from users.forms import ClientePublicCreateForm
@@ -215,7 +216,11 @@ def delete_user(request, user_id):
         return redirect('list_users')
 
     if request.method == "POST":
-        user.delete()
+        try:
+            user.delete()
+        except ProtectedError:
+            # cliente com pedidos: mantém para o histórico de vendas
+            messages.error(request, 'Usuário possui pedidos e não pode ser excluído.')
         return redirect('list_users')
 
     return render(request, "users/delete_user.html", {"user": user})
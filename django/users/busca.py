@@ -0,0 +1,62 @@
+"""
+Índice de busca de usuários (User.busca)
+
+Cada usuário guarda em User.busca um texto normalizado (minúsculo, sem
+acentos) com nome, e-mail, username, matrícula, CRMV e, só com dígitos,
+o CPF (username dos clientes cadastrados pelo balcão) e o telefone. A
+coluna tem índice GIN de trigramas (pg_trgm), então LIKE '%termo%' não
+percorre a tabela inteira: "98765", "123.456" ou "joão silva" acham o
+cliente pelo índice.
+
+O texto é recalculado no save() do User; caminhos que não passam pelo
+model (QuerySet.update, SQL manual) precisam do comando
+reindexar_busca_usuarios.
+
+Nas views: queryset.filter(busca.filtro(termo)), ou
+busca.filtro(termo, 'proprietario__') a partir de um model relacionado.
+"""
+
+import re
+import unicodedata
+
+from django.db.models import Q
+
+# campos que entram no texto de busca: alterá-los com update_fields
+# também regrava User.busca
+CAMPOS = frozenset({'first_name', 'last_name', 'email', 'username', 'matricula', 'crmv', 'telefone'})
+
+# termo só com dígitos e pontuação de CPF/telefone: "(11) 98765-4321", "123.456.789-00"
+_DOCUMENTO = re.compile(r'[\d\s().+/-]*\d[\d\s().+/-]*')
+
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e com espaços simples"""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.casefold().split())
+
+
+def digitos(texto):
+    return ''.join(filter(str.isdigit, texto or ''))
+
+
+def texto(user):
+    """Conteúdo de User.busca para o usuário"""
+    partes = [
+        user.first_name, user.last_name, user.email, user.username, user.matricula, user.crmv,
+        digitos(user.username), digitos(user.telefone),
+    ]
+    # espaço entre as partes: um termo não casa juntando o fim de um campo com o início do outro
+    return ' '.join(dict.fromkeys(parte for parte in map(normalizar, partes) if parte))
+
+
+def termo(busca):
+    """Termo digitado na forma em que está em User.busca"""
+    if _DOCUMENTO.fullmatch(busca.strip()):
+        return digitos(busca)
+    return normalizar(busca)
+
+
+def filtro(busca, prefixo=''):
+    """Q que filtra pelo termo (prefixo: caminho até o User, ex: 'proprietario__')"""
+    return Q(**{f'{prefixo}busca__contains': termo(busca)})
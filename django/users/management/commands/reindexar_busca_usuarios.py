@@ -0,0 +1,48 @@
+"""
+Management command para recalcular o índice de busca dos usuários
+Regrava User.busca de quem ficou divergente (ex: depois de QuerySet.update()
+ou SQL manual nos campos de nome, e-mail, username ou telefone)
+
+Uso: python manage.py reindexar_busca_usuarios [--lote 1000]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users import busca
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o texto de busca (User.busca) dos usuários divergentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Usuários lidos por vez (padrão: 1000)')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote precisa ser maior que zero.')
+
+        self.stdout.write(self.style.WARNING('🔎 Recalculando índice de busca dos usuários...'))
+        campos = ['id', 'busca', *sorted(busca.CAMPOS)]
+        verificados = atualizados = 0
+        ultimo_id = 0
+        while True:
+            usuarios = list(User.objects.filter(id__gt=ultimo_id).order_by('id').only(*campos)[:options['lote']])
+            if not usuarios:
+                break
+            ultimo_id = usuarios[-1].id
+            verificados += len(usuarios)
+
+            divergentes = []
+            for user in usuarios:
+                texto = busca.texto(user)
+                if texto != user.busca:
+                    user.busca = texto
+                    divergentes.append(user)
+            if divergentes:
+                User.objects.bulk_update(divergentes, ['busca'])
+                atualizados += len(divergentes)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {verificados} usuário(s) verificado(s), {atualizados} atualizado(s)'
+        ))
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.2 on 2026-10-19 18:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def preencher_total_pets_ativos(apps, schema_editor):
+    """Contador inicial: um único UPDATE com a contagem por subquery"""
+    User = apps.get_model('users', 'User')
+    Animal = apps.get_model('pets', 'Animal')
+    ativos = (
+        Animal.objects.filter(proprietario=OuterRef('pk'), ativo=True)
+        .order_by().values('proprietario').annotate(total=Count('id')).values('total')
+    )
+    User.objects.update(total_pets_ativos=Coalesce(Subquery(ativos), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_matricula_alter_user_user_type'),
+        ('pets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='total_pets_ativos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Pets Ativos'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['user_type', '-date_joined'], name='user_tipo_cadastro_idx'),
+        ),
+        migrations.RunPython(preencher_total_pets_ativos, migrations.RunPython.noop),
+    ]
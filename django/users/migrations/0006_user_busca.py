@@ -0,0 +1,44 @@
+# Generated by Django 5.1.2 on 2026-10-19 19:10
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from users import busca
+
+LOTE = 1000
+
+
+def preencher_busca(apps, schema_editor):
+    """Texto de busca inicial, em lotes por id (a normalização é feita em Python)"""
+    User = apps.get_model('users', 'User')
+    ultimo_id = 0
+    while True:
+        usuarios = list(User.objects.filter(id__gt=ultimo_id).order_by('id')[:LOTE])
+        if not usuarios:
+            return
+        for user in usuarios:
+            user.busca = busca.texto(user)
+        User.objects.bulk_update(usuarios, ['busca'])
+        ultimo_id = usuarios[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_total_pets_ativos'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='user',
+            name='busca',
+            field=models.TextField(default='', editable=False, verbose_name='Texto de Busca'),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busca'], name='user_busca_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,9 +1,14 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
+from app.fragmentos import InvalidaFragmentos
+
+from . import busca as indice_busca
+
 # Create your models here.
 
-class User(AbstractUser):
+class User(InvalidaFragmentos, AbstractUser):
     # Tipos de usuário
     ADMIN = 'ADMIN'
     CLIENTE = 'CLIENTE'
@@ -66,6 +71,22 @@ class User(AbstractUser):
         null=True,
         verbose_name='Telefone'
     )
+    
+    # Desnormalizado: animais ativos do usuário, mantido por F() no
+    # save()/delete() de Animal (ver pets/contadores.py)
+    total_pets_ativos = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Pets Ativos'
+    )
+    
+    # Texto normalizado para a busca do painel (nome, e-mail, CPF e telefone
+    # só com dígitos...), recalculado no save() (ver users/busca.py)
+    busca = models.TextField(
+        default='',
+        editable=False,
+        verbose_name='Texto de Busca'
+    )
 
     def __str__(self):
         if self.matricula:
@@ -120,6 +141,21 @@ class User(AbstractUser):
         
         return True, "Matrícula válida"
     
+    def save(self, *args, **kwargs):
+        self.busca = indice_busca.texto(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and indice_busca.CAMPOS.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'busca'}
+        
+        # total_pets_ativos só muda por UPDATE com F(); um save() comum não
+        # pode gravar por cima o valor (talvez antigo) que está em memória
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name != 'total_pets_ativos'
+            ]
+        super().save(*args, **kwargs)
+    
     def delete(self, *args, **kwargs):
         """Impede exclusão se houver consultas relacionadas"""
         from django.core.exceptions import ValidationError
@@ -135,6 +171,16 @@ class User(AbstractUser):
         
         super().delete(*args, **kwargs)
     
+    # dashboards dos painéis (app/fragmentos.py); o login só grava last_login
+    dominios_fragmentos = ('usuarios',)
+    campos_sem_fragmentos = frozenset({'last_login'})
+    
     class Meta:
         verbose_name = 'Usuário'
-        verbose_name_plural = 'Usuários'
\ No newline at end of file
+        verbose_name_plural = 'Usuários'
+        indexes = [
+            # listagem de clientes: WHERE user_type = ... ORDER BY date_joined DESC
+            models.Index(fields=['user_type', '-date_joined'], name='user_tipo_cadastro_idx'),
+            # buscas do painel: WHERE busca LIKE '%termo%' (pg_trgm)
+            GinIndex(fields=['busca'], opclasses=['gin_trgm_ops'], name='user_busca_trgm_idx'),
+        ]
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Portal do cliente: visão geral dos pets do tutor
+
+Para cada animal ativo: espécie, raça, próxima consulta (agendada ou
+confirmada) e data da última visita (consulta realizada). São no máximo
+2 queries, com qualquer quantidade de pets: os animais com tipo/raça por
+JOIN e próxima consulta/última visita por subquery (índice
+animal + data_hora de Consulta), e as próximas consultas com o
+veterinário.
+
+O resultado fica no cache por tutor, com uma versão própria
+(app/fragmentos.py, domínio 'portal.<id>') incrementada quando um animal
+do tutor ou uma consulta de um desses animais muda: save()/delete() de
+Animal e Consulta e as transições de status (consultas/estados.py).
+Renomear raça/espécie muda a versão 'racas', que também entra na chave.
+O cache expira no horário da próxima consulta (deixa de ser "próxima")
+ou em PORTAL_SEGUNDOS.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from app.fragmentos import invalidar, versao
+from consultas.models import Consulta
+from pets.models import Animal
+
+STATUS_PROXIMAS = ('AGENDADA', 'CONFIRMADA')
+
+
+def _dominio(proprietario_id):
+    return f'portal.{proprietario_id}'
+
+
+def _chave(proprietario_id):
+    return f'portal:{proprietario_id}:{versao(_dominio(proprietario_id), "racas")}'
+
+
+def carregar(proprietario_id, agora=None):
+    """Monta a visão geral direto do banco (sem cache)"""
+    agora = agora or timezone.now()
+    consultas_do_animal = Consulta.objects.filter(animal=OuterRef('pk')).order_by()
+    animais = list(
+        Animal.ativos.filter(proprietario_id=proprietario_id)
+        .select_related('tipo_animal', 'raca')
+        .annotate(
+            proxima_consulta_id=Subquery(
+                consultas_do_animal.filter(status__in=STATUS_PROXIMAS, data_hora__gte=agora)
+                .order_by('data_hora').values('pk')[:1]
+            ),
+            ultima_visita=Subquery(
+                consultas_do_animal.filter(status='REALIZADA', data_hora__lt=agora)
+                .order_by('-data_hora').values('data_hora')[:1]
+            ),
+        )
+    )
+    ids_proximas = [animal.proxima_consulta_id for animal in animais if animal.proxima_consulta_id]
+    proximas = Consulta.objects.select_related('veterinario').in_bulk(ids_proximas) if ids_proximas else {}
+
+    pets = []
+    for animal in animais:
+        consulta = proximas.get(animal.proxima_consulta_id)
+        proxima_consulta = None
+        if consulta:
+            proxima_consulta = {
+                'id': consulta.pk,
+                'data_hora': consulta.data_hora,
+                'tipo': consulta.get_tipo_display(),
+                'status': consulta.get_status_display(),
+                'veterinario': consulta.veterinario.get_full_name() or consulta.veterinario.username,
+            }
+        pets.append({
+            'id': animal.pk,
+            'nome': animal.nome,
+            'tipo': animal.tipo_animal.nome,
+            'icone': animal.tipo_animal.icone,
+            'raca': animal.raca.nome,
+            'sexo': animal.get_sexo_display(),
+            'sexo_icone': animal.get_sexo_display_icon(),
+            'idade_anos': animal.idade_anos,
+            'ultima_visita': animal.ultima_visita,
+            'proxima_consulta': proxima_consulta,
+        })
+    return pets
+
+
+def visao_geral(user):
+    """Lista de pets do portal (dicts), do cache quando possível"""
+    chave = _chave(user.pk)
+    pets = cache.get(chave)
+    if pets is None:
+        agora = timezone.now()
+        pets = carregar(user.pk, agora)
+        segundos = settings.PORTAL_SEGUNDOS
+        horarios = [pet['proxima_consulta']['data_hora'] for pet in pets if pet['proxima_consulta']]
+        if horarios:
+            segundos = min(segundos, int((min(horarios) - agora).total_seconds()) + 1)
+        if segundos > 0:
+            cache.set(chave, pets, segundos)
+    return pets
+
+
+# ====================================
+# Invalidação
+# ====================================
+
+def invalidar_ao_confirmar(*proprietario_ids):
+    """Descarta a visão geral dos tutores depois do commit da transação atual"""
+    dominios = [_dominio(proprietario_id) for proprietario_id in set(proprietario_ids) if proprietario_id]
+    if dominios:
+        transaction.on_commit(lambda: invalidar(*dominios))
+
+
+def invalidar_animais_ao_confirmar(animal_ids):
+    """Como invalidar_ao_confirmar, a partir dos animais (uma query pelos tutores)"""
+    invalidar_ao_confirmar(*Animal.objects.filter(pk__in=animal_ids).values_list('proprietario_id', flat=True))
+
+
+def invalidar_consultas_ao_confirmar(consulta_ids):
+    """Como invalidar_ao_confirmar, a partir das consultas (uma query pelos tutores)"""
+    invalidar_ao_confirmar(
+        *Animal.objects.filter(consultas__in=consulta_ids).values_list('proprietario_id', flat=True).distinct()
+    )